@@ -3,9 +3,12 @@ import os
 from flask import Flask
 from app.blueprint import register_routing
 from app.db import db
-from app.extention import cors, migrate, scheduler
+from app.extention import cors, migrate
 from app.utils.auth import jwt
 from app.utils.logging import configure_logging
+from app.utils.metrics import init_metrics
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.scheduler import init_scheduler
 import manage
 
 
@@ -18,28 +21,27 @@ def create_app(settings_module):
     migrate.init_app(app, db)
     jwt.init_app(app)
     
-    # Initialize Scheduler
-    scheduler.init_app(app)
-    scheduler.start()
-    
-    # Add Cron Job
-    from app.services.cron_service import send_daily_report
-    # Avoid adding duplicate jobs in debug reloader
-    if not scheduler.get_job("daily_email_job"):
-        scheduler.add_job(
-            id="daily_email_job",
-            func=send_daily_report,
-            trigger="cron",
-            hour=13,
-            minute=0
-        )
-
-    cors.init_app(app, supports_credentials=True, resources={r"*": {"origins": "*"}})
+    # Cron jobs run in a single process of the cluster, see app/utils/scheduler.py
+    init_scheduler(app)
+
+    cors.init_app(
+        app,
+        supports_credentials=True,
+        resources={r"*": {"origins": "*"}},
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
     manage.init_app(app)
 
     configure_logging(app)
+    # Request latency, status and SQL metrics, served on /metrics
+    init_metrics(app)
     register_routing(app)
 
+    # Background job worker inside the web process, when not run with `flask run-jobs`
+    if app.config.get("JOB_WORKER_IN_PROCESS"):
+        from app.services import job_service
+        job_service.start_worker(app)
+
     return app
 
 
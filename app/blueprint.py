@@ -13,6 +13,7 @@ from app.routers.ai_message_router import blp as AIMessageBlueprint
 from app.routers.food_suggestion_router import blp as FoodSuggestionBlueprint
 from app.routers.analytics_router import blp as AnalyticsBlueprint
 from app.routers.send_router import blp as MailBlueprint
+from app.routers.job_router import blp as JobBlueprint
 
 
 # Register Blueprint
@@ -31,3 +32,4 @@ def register_routing(app):
     api.register_blueprint(FoodSuggestionBlueprint)
     api.register_blueprint(AnalyticsBlueprint)
     api.register_blueprint(MailBlueprint)
+    api.register_blueprint(JobBlueprint)
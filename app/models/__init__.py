@@ -9,3 +9,5 @@ from app.models.workout_log_model import WorkoutLogModel
 from app.models.water_log_model import WaterLogModel
 from app.models.ai_message_model import AIMessageModel
 from app.models.conversation_model import ConversationModel
+from app.models.daily_nutrition_summary_model import DailyNutritionSummaryModel
+from app.models.job_model import JobModel
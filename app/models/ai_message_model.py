@@ -7,6 +7,10 @@ from app.models.enums import AIRoleEnum
 
 class AIMessageModel(db.Model):
     __tablename__ = "ai_messages"
+    __table_args__ = (
+        db.Index("ix_ai_messages_conversation_id_created_at", "conversation_id", "created_at"),
+        db.Index("ix_ai_messages_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
@@ -1,7 +1,16 @@
+from datetime import datetime
+
 from app.db import db
 
 
 class BlocklistModel(db.Model):
     __tablename__ = "blocklist"
+    __table_args__ = (
+        db.Index("ix_blocklist_expires_at", "expires_at"),
+        db.Index("ix_blocklist_created_at", "created_at"),
+    )
 
-    jti_blocklist = db.Column(db.String(), primary_key=True)
\ No newline at end of file
+    jti_blocklist = db.Column(db.String(), primary_key=True)
+    # When the revoked token expires: past that, the row can be pruned
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -6,10 +6,17 @@ from app.db import db
 
 class ConversationModel(db.Model):
     __tablename__ = "conversations"
+    __table_args__ = (
+        db.Index("ix_conversations_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Rolling summary of the messages created up to summarized_until, which
+    # stand in for them in the context sent to the model
+    summary = db.Column(db.Text, nullable=True)
+    summarized_until = db.Column(db.DateTime, nullable=True)
 
     # Relationships
     user = db.relationship("UserModel", back_populates="conversations")
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from app.db import db
+
+
+class DailyNutritionSummaryModel(db.Model):
+    __tablename__ = "daily_nutrition_summary"
+
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), primary_key=True)
+    log_date = db.Column(db.Date, primary_key=True)
+    total_calories = db.Column(db.Integer, nullable=False, default=0)
+    total_protein = db.Column(db.Float, nullable=False, default=0.0)
+    total_carbs = db.Column(db.Float, nullable=False, default=0.0)
+    total_fat = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationship
+    user = db.relationship("UserModel", back_populates="daily_nutrition_summaries")
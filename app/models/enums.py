@@ -33,4 +33,16 @@ class MealTypeEnum(Enum):
     breakfast = "breakfast"
     lunch = "lunch"
     dinner = "dinner"
-    snack = "snack"
\ No newline at end of file
+    snack = "snack"
+
+class JobTypeEnum(Enum):
+    food_plan = "food_plan"
+    workout_plan = "workout_plan"
+    daily_report = "daily_report"
+
+
+class JobStatusEnum(Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
@@ -7,6 +7,10 @@ from app.db import db
 
 class FoodLogModel(db.Model):
     __tablename__ = "food_logs"
+    __table_args__ = (
+        db.Index("ix_food_logs_user_id_log_date", "user_id", "log_date"),
+        db.Index("uq_food_logs_user_id_client_id", "user_id", "client_id", unique=True),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
@@ -19,6 +23,7 @@ class FoodLogModel(db.Model):
     carbs = db.Column(db.Float)
     fat = db.Column(db.Float)
     status = db.Column(db.Integer,nullable=True, default=1) # 1: created, 2: completed, 3: not completed
+    client_id = db.Column(db.String(64), nullable=True) # Idempotency key sent by offline clients
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
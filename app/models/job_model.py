@@ -0,0 +1,31 @@
+from datetime import datetime
+from uuid import uuid4
+
+from app.db import db
+from app.models.enums import JobStatusEnum, JobTypeEnum
+
+
+class JobModel(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim the oldest queued jobs first
+        db.Index("ix_jobs_status_created_at", "status", "created_at"),
+        db.Index("ix_jobs_user_id_created_at", "user_id", "created_at"),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
+    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    type = db.Column(db.Enum(JobTypeEnum), nullable=False)
+    status = db.Column(db.Enum(JobStatusEnum), nullable=False, default=JobStatusEnum.queued)
+    payload = db.Column(db.JSON, nullable=False, default=dict) # Arguments of the job
+    result = db.Column(db.JSON, nullable=True) # Serialized response, once succeeded
+    error = db.Column(db.Text, nullable=True)
+    callback_url = db.Column(db.String(2048), nullable=True) # Webhook notified when the job finishes
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Relationships
+    user = db.relationship("UserModel", back_populates="jobs")
@@ -23,3 +23,5 @@ class UserModel(db.Model):
     water_logs = db.relationship("WaterLogModel", back_populates="user", cascade="all, delete-orphan")
     ai_messages = db.relationship("AIMessageModel", back_populates="user", cascade="all, delete-orphan")
     conversations = db.relationship("ConversationModel", back_populates="user", cascade="all, delete-orphan")
+    daily_nutrition_summaries = db.relationship("DailyNutritionSummaryModel", back_populates="user", cascade="all, delete-orphan")
+    jobs = db.relationship("JobModel", back_populates="user", cascade="all, delete-orphan")
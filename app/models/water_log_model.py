@@ -6,6 +6,9 @@ from app.db import db
 
 class WaterLogModel(db.Model):
     __tablename__ = "water_logs"
+    __table_args__ = (
+        db.Index("ix_water_logs_user_id_log_date", "user_id", "log_date"),
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
@@ -9,6 +9,7 @@ from app.schemas.ai_message_schema import (
     AIMessageAskSchema
 )
 from app.services import ai_message_service
+from app.utils.sse import sse_response
 
 blp = Blueprint("AIMessage", __name__, description="AI Message API")
 
@@ -27,6 +28,26 @@ class AIMessageAsk(MethodView):
         return result
 
 
+@blp.route("/ai-messages/ask/stream")
+class AIMessageAskStream(MethodView):
+    @jwt_required()
+    @blp.arguments(AIMessageAskSchema)
+    @blp.response(200, content_type="text/event-stream")
+    def post(self, ask_data):
+        """Ask AI a question and stream the answer as Server-Sent Events.
+        Emits a "delta" event per chunk of text, then "done" with the saved AI message,
+        or "error" if the answer could not be completed"""
+        from flask_jwt_extended import get_jwt_identity
+        user_id = get_jwt_identity()
+
+        events = ai_message_service.ask_ai_stream(user_id, ask_data["message"])
+        schema = AIMessageResponseSchema()
+        return sse_response(
+            (event, schema.dump(data) if event == "done" else data)
+            for event, data in events
+        )
+
+
 @blp.route("/ai-messages")
 class AIMessageList(MethodView):
     @jwt_required()
@@ -2,7 +2,13 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 from flask_smorest import Blueprint
 
-from app.schemas.analytics_schema import AnalyticsRequestSchema, AnalyticsItemSchema, AnalyticsWorkoutItemSchema
+from app.schemas.analytics_schema import (
+    AnalyticsRequestSchema,
+    AnalyticsItemSchema,
+    AnalyticsWorkoutItemSchema,
+    DashboardRequestSchema,
+    DashboardResponseSchema
+)
 from app.services import analytics_service
 
 blp = Blueprint("Analytics", __name__, description="Analytics API")
@@ -13,12 +19,17 @@ class AnalyticsCalo(MethodView):
     @blp.arguments(AnalyticsRequestSchema, location="query")
     @blp.response(200, AnalyticsItemSchema(many=True))
     def get(self, args):
-        """Get calories and macros analytics data"""
+        """Get calories and macros analytics data, for the last mode days or start..end, grouped by bucket"""
         from flask_jwt_extended import get_jwt_identity
         user_id = get_jwt_identity()
         
-        mode = args.get("mode", 7)
-        result = analytics_service.get_nutrition_analytics(user_id, mode)
+        result = analytics_service.get_nutrition_analytics(
+            user_id,
+            mode=args.get("mode", 7),
+            start=args.get("start"),
+            end=args.get("end"),
+            bucket=args.get("bucket", "day")
+        )
         return result
 
 
@@ -28,10 +39,33 @@ class AnalyticsWorkout(MethodView):
     @blp.arguments(AnalyticsRequestSchema, location="query")
     @blp.response(200, AnalyticsWorkoutItemSchema(many=True))
     def get(self, args):
-        """Get workout analytics data (duration, calories burned)"""
+        """Get workout analytics data (duration, calories burned), for the last mode days or start..end, grouped by bucket"""
         from flask_jwt_extended import get_jwt_identity
         user_id = get_jwt_identity()
         
-        mode = args.get("mode", 7)
-        result = analytics_service.get_workout_analytics(user_id, mode)
+        result = analytics_service.get_workout_analytics(
+            user_id,
+            mode=args.get("mode", 7),
+            start=args.get("start"),
+            end=args.get("end"),
+            bucket=args.get("bucket", "day")
+        )
+        return result
+
+
+@blp.route("/analytics/dashboard")
+class AnalyticsDashboard(MethodView):
+    @jwt_required()
+    @blp.arguments(DashboardRequestSchema, location="query")
+    @blp.response(200, DashboardResponseSchema)
+    def get(self, args):
+        """Get nutrition, workout, water, goal and profile data for the home screen in one call"""
+        from flask_jwt_extended import get_jwt_identity
+        user_id = get_jwt_identity()
+
+        result = analytics_service.get_dashboard(
+            user_id,
+            day=args.get("date"),
+            mode=args.get("mode", 7)
+        )
         return result
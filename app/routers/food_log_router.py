@@ -9,6 +9,7 @@ from app.schemas.food_log_schema import (
     FoodLogWithFoodSchema
 )
 from app.services import food_log_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, is_stream_requested, ndjson_response
 
 blp = Blueprint("FoodLog", __name__, description="Food Log API")
 
@@ -18,21 +19,31 @@ class FoodLogList(MethodView):
     @jwt_required()
     @blp.response(200, FoodLogWithFoodSchema(many=True))
     def get(self):
-        """Get all food logs for current user. Can filter by log_date or date range (start_day, end_day)"""
+        """Get all food logs for current user. Can filter by log_date or date range (start_day, end_day).
+        Pass limit (and then cursor) to page through results ordered by (log_date, id):
+        the cursor of the next page is returned in the X-Next-Cursor header.
+        Pass stream=true to receive every row as newline-delimited JSON instead."""
         from flask_jwt_extended import get_jwt_identity
         from flask import request
         user_id = get_jwt_identity()
 
-        log_date = request.args.get('log_date')
-        start_day = request.args.get('start_day')
-        end_day = request.args.get('end_day')
-        
-        result = food_log_service.get_all_food_logs(
-            user_id=user_id, 
-            log_date=log_date,
-            start_day=start_day,
-            end_day=end_day
-        )
+        filters = {
+            "user_id": user_id,
+            "log_date": request.args.get('log_date'),
+            "start_day": request.args.get('start_day'),
+            "end_day": request.args.get('end_day'),
+        }
+
+        if is_stream_requested():
+            return ndjson_response(food_log_service.stream_food_logs(**filters), FoodLogWithFoodSchema())
+
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            items, next_cursor = food_log_service.get_food_logs_page(**filters, cursor=cursor, limit=limit)
+            return items, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+        result = food_log_service.get_all_food_logs(**filters)
         return result
 
     @jwt_required()
@@ -47,6 +58,21 @@ class FoodLogList(MethodView):
         return result
 
 
+@blp.route("/food-logs/bulk")
+class FoodLogBulk(MethodView):
+    @jwt_required()
+    @blp.arguments(FoodLogCreateSchema(many=True))
+    @blp.response(201, FoodLogResponseSchema(many=True))
+    def post(self, food_logs_data):
+        """Create many food logs for current user in one request.
+        Items with a client_id are upserted, so retrying the same batch does not create duplicates"""
+        from flask_jwt_extended import get_jwt_identity
+        user_id = get_jwt_identity()
+
+        result = food_log_service.bulk_upsert_food_logs(user_id, food_logs_data)
+        return result
+
+
 @blp.route("/food-logs/<food_log_id>")
 class FoodLog(MethodView):
     @jwt_required()
@@ -2,8 +2,14 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 from flask_smorest import Blueprint
 
-from app.schemas.food_suggestion_schema import FoodSuggestionResponseSchema, FoodSuggestionRequestSchema
-from app.services import food_suggestion_service
+from app.models.enums import JobTypeEnum
+from app.schemas.food_suggestion_schema import (
+    FoodSuggestionJobRequestSchema,
+    FoodSuggestionResponseSchema,
+    FoodSuggestionRequestSchema
+)
+from app.schemas.job_schema import JobResponseSchema
+from app.services import food_suggestion_service, job_service
 
 blp = Blueprint("FoodSuggestion", __name__, description="Food Suggestion API")
 
@@ -14,11 +20,36 @@ class FoodSuggestion(MethodView):
     @blp.arguments(FoodSuggestionRequestSchema)
     @blp.response(200, FoodSuggestionResponseSchema)
     def post(self, food_suggestion_data):
-        """Generate a personalized food plan for the current user using AI"""
+        """Generate a personalized food plan for the current user using AI.
+        Kept for the clients expecting the plan in the response; it takes a
+        job slot while it runs, see POST /food-suggestions/jobs"""
         from flask_jwt_extended import get_jwt_identity
         user_id = get_jwt_identity()
 
         day_plan = food_suggestion_data.get("dayPlan")
         meal_type = food_suggestion_data.get("meal_type")
-        result = food_suggestion_service.suggest_food_plan(user_id, day_plan, meal_type)
+        payload = {"day_plan": day_plan, "meal_type": meal_type}
+        with job_service.running_in_request(user_id, JobTypeEnum.food_plan, payload):
+            result = food_suggestion_service.suggest_food_plan(user_id, day_plan, meal_type)
         return result
+
+
+@blp.route("/food-suggestions/jobs")
+class FoodSuggestionJob(MethodView):
+    @jwt_required()
+    @blp.arguments(FoodSuggestionJobRequestSchema)
+    @blp.response(202, JobResponseSchema)
+    def post(self, food_suggestion_data):
+        """Queue the generation of a food plan and return the job at once.
+        Poll GET /jobs/<job_id> (or pass callback_url) to get the result"""
+        from flask_jwt_extended import get_jwt_identity
+        user_id = get_jwt_identity()
+
+        payload = {
+            "day_plan": food_suggestion_data.get("dayPlan"),
+            "meal_type": food_suggestion_data.get("meal_type"),
+        }
+        job = job_service.enqueue_job(
+            user_id, JobTypeEnum.food_plan, payload, food_suggestion_data.get("callback_url")
+        )
+        return job, {"Location": f"/jobs/{job.id}"}
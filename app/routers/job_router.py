@@ -0,0 +1,26 @@
+from flask.views import MethodView
+from flask_jwt_extended import jwt_required
+from flask_smorest import Blueprint
+
+from app.schemas.job_schema import JobResponseSchema
+from app.services import job_service
+
+blp = Blueprint("Job", __name__, description="Background Job API")
+
+
+@blp.route("/jobs/<job_id>")
+class Job(MethodView):
+    @jwt_required()
+    @blp.response(200, JobResponseSchema)
+    def get(self, job_id):
+        """Get the status of a background job, with its result once succeeded"""
+        result = job_service.get_job(job_id)
+
+        # Check if user owns this job
+        from flask_jwt_extended import get_jwt_identity
+        current_user_id = get_jwt_identity()
+        if str(result.user_id) != current_user_id:
+            from flask_smorest import abort
+            abort(403, message="Access denied")
+
+        return result
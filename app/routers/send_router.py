@@ -1,8 +1,11 @@
 from flask.views import MethodView
+from flask_jwt_extended import get_jwt_identity, jwt_required
 from flask_smorest import Blueprint
 from app.services.mail_service import send_email
-from app.services.cron_service import send_daily_report
+from app.services.job_service import enqueue_daily_report
+from app.schemas.job_schema import JobResponseSchema
 from app.schemas.mail_schema import MailSendSchema
+from app.utils.decorators import permission_required
 
 blp = Blueprint("Mail", __name__, description="Mail Service API")
 
@@ -22,10 +25,9 @@ class SendMail(MethodView):
 
 @blp.route("/send/cron", methods=["POST"])
 class SendCronMail(MethodView):
-    @blp.response(200)
+    @jwt_required()
+    @permission_required(permission_name="send_daily_report")
+    @blp.response(202, JobResponseSchema)
     def post(self):
-        """Trigger daily report email manually"""
-        result = send_daily_report()
-        if not result:
-             return {"message": "Email skipped (CRON_TARGET_EMAIL not set)"}
-        return result
+        """Trigger the daily report emails to every user manually, sent by a job worker (admin only)"""
+        return enqueue_daily_report(get_jwt_identity())
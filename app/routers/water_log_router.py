@@ -8,6 +8,7 @@ from app.schemas.water_log_schema import (
     WaterLogUpdateSchema
 )
 from app.services import water_log_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, is_stream_requested, ndjson_response
 
 blp = Blueprint("WaterLog", __name__, description="Water Log API")
 
@@ -17,12 +18,29 @@ class WaterLogList(MethodView):
     @jwt_required()
     @blp.response(200, WaterLogResponseSchema(many=True))
     def get(self):
-        """Get all water logs for current user"""
+        """Get all water logs for current user. Can filter by log_date.
+        Pass limit (and then cursor) to page through results ordered by (log_date, id):
+        the cursor of the next page is returned in the X-Next-Cursor header.
+        Pass stream=true to receive every row as newline-delimited JSON instead."""
         from flask_jwt_extended import get_jwt_identity
+        from flask import request
         user_id = get_jwt_identity()
 
-        log_date = self.request.args.get('log_date')
-        result = water_log_service.get_all_water_logs(user_id=user_id, log_date=log_date)
+        filters = {
+            "user_id": user_id,
+            "log_date": request.args.get('log_date'),
+        }
+
+        if is_stream_requested():
+            return ndjson_response(water_log_service.stream_water_logs(**filters), WaterLogResponseSchema())
+
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            items, next_cursor = water_log_service.get_water_logs_page(**filters, cursor=cursor, limit=limit)
+            return items, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+        result = water_log_service.get_all_water_logs(**filters)
         return result
 
     @jwt_required()
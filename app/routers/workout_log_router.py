@@ -10,6 +10,7 @@ from app.schemas.workout_log_schema import (
     WorkoutLogStatusUpdateBodySchema
 )
 from app.services import workout_log_service
+from app.utils.pagination import NEXT_CURSOR_HEADER, is_stream_requested, ndjson_response
 
 blp = Blueprint("WorkoutLog", __name__, description="Workout Log API")
 
@@ -19,20 +20,30 @@ class WorkoutLogList(MethodView):
     @jwt_required()
     @blp.response(200, WorkoutLogResponseSchema(many=True))
     def get(self):
-        """Get all workout logs for current user. Can filter by log_date or date range (start_day, end_day)"""
+        """Get all workout logs for current user. Can filter by log_date or date range (start_day, end_day).
+        Pass limit (and then cursor) to page through results ordered by (log_date, id):
+        the cursor of the next page is returned in the X-Next-Cursor header.
+        Pass stream=true to receive every row as newline-delimited JSON instead."""
         from flask_jwt_extended import get_jwt_identity
         user_id = get_jwt_identity()
 
-        log_date = request.args.get('log_date')
-        start_day = request.args.get('start_day')
-        end_day = request.args.get('end_day')
-        
-        result = workout_log_service.get_all_workout_logs(
-            user_id=user_id, 
-            log_date=log_date,
-            start_day=start_day,
-            end_day=end_day
-        )
+        filters = {
+            "user_id": user_id,
+            "log_date": request.args.get('log_date'),
+            "start_day": request.args.get('start_day'),
+            "end_day": request.args.get('end_day'),
+        }
+
+        if is_stream_requested():
+            return ndjson_response(workout_log_service.stream_workout_logs(**filters), WorkoutLogResponseSchema())
+
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        if limit is not None or cursor:
+            items, next_cursor = workout_log_service.get_workout_logs_page(**filters, cursor=cursor, limit=limit)
+            return items, {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+        result = workout_log_service.get_all_workout_logs(**filters)
         return result
 
     @jwt_required()
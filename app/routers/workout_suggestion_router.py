@@ -2,11 +2,14 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 from flask_smorest import Blueprint
 
+from app.models.enums import JobTypeEnum
+from app.schemas.job_schema import JobResponseSchema
 from app.schemas.workout_suggestion_schema import (
+    WorkoutSuggestionJobRequestSchema,
     WorkoutSuggestionResponseSchema,
     WorkoutSuggestionRequestSchema
 )
-from app.services import workout_suggestion_service
+from app.services import job_service, workout_suggestion_service
 
 blp = Blueprint("WorkoutSuggestion", __name__, description="Workout Suggestion API")
 
@@ -17,12 +20,37 @@ class WorkoutSuggestion(MethodView):
     @blp.arguments(WorkoutSuggestionRequestSchema)
     @blp.response(200, WorkoutSuggestionResponseSchema)
     def post(self, suggestion_data):
-        """Generate a personalized workout plan for the current user using AI"""
+        """Generate a personalized workout plan for the current user using AI.
+        Kept for the clients expecting the plan in the response; it takes a
+        job slot while it runs, see POST /workout-suggestions/jobs"""
         from flask_jwt_extended import get_jwt_identity
         user_id = get_jwt_identity()
 
         start_day = suggestion_data.get('start_day')
         end_day = suggestion_data.get('end_day')
 
-        result = workout_suggestion_service.suggest_workout_plan(user_id, start_day, end_day)
+        payload = {"start_day": start_day, "end_day": end_day}
+        with job_service.running_in_request(user_id, JobTypeEnum.workout_plan, payload):
+            result = workout_suggestion_service.suggest_workout_plan(user_id, start_day, end_day)
         return result
+
+
+@blp.route("/workout-suggestions/jobs")
+class WorkoutSuggestionJob(MethodView):
+    @jwt_required()
+    @blp.arguments(WorkoutSuggestionJobRequestSchema)
+    @blp.response(202, JobResponseSchema)
+    def post(self, suggestion_data):
+        """Queue the generation of a workout plan and return the job at once.
+        Poll GET /jobs/<job_id> (or pass callback_url) to get the result"""
+        from flask_jwt_extended import get_jwt_identity
+        user_id = get_jwt_identity()
+
+        payload = {
+            "start_day": suggestion_data.get('start_day'),
+            "end_day": suggestion_data.get('end_day'),
+        }
+        job = job_service.enqueue_job(
+            user_id, JobTypeEnum.workout_plan, payload, suggestion_data.get("callback_url")
+        )
+        return job, {"Location": f"/jobs/{job.id}"}
@@ -1,10 +1,18 @@
 from marshmallow import Schema, fields, validate
 
+from app.schemas.goal_schema import GoalResponseSchema
+from app.schemas.user_profile_schema import UserProfileResponseSchema
+
+
 class AnalyticsRequestSchema(Schema):
     mode = fields.Int(validate=validate.OneOf([1, 7, 30]), missing=7, description="Number of days to analyze (1, 7 or 30)")
+    start = fields.Date(description="Start date (YYYY-MM-DD). Use together with end instead of mode")
+    end = fields.Date(description="End date (YYYY-MM-DD). Use together with start instead of mode")
+    bucket = fields.Str(validate=validate.OneOf(["day", "week", "month"]), missing="day", description="Group results by day, week or month")
+
 
 class AnalyticsItemSchema(Schema):
-    day = fields.Date(dump_only=True)
+    day = fields.Date(dump_only=True, description="Day, or first day (Monday, 1st) of the week/month bucket, which may precede start")
     calories = fields.Int(dump_only=True)
     carbs = fields.Float(dump_only=True)
     fat = fields.Float(dump_only=True)
@@ -15,7 +23,7 @@ class AnalyticsResponseSchema(Schema):
 
 
 class AnalyticsWorkoutItemSchema(Schema):
-    day = fields.Date(dump_only=True)
+    day = fields.Date(dump_only=True, description="Day, or first day (Monday, 1st) of the week/month bucket, which may precede start")
     duration_min = fields.Int(dump_only=True)
     calo = fields.Int(dump_only=True)
     status = fields.Int(dump_only=True, allow_none=True)
@@ -23,3 +31,31 @@ class AnalyticsWorkoutItemSchema(Schema):
 
 class AnalyticsWorkoutResponseSchema(Schema):
     data = fields.List(fields.Nested(AnalyticsWorkoutItemSchema), dump_only=True)
+
+
+class DashboardRequestSchema(Schema):
+    date = fields.Date(description="Day shown on the dashboard (YYYY-MM-DD), defaults to today")
+    mode = fields.Int(validate=validate.OneOf([1, 7, 30]), missing=7, description="Number of days of analytics ending at date (1, 7 or 30)")
+
+
+class DashboardWaterSchema(Schema):
+    date = fields.Date(dump_only=True)
+    total_ml = fields.Int(dump_only=True)
+
+
+class DashboardCalorieProgressSchema(Schema):
+    consumed = fields.Int(dump_only=True)
+    burned = fields.Int(dump_only=True)
+    target = fields.Int(dump_only=True, allow_none=True)
+    remaining = fields.Int(dump_only=True, allow_none=True)
+    percent = fields.Float(dump_only=True, allow_none=True)
+
+
+class DashboardResponseSchema(Schema):
+    date = fields.Date(dump_only=True)
+    nutrition = fields.List(fields.Nested(AnalyticsItemSchema), dump_only=True)
+    workout = fields.List(fields.Nested(AnalyticsWorkoutItemSchema), dump_only=True)
+    water = fields.Nested(DashboardWaterSchema, dump_only=True)
+    goal = fields.Nested(GoalResponseSchema, dump_only=True, allow_none=True)
+    profile = fields.Nested(UserProfileResponseSchema, dump_only=True, allow_none=True)
+    calorie_progress = fields.Nested(DashboardCalorieProgressSchema, dump_only=True)
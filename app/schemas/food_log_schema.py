@@ -16,6 +16,7 @@ class PlainFoodLogSchema(Schema):
     carbs = fields.Float(allow_none=True)
     fat = fields.Float(allow_none=True)
     status = fields.Int(dump_only=True)
+    client_id = fields.Str(dump_only=True, allow_none=True)
 
 
 class FoodLogCreateSchema(Schema):
@@ -28,6 +29,7 @@ class FoodLogCreateSchema(Schema):
     carbs = fields.Float(allow_none=True)
     fat = fields.Float(allow_none=True)
     status = fields.Int(missing=1)
+    client_id = fields.Str(validate=validate.Length(min=1, max=64), allow_none=True, description="Client-generated key, makes bulk sync retries idempotent")
 
 
 class FoodLogUpdateSchema(Schema):
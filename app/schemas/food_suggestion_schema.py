@@ -2,6 +2,7 @@ from marshmallow import Schema, fields
 
 from app.models.enums import MealTypeEnum
 from app.schemas.food_log_schema import PlainFoodLogSchema
+from app.schemas.job_schema import JobCallbackSchema
 
 
 class FoodSuggestionRequestSchema(Schema):
@@ -9,6 +10,10 @@ class FoodSuggestionRequestSchema(Schema):
     meal_type = fields.Str(allow_none=True, description="Meal type (breakfast, lunch, dinner, snack) or 'all'")
 
 
+class FoodSuggestionJobRequestSchema(FoodSuggestionRequestSchema, JobCallbackSchema):
+    pass
+
+
 class FoodSuggestionItemSchema(Schema):
     log = fields.Nested(PlainFoodLogSchema, allow_none=True, dump_only=True)
     name = fields.Str(dump_only=True)
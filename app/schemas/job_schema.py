@@ -0,0 +1,25 @@
+from marshmallow import Schema, fields
+
+from app.models.enums import JobStatusEnum, JobTypeEnum
+
+
+class JobCallbackSchema(Schema):
+    callback_url = fields.Url(
+        schemes={"http", "https"},
+        require_tld=False,
+        allow_none=True,
+        description="Public URL (or a host of JOB_CALLBACK_ALLOWED_HOSTS) receiving a POST with the job once it is finished"
+    )
+
+
+class JobResponseSchema(Schema):
+    id = fields.Str(dump_only=True)
+    user_id = fields.Str(dump_only=True)
+    type = fields.Enum(JobTypeEnum, dump_only=True)
+    status = fields.Enum(JobStatusEnum, dump_only=True, description="queued, running, succeeded or failed")
+    result = fields.Raw(allow_none=True, dump_only=True, description="Same body as the synchronous endpoint, once succeeded")
+    error = fields.Str(allow_none=True, dump_only=True)
+    attempts = fields.Int(dump_only=True)
+    created_at = fields.DateTime(dump_only=True)
+    started_at = fields.DateTime(allow_none=True, dump_only=True)
+    finished_at = fields.DateTime(allow_none=True, dump_only=True)
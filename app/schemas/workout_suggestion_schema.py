@@ -1,11 +1,17 @@
 from marshmallow import Schema, fields
 
+from app.schemas.job_schema import JobCallbackSchema
+
 
 class WorkoutSuggestionRequestSchema(Schema):
     start_day = fields.Str(required=False, description="Start date for workout plan (YYYY-MM-DD)")
     end_day = fields.Str(required=False, description="End date for workout plan (YYYY-MM-DD)")
 
 
+class WorkoutSuggestionJobRequestSchema(WorkoutSuggestionRequestSchema, JobCallbackSchema):
+    pass
+
+
 class WorkoutSuggestionWorkoutInfoSchema(Schema):
     id = fields.Str(dump_only=True)
     name = fields.Str(dump_only=True)
@@ -1,31 +1,44 @@
 import logging
-import os
 import json
+from collections import namedtuple
+from datetime import datetime
+
+from flask import after_this_request, current_app, has_request_context
 from flask_smorest import abort
-from openai import OpenAI
 
 from app.db import db
 from app.models.ai_message_model import AIMessageModel
 from app.models.conversation_model import ConversationModel
 from app.models.enums import AIRoleEnum
-from app.services import user_profile_service
+from app.services import llm_client, user_profile_service
+from app.utils.tokens import estimate_message_tokens, estimate_tokens
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = None
+# Estimated tokens of the whole prompt: system prompt, summary, history and question
+CONTEXT_TOKEN_BUDGET = 3000
+
+# Most recent messages considered for the history of a request
+HISTORY_FETCH_LIMIT = 40
+
+# Messages left out of the history are folded into the conversation summary
+# once there are this many of them, in one extra model call
+SUMMARY_BATCH_SIZE = 6
+SUMMARY_MAX_TOKENS = 300
+# Oldest messages folded into the summary by one call at most; the next
+# ones are folded by the next requests
+SUMMARY_FETCH_LIMIT = 200
 
-def get_openai_client():
-    """Initialize and return OpenAI client"""
-    global openai_client
-    if openai_client is None:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            logger.error("OPENAI_API_KEY not found in environment variables")
-            abort(500, message="OpenAI API key not configured")
-        openai_client = OpenAI(api_key=api_key)
-    return openai_client
+# Copy of a message left out of the history, still readable once the commit
+# of the exchange expired the model instances
+OverflowMessage = namedtuple("OverflowMessage", ["role", "content", "created_at"])
+
+# Roles of the stored messages in the chat API
+CHAT_ROLES = {
+    AIRoleEnum.user: "user",
+    AIRoleEnum.ai: "assistant",
+}
 
 
 def get_or_create_conversation(user_id):
@@ -40,91 +53,325 @@ def get_or_create_conversation(user_id):
         conversation = ConversationModel(user_id=user_id)
         db.session.add(conversation)
         db.session.flush()
-        logger.info(f"Created new conversation for user {user_id}")
+        logger.info("Created new conversation for user %s", user_id)
     
     return conversation
 
 
+def _unsummarized_messages(conversation, until, inclusive=False):
+    """
+    Return the oldest SUMMARY_FETCH_LIMIT messages of a conversation after its
+    summary and before 'until' (or up to it, with 'inclusive'), oldest first
+    """
+    query = db.session.query(
+        AIMessageModel.role, AIMessageModel.content, AIMessageModel.created_at
+    ).filter(
+        AIMessageModel.conversation_id == conversation.id,
+        AIMessageModel.created_at <= until if inclusive else AIMessageModel.created_at < until
+    )
+    if conversation.summarized_until:
+        query = query.filter(AIMessageModel.created_at > conversation.summarized_until)
+    rows = query.order_by(AIMessageModel.created_at).limit(SUMMARY_FETCH_LIMIT).all()
+    return [OverflowMessage(*row) for row in rows]
+
+
+def build_history(conversation, token_budget):
+    """
+    Split the messages of a conversation not yet summarized into the most
+    recent ones fitting in token_budget (the history sent to the model) and
+    the older ones left out (to be folded into the summary, as OverflowMessage
+    copies). Both are in chronological order. Messages older than the
+    HISTORY_FETCH_LIMIT most recent ones are left out too.
+    """
+    if conversation is None:
+        return [], []
+
+    query = AIMessageModel.query.filter(AIMessageModel.conversation_id == conversation.id)
+    if conversation.summarized_until:
+        query = query.filter(AIMessageModel.created_at > conversation.summarized_until)
+    recent_messages = query.order_by(AIMessageModel.created_at.desc()).limit(HISTORY_FETCH_LIMIT).all()
+
+    history = []
+    used = 0
+    for message in recent_messages:
+        tokens = estimate_message_tokens({"content": message.content})
+        if used + tokens > token_budget:
+            break
+        history.append(message)
+        used += tokens
+
+    if len(recent_messages) == HISTORY_FETCH_LIMIT:
+        # There may be older messages than the fetched ones
+        if history:
+            overflow = _unsummarized_messages(conversation, history[-1].created_at)
+        else:
+            overflow = _unsummarized_messages(conversation, recent_messages[0].created_at, inclusive=True)
+    else:
+        overflow = [
+            OverflowMessage(message.role, message.content, message.created_at)
+            for message in reversed(recent_messages[len(history):])
+        ]
+
+    return list(reversed(history)), overflow
+
+
+def build_chat_messages(user_id, message_text):
+    """
+    Build the messages sent to the model: a system prompt carrying the user's
+    profile and the conversation summary, the most recent messages of the
+    conversation that fit in CONTEXT_TOKEN_BUDGET, then the user's question.
+    Also returns the conversation and the messages left out of the history.
+    """
+    user_profile = user_profile_service.get_user_profile(user_id)
+    user_context = "Người dùng chưa có profile."
+    if user_profile:
+        user_context = f"""
+        Thông tin người dùng:
+        - Tuổi: {user_profile.age}
+        - Giới tính: {user_profile.gender.value if user_profile.gender else 'N/A'}
+        - Chiều cao: {user_profile.height_cm} cm
+        - Cân nặng: {user_profile.weight_kg} kg
+        - BMI: {user_profile.bmi}
+        - Mức độ hoạt động: {user_profile.activity_level.value if user_profile.activity_level else 'N/A'}
+        - Mục tiêu: {json.dumps(user_profile.target, ensure_ascii=False) if user_profile.target else 'Không có'}
+        """
+
+    system_prompt = f"""Bạn là một chuyên gia tư vấn sức khỏe và dinh dưỡng cá nhân. 
+    Dưới đây là hồ sơ của người dùng bạn đang trò chuyện cùng:
+    {user_context}
+    
+    Hãy trả lời các câu hỏi của người dùng một cách chuyên nghiệp, hữu ích và dựa trên thông tin cá nhân của họ nếu có thể."""
+
+    conversation = ConversationModel.query.filter_by(user_id=user_id).order_by(
+        ConversationModel.created_at.desc()
+    ).first()
+    if conversation and conversation.summary:
+        system_prompt += f"""
+
+    Tóm tắt cuộc trò chuyện trước đó:
+    {conversation.summary}"""
+
+    system_message = {"role": "system", "content": system_prompt}
+    question = {"role": "user", "content": message_text}
+
+    token_budget = CONTEXT_TOKEN_BUDGET - estimate_message_tokens(system_message) - estimate_message_tokens(question)
+    history, overflow = build_history(conversation, max(token_budget, 0))
+
+    messages = [system_message]
+    messages += [{"role": CHAT_ROLES[message.role], "content": message.content} for message in history]
+    messages.append(question)
+    return messages, conversation, overflow
+
+
+def summarize_overflow(conversation, overflow):
+    """
+    Fold the messages left out of the history (OverflowMessage copies, oldest
+    first) into the rolling summary of the conversation, once
+    SUMMARY_BATCH_SIZE of them piled up. A failure only
+    delays the summary: the messages stay out of the history until the next try.
+    """
+    if conversation is None:
+        return
+    if conversation.summarized_until:
+        overflow = [message for message in overflow if message.created_at > conversation.summarized_until]
+    if len(overflow) < SUMMARY_BATCH_SIZE:
+        return
+
+    transcript = "\n".join(
+        f"{'Người dùng' if message.role == AIRoleEnum.user else 'Trợ lý'}: {message.content}"
+        for message in overflow
+    )
+    prompt = f"""Tóm tắt cuộc trò chuyện sau giữa người dùng và trợ lý sức khỏe, dinh dưỡng.
+Giữ lại các thông tin quan trọng cho các câu trả lời sau: mục tiêu, sở thích, tình trạng sức khỏe, lời khuyên đã đưa ra.
+Viết ngắn gọn, tối đa 150 từ, không thêm lời dẫn.
+
+Tóm tắt trước đó: {conversation.summary or 'Không có'}
+
+Đoạn hội thoại mới:
+{transcript}"""
+
+    try:
+        response = llm_client.chat_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=SUMMARY_MAX_TOKENS
+        )
+        summary = response.choices[0].message.content
+
+        # Only move forward from the summary this one was built on: a
+        # concurrent request may have folded the same messages already
+        updated = ConversationModel.query.filter(
+            ConversationModel.id == conversation.id,
+            ConversationModel.summarized_until.is_(None) if conversation.summarized_until is None
+            else ConversationModel.summarized_until == conversation.summarized_until
+        ).update(
+            {"summary": summary, "summarized_until": overflow[-1].created_at},
+            synchronize_session=False
+        )
+        db.session.commit()
+        if updated and logger.isEnabledFor(logging.INFO):
+            logger.info("Folded %s messages into the summary of conversation %s (%s tokens)",
+                        len(overflow), conversation.id, estimate_tokens(summary))
+
+    except Exception as ex:
+        db.session.rollback()
+        logger.warning(f"Failed to summarize conversation {conversation.id}: {ex}")
+
+
+def summarize_after_response(conversation_id, overflow):
+    """
+    Run summarize_overflow once the response is sent, so the extra model call
+    does not delay the answer. Outside of a request it runs at once.
+    """
+    if conversation_id is None or len(overflow) < SUMMARY_BATCH_SIZE:
+        return
+
+    app = current_app._get_current_object()
+
+    def summarize():
+        with app.app_context():
+            try:
+                conversation = db.session.get(ConversationModel, conversation_id)
+            except Exception as ex:
+                logger.warning(f"Failed to load conversation {conversation_id} to summarize: {ex}")
+                return
+            summarize_overflow(conversation, overflow)
+
+    if not has_request_context():
+        summarize()
+        return
+
+    @after_this_request
+    def summarize_on_close(response):
+        response.call_on_close(summarize)
+        return response
+
+
+def save_exchange(user_id, message_text, ai_content, asked_at):
+    """
+    Save the user message and the AI answer in the user's conversation, in one commit.
+    asked_at keeps the question ordered before the answer.
+    """
+    conversation = get_or_create_conversation(user_id)
+
+    user_message = AIMessageModel(
+        user_id=user_id,
+        conversation_id=conversation.id,
+        role=AIRoleEnum.user,
+        content=message_text,
+        created_at=asked_at
+    )
+    ai_message = AIMessageModel(
+        user_id=user_id,
+        conversation_id=conversation.id,
+        role=AIRoleEnum.ai,
+        content=ai_content
+    )
+    db.session.add_all([user_message, ai_message])
+    db.session.commit()
+    return ai_message
+
+
 def ask_ai(user_id, message_text):
     """
-    Save user message, get AI response using user profile context, and save AI message.
+    Get AI response using user profile context, then save the user message and the AI message.
     """
+    asked_at = datetime.utcnow()
     try:
-        # 0. Get or create conversation
-        conversation = get_or_create_conversation(user_id)
+        messages, conversation, overflow = build_chat_messages(user_id, message_text)
+        conversation_id = conversation.id if conversation else None
 
-        # 1. Save user message
-        user_message = AIMessageModel(
-            user_id=user_id,
-            conversation_id=conversation.id,
-            role=AIRoleEnum.user,
-            content=message_text
-        )
-        db.session.add(user_message)
-        db.session.flush() 
-
-        # 2. Get user profile for context
-        user_profile = user_profile_service.get_user_profile(user_id)
-        user_context = "Người dùng chưa có profile."
-        if user_profile:
-            user_context = f"""
-            Thông tin người dùng:
-            - Tuổi: {user_profile.age}
-            - Giới tính: {user_profile.gender.value if user_profile.gender else 'N/A'}
-            - Chiều cao: {user_profile.height_cm} cm
-            - Cân nặng: {user_profile.weight_kg} kg
-            - BMI: {user_profile.bmi}
-            - Mức độ hoạt động: {user_profile.activity_level.value if user_profile.activity_level else 'N/A'}
-            - Mục tiêu: {json.dumps(user_profile.target, ensure_ascii=False) if user_profile.target else 'Không có'}
-            """
-
-        # 3. Call OpenAI
-        client = get_openai_client()
-        system_prompt = f"""Bạn là một chuyên gia tư vấn sức khỏe và dinh dưỡng cá nhân. 
-        Dưới đây là hồ sơ của người dùng bạn đang trò chuyện cùng:
-        {user_context}
-        
-        Hãy trả lời các câu hỏi của người dùng một cách chuyên nghiệp, hữu ích và dựa trên thông tin cá nhân của họ nếu có thể."""
-
-        response = client.chat.completions.create(
+        response = llm_client.chat_completion(
             model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": message_text}
-            ],
+            messages=messages,
             temperature=0.7
         )
-
         ai_content = response.choices[0].message.content
 
-        # 4. Save AI response
-        ai_message = AIMessageModel(
-            user_id=user_id,
-            conversation_id=conversation.id,
-            role=AIRoleEnum.ai,
-            content=ai_content
-        )
-        db.session.add(ai_message)
-        db.session.commit()
+        ai_message = save_exchange(user_id, message_text, ai_content, asked_at)
 
-        logger.info(f"AI response generated and saved for user {user_id}")
+        logger.info("AI response generated and saved for user %s", user_id)
+        summarize_after_response(conversation_id, overflow)
         return ai_message
 
+    except llm_client.LLMUnavailableError as ex:
+        db.session.rollback()
+        logger.error(f"OpenAI unavailable while asking AI: {ex}")
+        abort(503, message="AI service is temporarily unavailable, please try again later")
     except Exception as ex:
         db.session.rollback()
         logger.error(f"Failed to ask AI: {ex}")
         abort(500, message=f"Failed to get AI response: {str(ex)}")
 
+
+def ask_ai_stream(user_id, message_text):
+    """
+    Streaming variant of ask_ai. Waits for the model's first token, then
+    returns a generator of (event, data) pairs: one "delta" per chunk of text,
+    then "done" with the saved AI message, or "error" if the stream breaks.
+    The messages are saved only once the answer is complete.
+    """
+    asked_at = datetime.utcnow()
+    messages, conversation, overflow = build_chat_messages(user_id, message_text)
+
+    # Return the connection to the pool while the model is answering
+    db.session.close()
+
+    deltas = llm_client.stream_chat_completion(
+        model="gpt-4o-mini",
+        messages=messages,
+        temperature=0.7
+    )
+    try:
+        # Failing before the first token can still be reported with a status code
+        first_delta = next(deltas, "")
+    except llm_client.LLMUnavailableError as ex:
+        logger.error(f"OpenAI unavailable while asking AI: {ex}")
+        abort(503, message="AI service is temporarily unavailable, please try again later")
+    except Exception as ex:
+        logger.error(f"Failed to ask AI: {ex}")
+        abort(500, message=f"Failed to get AI response: {str(ex)}")
+
+    def events():
+        parts = [first_delta]
+        try:
+            if first_delta:
+                yield "delta", {"content": first_delta}
+            for delta in deltas:
+                parts.append(delta)
+                yield "delta", {"content": delta}
+
+            ai_message = save_exchange(user_id, message_text, "".join(parts), asked_at)
+            logger.info("AI response streamed and saved for user %s", user_id)
+            yield "done", ai_message
+
+            # After "done": the client has its answer, only the stream stays open
+            summarize_overflow(conversation, overflow)
+
+        except llm_client.LLMUnavailableError as ex:
+            db.session.rollback()
+            logger.error(f"OpenAI stream failed for user {user_id}: {ex}")
+            yield "error", {"message": "AI service is temporarily unavailable, please try again later"}
+        except Exception as ex:
+            db.session.rollback()
+            logger.error(f"Failed to stream AI response: {ex}")
+            yield "error", {"message": f"Failed to get AI response: {str(ex)}"}
+        finally:
+            # Cancels the upstream request if the client went away mid-stream
+            deltas.close()
+
+    return events()
+
 def get_all_ai_messages(user_id=None):
     """
     Get all AI messages. If user_id is provided, find messages belonging to the user's conversations.
     """
     if user_id:
-        # Find all conversations for this user
-        conversations = ConversationModel.query.filter_by(user_id=user_id).all()
-        conversation_ids = [c.id for c in conversations]
-        
-        # Find all messages linked to these conversations
+        # Messages linked to the user's conversations, in a single query
+        conversation_ids = db.select(ConversationModel.id).where(
+            ConversationModel.user_id == user_id
+        ).scalar_subquery()
         return AIMessageModel.query.filter(
             AIMessageModel.conversation_id.in_(conversation_ids)
         ).order_by(AIMessageModel.created_at).all()
@@ -160,7 +407,7 @@ def create_ai_message(user_id, ai_message_data):
         db.session.add(ai_message)
         db.session.commit()
 
-        logger.info(f"AI message created successfully with id: {ai_message.id}")
+        logger.info("AI message created successfully with id: %s", ai_message.id)
         return ai_message
 
     except Exception as ex:
@@ -187,7 +434,7 @@ def update_ai_message(ai_message_id, ai_message_data):
 
         db.session.commit()
 
-        logger.info(f"AI message updated successfully with id: {ai_message_id}")
+        logger.info("AI message updated successfully with id: %s", ai_message_id)
         return ai_message
 
     except Exception as ex:
@@ -210,7 +457,7 @@ def delete_ai_message(ai_message_id):
         db.session.delete(ai_message)
         db.session.commit()
 
-        logger.info(f"AI message deleted successfully with id: {ai_message_id}")
+        logger.info("AI message deleted successfully with id: %s", ai_message_id)
         return {"message": "AI message deleted successfully"}
 
     except Exception as ex:
@@ -239,7 +486,7 @@ def delete_conversation_history(user_id):
         deleted_count = AIMessageModel.query.filter_by(user_id=user_id).delete()
         db.session.commit()
 
-        logger.info(f"Deleted {deleted_count} AI messages for user {user_id}")
+        logger.info("Deleted %s AI messages for user %s", deleted_count, user_id)
         return {"message": f"Deleted {deleted_count} AI messages"}
 
     except Exception as ex:
@@ -1,134 +1,281 @@
 from datetime import date, timedelta
-from sqlalchemy import func
+from flask_smorest import abort
+from sqlalchemy import Date, DateTime, case, cast, func
+from sqlalchemy.dialects.postgresql import INTERVAL
 from app.db import db
-from app.models.food_log_model import FoodLogModel
+from app.models.daily_nutrition_summary_model import DailyNutritionSummaryModel
+from app.models.water_log_model import WaterLogModel
 from app.models.workout_log_model import WorkoutLogModel
+from app.services import goal_service, user_profile_service, water_log_service
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_nutrition_analytics(user_id, mode=7):
+# Workout status stored for each rank of the priority expression
+STATUS_BY_RANK = {2: 1, 1: 2, 0: 0}
+
+# Longest window accepted for start/end queries (about 3 years)
+MAX_RANGE_DAYS = 3 * 366
+
+# Step of the generated series for each supported bucket
+BUCKET_INTERVALS = {
+    "day": "1 day",
+    "week": "1 week",
+    "month": "1 month",
+}
+
+
+def resolve_date_range(mode=7, start=None, end=None):
     """
-    Get nutrition analytics for the last 'mode' days.
-    Returns a list of daily stats (calories, carbs, fat, protein).
+    Return the (start_date, end_date) window to analyze.
+    An explicit start/end wins, otherwise the last 'mode' days including today.
+    Aborts with 400 when only one of start/end is given, when start is after
+    end, or when the window is longer than MAX_RANGE_DAYS.
     """
+    if (start is None) != (end is None):
+        abort(400, message="start and end must be provided together")
+    if start and end:
+        if start > end:
+            abort(400, message="start must be before end")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            abort(400, message=f"Date range must be at most {MAX_RANGE_DAYS} days")
+        return start, end
+
     end_date = date.today()
     start_date = end_date - timedelta(days=mode - 1) # Include today, so subtract mode-1
+    return start_date, end_date
+
+
+def _bucket_start(bucket, column):
+    """date_trunc() of a date column/value to the start of its bucket"""
+    return func.date_trunc(bucket, cast(column, DateTime))
 
-    # Query to sum up nutrients by date
-    # We use func.sum and func.date for grouping
-    logs = db.session.query(
-        FoodLogModel.log_date,
-        func.sum(FoodLogModel.calories).label('total_calories'),
-        func.sum(FoodLogModel.protein).label('total_protein'),
-        func.sum(FoodLogModel.carbs).label('total_carbs'),
-        func.sum(FoodLogModel.fat).label('total_fat')
+
+def _bucket_series(start_date, end_date, bucket):
+    """
+    Table-valued generate_series() with one row per bucket in the window,
+    used to fill gaps in SQL instead of looping over every day in Python.
+    Buckets are labeled by their first day (Monday, or the 1st of the month),
+    so the first one may start before start_date: it only holds the days
+    from start_date on (start=2024-01-03, bucket=week gives 2024-01-01 with
+    the totals of the 3rd to the 7th). The last one likewise ends at end_date.
+    """
+    return func.generate_series(
+        _bucket_start(bucket, start_date),
+        _bucket_start(bucket, end_date),
+        cast(BUCKET_INTERVALS[bucket], INTERVAL)
+    ).table_valued("bucket").render_derived()
+
+
+def get_nutrition_analytics(user_id, mode=7, start=None, end=None, bucket="day"):
+    """
+    Get nutrition analytics for the last 'mode' days, or for start..end.
+    Returns a list of stats (calories, carbs, fat, protein) per day, week or month bucket.
+    """
+    start_date, end_date = resolve_date_range(mode, start, end)
+
+    # Sum the pre-aggregated daily rows per bucket
+    period = _bucket_start(bucket, DailyNutritionSummaryModel.log_date).label("bucket")
+    totals = db.session.query(
+        period,
+        func.sum(DailyNutritionSummaryModel.total_calories).label('total_calories'),
+        func.sum(DailyNutritionSummaryModel.total_protein).label('total_protein'),
+        func.sum(DailyNutritionSummaryModel.total_carbs).label('total_carbs'),
+        func.sum(DailyNutritionSummaryModel.total_fat).label('total_fat')
     ).filter(
-        FoodLogModel.user_id == user_id,
-        FoodLogModel.log_date >= start_date,
-        FoodLogModel.log_date <= end_date
+        DailyNutritionSummaryModel.user_id == user_id,
+        DailyNutritionSummaryModel.log_date >= start_date,
+        DailyNutritionSummaryModel.log_date <= end_date
     ).group_by(
-        FoodLogModel.log_date
+        period
+    ).subquery()
+
+    # Left join onto the bucket series so empty buckets come back as zeros
+    series = _bucket_series(start_date, end_date, bucket)
+    rows = db.session.query(
+        cast(series.c.bucket, Date).label('day'),
+        func.coalesce(totals.c.total_calories, 0).label('calories'),
+        func.coalesce(totals.c.total_protein, 0.0).label('protein'),
+        func.coalesce(totals.c.total_carbs, 0.0).label('carbs'),
+        func.coalesce(totals.c.total_fat, 0.0).label('fat')
+    ).select_from(
+        series
+    ).outerjoin(
+        totals, totals.c.bucket == series.c.bucket
+    ).order_by(
+        series.c.bucket
     ).all()
 
-    # Convert query results to a dictionary for easy lookup
-    data_map = {
-        log.log_date: {
-            "calories": int(log.total_calories) if log.total_calories else 0,
-            "protein": float(log.total_protein) if log.total_protein else 0.0,
-            "carbs": float(log.total_carbs) if log.total_carbs else 0.0,
-            "fat": float(log.total_fat) if log.total_fat else 0.0
+    return [
+        {
+            "day": row.day,
+            "calories": int(row.calories),
+            "protein": float(row.protein),
+            "carbs": float(row.carbs),
+            "fat": float(row.fat)
         }
-        for log in logs
-    }
+        for row in rows
+    ]
+
 
-    # Generate the full list of dates including missing ones
-    result = []
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date in data_map:
-            stats = data_map[current_date]
-            result.append({
-                "day": current_date,
-                **stats
-            })
-        else:
-            result.append({
-                "day": current_date,
-                "calories": 0,
-                "protein": 0.0,
-                "carbs": 0.0,
-                "fat": 0.0
-            })
-        current_date += timedelta(days=1)
-
-    return result
-
-
-def get_workout_analytics(user_id, mode=7):
+def get_workout_analytics(user_id, mode=7, start=None, end=None, bucket="day"):
     """
-    Get workout analytics for the last 'mode' days.
-    Returns a list of daily stats (duration_min, calo).
+    Get workout analytics for the last 'mode' days, or for start..end.
+    Returns a list of stats (duration_min, calo, status) per day, week or month bucket.
     """
-    end_date = date.today()
-    start_date = end_date - timedelta(days=mode - 1)
+    start_date, end_date = resolve_date_range(mode, start, end)
+
+    # Status priority: Completed (1) > Skipped (2) > Planned (0)
+    status_rank = case(
+        (WorkoutLogModel.status == 1, 2),
+        (WorkoutLogModel.status == 2, 1),
+        else_=0
+    )
 
-        # Query all logs for the period without grouping
-    logs = db.session.query(WorkoutLogModel).filter(
+    # Aggregate by bucket in SQL, selecting only the columns we need
+    period = _bucket_start(bucket, WorkoutLogModel.log_date).label("bucket")
+    totals = db.session.query(
+        period,
+        func.sum(WorkoutLogModel.duration_min).label('total_duration'),
+        func.sum(WorkoutLogModel.calories_burned).label('total_calories'),
+        func.max(status_rank).label('status_rank')
+    ).filter(
         WorkoutLogModel.user_id == user_id,
         WorkoutLogModel.log_date >= start_date,
         WorkoutLogModel.log_date <= end_date
+    ).group_by(
+        period
+    ).subquery()
+
+    # Left join onto the bucket series so empty buckets come back as zeros
+    series = _bucket_series(start_date, end_date, bucket)
+    rows = db.session.query(
+        cast(series.c.bucket, Date).label('day'),
+        func.coalesce(totals.c.total_duration, 0).label('duration_min'),
+        func.coalesce(totals.c.total_calories, 0).label('calo'),
+        func.coalesce(totals.c.status_rank, 0).label('status_rank')
+    ).select_from(
+        series
+    ).outerjoin(
+        totals, totals.c.bucket == series.c.bucket
+    ).order_by(
+        series.c.bucket
     ).all()
 
-    # Aggregate by date in Python
-    # Map: date -> {duration_min: sum, calo: sum, statuses: set()}
-    daily_data = {}
-    
-    for log in logs:
-        if log.log_date not in daily_data:
-            daily_data[log.log_date] = {
-                "duration_min": 0,
-                "calo": 0,
-                "statuses": set()
-            }
-        
-        daily_data[log.log_date]["duration_min"] += log.duration_min
-        if log.calories_burned:
-            daily_data[log.log_date]["calo"] += log.calories_burned
-        if log.status is not None:
-            daily_data[log.log_date]["statuses"].add(log.status)
-
-    # Generate full list
-    result = []
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date in daily_data:
-            stats = daily_data[current_date]
-            
-            # Determine status priority: Completed (1) > Skipped (2) > Planned (0)
-            status_set = stats["statuses"]
-            final_status = None
-            
-            if 1 in status_set:
-                final_status = 1
-            elif 2 in status_set:
-                final_status = 2
-            else:
-                final_status = 0
-                
-            result.append({
-                "day": current_date,
-                "duration_min": stats["duration_min"],
-                "calo": stats["calo"],
-                "status": final_status
-            })
-        else:
-            result.append({
-                "day": current_date,
-                "duration_min": 0,
-                "calo": 0,
-                "status": 0
-            })
-        current_date += timedelta(days=1)
-
-    return result
+    return [
+        {
+            "day": row.day,
+            "duration_min": int(row.duration_min),
+            "calo": int(row.calo),
+            "status": STATUS_BY_RANK[row.status_rank]
+        }
+        for row in rows
+    ]
+
+
+def get_dashboard(user_id, day=None, mode=7):
+    """
+    Build the home screen data in one call: nutrition and workout analytics for
+    the 'mode' days ending at 'day', water intake, latest goal, profile and the
+    calorie progress of 'day' against the goal's daily calorie target.
+    Uses a fixed number of queries regardless of the window size.
+    """
+    end_date = day or date.today()
+    start_date = end_date - timedelta(days=mode - 1)
+
+    nutrition = get_nutrition_analytics(user_id, start=start_date, end=end_date)
+    workout = get_workout_analytics(user_id, start=start_date, end=end_date)
+    total_water = water_log_service.get_total_water_for_date(user_id, end_date)
+    goal = goal_service.get_latest_goal(user_id)
+    profile = user_profile_service.get_user_profile(user_id)
+
+    # The last bucket of each series is 'day' itself
+    consumed = nutrition[-1]["calories"]
+    burned = workout[-1]["calo"]
+    target = goal.daily_calorie_target if goal else None
+
+    return {
+        "date": end_date,
+        "nutrition": nutrition,
+        "workout": workout,
+        "water": {
+            "date": end_date,
+            "total_ml": total_water
+        },
+        "goal": goal,
+        "profile": profile,
+        "calorie_progress": {
+            "consumed": consumed,
+            "burned": burned,
+            "target": target,
+            "remaining": target - consumed if target else None,
+            "percent": round(consumed * 100.0 / target, 1) if target else None
+        }
+    }
+
+
+def get_daily_report_stats(user_ids, day):
+    """
+    Get the stats of 'day' for many users at once (the daily report):
+    nutrition totals, workouts and water intake, with one grouped query per
+    table whatever the number of users. Users without data get zeros.
+    """
+    stats = {
+        user_id: {
+            "calories": 0, "protein": 0.0, "carbs": 0.0, "fat": 0.0,
+            "workouts": 0, "completed_workouts": 0, "duration_min": 0, "calories_burned": 0,
+            "water_ml": 0
+        }
+        for user_id in user_ids
+    }
+    if not stats:
+        return stats
+
+    for row in db.session.query(
+        DailyNutritionSummaryModel.user_id,
+        DailyNutritionSummaryModel.total_calories,
+        DailyNutritionSummaryModel.total_protein,
+        DailyNutritionSummaryModel.total_carbs,
+        DailyNutritionSummaryModel.total_fat
+    ).filter(
+        DailyNutritionSummaryModel.user_id.in_(user_ids),
+        DailyNutritionSummaryModel.log_date == day
+    ):
+        stats[row.user_id].update(
+            calories=row.total_calories,
+            protein=row.total_protein,
+            carbs=row.total_carbs,
+            fat=row.total_fat
+        )
+
+    for row in db.session.query(
+        WorkoutLogModel.user_id,
+        func.count(WorkoutLogModel.id).label('workouts'),
+        func.count(case((WorkoutLogModel.status == 1, 1))).label('completed_workouts'),
+        func.coalesce(func.sum(WorkoutLogModel.duration_min), 0).label('duration_min'),
+        func.coalesce(func.sum(WorkoutLogModel.calories_burned), 0).label('calories_burned')
+    ).filter(
+        WorkoutLogModel.user_id.in_(user_ids),
+        WorkoutLogModel.log_date == day
+    ).group_by(
+        WorkoutLogModel.user_id
+    ):
+        stats[row.user_id].update(
+            workouts=row.workouts,
+            completed_workouts=row.completed_workouts,
+            duration_min=int(row.duration_min),
+            calories_burned=int(row.calories_burned)
+        )
+
+    for row in db.session.query(
+        WaterLogModel.user_id,
+        func.sum(WaterLogModel.amount_ml).label('water_ml')
+    ).filter(
+        WaterLogModel.user_id.in_(user_ids),
+        WaterLogModel.log_date == day
+    ).group_by(
+        WaterLogModel.user_id
+    ):
+        stats[row.user_id]["water_ml"] = int(row.water_ml)
+
+    return stats
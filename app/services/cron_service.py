@@ -1,32 +1,193 @@
-from app.services.mail_service import send_email
-import os
 import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import text
+
+from app.db import db
+from app.extention import scheduler
+from app.models.blocklist_model import BlocklistModel
+from app.models.user_model import UserModel
+from app.services import analytics_service, mail_service
 
 logger = logging.getLogger(__name__)
 
-def send_daily_report():
+# Expired blocklist rows deleted per statement, keeping each delete short
+BLOCKLIST_PRUNE_BATCH_SIZE = 5000
+
+# Users read from the database, and whose stats are loaded, at a time
+REPORT_CHUNK_SIZE = 1000
+
+REPORT_SUBJECT = "Báo cáo Fitness Tracker Hàng Ngày"
+
+# Key of the advisory lock held while the daily reports are being sent, so
+# the cron job and a manual trigger, in any process, never run side by side
+DAILY_REPORT_LOCK_KEY = 720303
+
+# Same guard within the process, and the only one on databases without
+# advisory locks
+_report_lock = threading.Lock()
+
+# Compiled once: rendering a report only fills the template in
+_templates = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")),
+    autoescape=select_autoescape(["html"]),
+)
+REPORT_TEMPLATE = _templates.get_template("emails/daily_report.html")
+
+
+def iter_report_recipients(chunk_size=REPORT_CHUNK_SIZE):
+    """
+    Yield the users to report to (not blocked) in chunks of chunk_size rows.
+    Each chunk is its own keyset query (id > last id of the previous chunk)
+    read in full, so no cursor stays open while the chunk is being sent.
+    """
+    last_id = None
+    while True:
+        stmt = db.select(
+            UserModel.id, UserModel.email, UserModel.name
+        ).where(
+            UserModel.block.isnot(True)
+        ).order_by(
+            UserModel.id
+        ).limit(chunk_size)
+        if last_id is not None:
+            stmt = stmt.where(UserModel.id > last_id)
+
+        users = db.session.execute(stmt).all()
+        if not users:
+            return
+        yield users
+        if len(users) < chunk_size:
+            return
+        last_id = users[-1].id
+
+
+def build_daily_reports(day, chunk_size=REPORT_CHUNK_SIZE):
+    """
+    Yield the report message ({"to", "subject", "html"}) of every recipient for 'day'
+    """
+    for users in iter_report_recipients(chunk_size):
+        stats = analytics_service.get_daily_report_stats([user.id for user in users], day)
+        # End the read transaction: sending the chunk is rate limited and slow
+        db.session.commit()
+        for user in users:
+            yield {
+                "to": user.email,
+                "subject": REPORT_SUBJECT,
+                "html": REPORT_TEMPLATE.render(day=day, name=user.name, stats=stats[user.id]),
+            }
+
+
+@contextmanager
+def _daily_report_lock():
     """
-    Cron job to send daily report email.
+    Hold the daily report lock for the duration of the block. Yields False,
+    without holding anything, when a run already holds it. Needs an app context.
     """
-    target_email = os.environ.get("CRON_TARGET_EMAIL")
-    if not target_email:
-        logger.warning("CRON_TARGET_EMAIL not set, skipping daily email job.")
+    if not _report_lock.acquire(blocking=False):
+        yield False
         return
 
-    logger.info(f"Sending daily report to {target_email}...")
-    
-    # Vietnamese content
-    subject = "Báo cáo Fitness Tracker Hàng Ngày"
-    content = """
-    <h1>Lời nhắc hàng ngày</h1>
-    <p>Đừng quên ghi lại nhật ký ăn uống và tập luyện hôm nay nhé!</p>
-    <p>Hãy kiểm tra ứng dụng để xem các gợi ý mới nhất.</p>
-    <a href="https://fitness-ai-umber.vercel.app/">Mở ứng dụng</a>
-    """
-    
+    connection = None
     try:
-        result = send_email(target_email, subject, content)
-        logger.info(f"Daily email sent result: {result}")
+        if db.engine.dialect.name == "postgresql":
+            # Session lock on a connection of its own: it must outlive the
+            # commits of the run, and go away with the process if it dies
+            connection = db.engine.connect()
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": DAILY_REPORT_LOCK_KEY}
+            ).scalar()
+            connection.commit()
+            if not locked:
+                connection.close()
+                connection = None
+                yield False
+                return
+        yield True
+    finally:
+        if connection is not None:
+            try:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": DAILY_REPORT_LOCK_KEY})
+                connection.commit()
+                connection.close()
+            except Exception as e:
+                # Drop the connection rather than pool it with the lock held
+                logger.error(f"Failed to release the daily report lock: {e}")
+                connection.invalidate()
+        _report_lock.release()
+
+
+def daily_report_running():
+    """
+    Whether a process is sending the daily reports right now. Needs an app context.
+    """
+    with _daily_report_lock() as acquired:
+        return not acquired
+
+
+def send_daily_report(app=None, day=None):
+    """
+    Cron job sending every user the report of yesterday (or of 'day'):
+    calories, workouts and water. Users are processed in chunks and the
+    emails are handed to mail_service.send_bulk as they are rendered.
+    Returns None without sending anything when a run is already in progress.
+    """
+    app = app or scheduler.app
+    with app.app_context(), _daily_report_lock() as acquired:
+        if not acquired:
+            logger.warning("Daily reports are already being sent, skipping")
+            return None
+
+        day = day or date.today() - timedelta(days=1)
+        started = time.monotonic()
+        logger.info("Sending daily reports of %s...", day)
+
+        counts = {"sent": 0, "failed": 0}
+        try:
+            counts = mail_service.send_bulk(
+                build_daily_reports(day, app.config.get("DAILY_REPORT_CHUNK_SIZE", REPORT_CHUNK_SIZE))
+            )
+        except Exception as e:
+            logger.error(f"Failed to send daily reports: {e}")
+        finally:
+            db.session.remove()
+
+        result = {"day": day.isoformat(), **counts}
+        logger.info("Daily reports done in %.1fs: %s", time.monotonic() - started, result)
         return result
-    except Exception as e:
-        logger.error(f"Failed to send daily email: {e}")
+
+
+def prune_blocklist(app=None):
+    """
+    Cron job deleting the blocklist rows of tokens that expired: an expired
+    token is rejected anyway, its row is no longer needed.
+    """
+    app = app or scheduler.app
+    with app.app_context():
+        now = datetime.utcnow()
+        deleted = 0
+        try:
+            while True:
+                batch = db.select(BlocklistModel.jti_blocklist).where(
+                    BlocklistModel.expires_at <= now
+                ).limit(BLOCKLIST_PRUNE_BATCH_SIZE).scalar_subquery()
+                count = BlocklistModel.query.filter(
+                    BlocklistModel.jti_blocklist.in_(batch)
+                ).delete(synchronize_session=False)
+                db.session.commit()
+                deleted += count
+                if count < BLOCKLIST_PRUNE_BATCH_SIZE:
+                    break
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to prune blocklist: {e}")
+        finally:
+            db.session.remove()
+
+        logger.info("Pruned %s expired blocklist entries", deleted)
+        return deleted
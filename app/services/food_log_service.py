@@ -1,18 +1,28 @@
 import logging
-from datetime import date
+from datetime import date, datetime
+from uuid import uuid4
 
 from flask_smorest import abort
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db import db
 from app.models.food_log_model import FoodLogModel
+from app.services import nutrition_summary_service
+from app.utils.pagination import STREAM_BATCH_SIZE, keyset_page, order_by_keyset
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
+# Largest number of food logs accepted by a single bulk request
+MAX_BULK_FOOD_LOGS = 500
 
-def get_all_food_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+# Columns overwritten when a bulk item matches an existing (user_id, client_id)
+BULK_UPSERT_COLUMNS = ["meal_type", "quantity", "log_date", "name", "calories", "protein", "carbs", "fat", "status"]
+
+
+def _food_logs_query(user_id=None, log_date=None, start_day=None, end_day=None):
     """
-    Get all food logs, optionally filtered by user_id, log_date, or date range (start_day, end_day)
+    Build the food logs query, optionally filtered by user_id, log_date, or date range (start_day, end_day)
     """
     from datetime import datetime
     query = FoodLogModel.query
@@ -37,10 +47,34 @@ def get_all_food_logs(user_id=None, log_date=None, start_day=None, end_day=None)
                 end_day = datetime.strptime(end_day, '%Y-%m-%d').date()
             query = query.filter(FoodLogModel.log_date <= end_day)
 
-    food_logs = query.all()
+    return query
+
+
+def get_all_food_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+    """
+    Get all food logs, optionally filtered by user_id, log_date, or date range (start_day, end_day)
+    """
+    query = _food_logs_query(user_id, log_date, start_day, end_day)
+    food_logs = order_by_keyset(query, FoodLogModel).all()
     return food_logs
 
 
+def get_food_logs_page(user_id=None, log_date=None, start_day=None, end_day=None, cursor=None, limit=None):
+    """
+    Get one page of food logs ordered by (log_date, id) and the cursor of the next page
+    """
+    query = _food_logs_query(user_id, log_date, start_day, end_day)
+    return keyset_page(query, FoodLogModel, cursor, limit)
+
+
+def stream_food_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+    """
+    Iterate food logs ordered by (log_date, id), fetching them in batches
+    """
+    query = _food_logs_query(user_id, log_date, start_day, end_day)
+    return order_by_keyset(query, FoodLogModel).yield_per(STREAM_BATCH_SIZE)
+
+
 def get_food_log(food_log_id):
     """
     Get food log by id
@@ -70,12 +104,14 @@ def create_food_log(user_id, food_log_data):
             carbs=food_log_data.get("carbs"),
             fat=food_log_data.get("fat"),
             status=food_log_data.get("status", 1),
+            client_id=food_log_data.get("client_id"),
         )
 
         db.session.add(food_log)
+        nutrition_summary_service.add_food_log(food_log)
         db.session.commit()
 
-        logger.info(f"Food log created successfully with id: {food_log.id}")
+        logger.info("Food log created successfully with id: %s", food_log.id)
         return food_log
 
     except Exception as ex:
@@ -84,6 +120,78 @@ def create_food_log(user_id, food_log_data):
         abort(400, message=f"Failed to create food log: {ex}")
 
 
+def bulk_upsert_food_logs(user_id, food_logs_data):
+    """
+    Create many food logs with a single INSERT and a single commit.
+    Items carrying a client_id are upserted on (user_id, client_id), so a retried
+    sync updates the rows it created the first time instead of duplicating them.
+    """
+    if not food_logs_data:
+        return []
+
+    if len(food_logs_data) > MAX_BULK_FOOD_LOGS:
+        abort(400, message=f"At most {MAX_BULK_FOOD_LOGS} food logs can be sent at once")
+
+    # A client_id repeated in the same payload would hit the same row twice
+    # in one statement, which Postgres rejects: keep the last occurrence
+    rows_by_key = {}
+    for index, food_log_data in enumerate(food_logs_data):
+        client_id = food_log_data.get("client_id")
+        key = ("client", client_id) if client_id else ("index", index)
+        rows_by_key[key] = {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "client_id": client_id,
+            "meal_type": food_log_data.get("meal_type"),
+            "quantity": food_log_data.get("quantity", 1.0),
+            "log_date": food_log_data["log_date"],
+            "name": food_log_data["name"],
+            "calories": food_log_data["calories"],
+            "protein": food_log_data.get("protein"),
+            "carbs": food_log_data.get("carbs"),
+            "fat": food_log_data.get("fat"),
+            "status": food_log_data.get("status", 1),
+            "created_at": datetime.utcnow(),
+        }
+    rows = list(rows_by_key.values())
+
+    try:
+        # Days whose totals change: the new days plus the days of rows being overwritten
+        affected_days = {row["log_date"] for row in rows}
+        client_ids = [row["client_id"] for row in rows if row["client_id"]]
+        if client_ids:
+            affected_days.update(
+                log_date for (log_date,) in db.session.query(FoodLogModel.log_date).filter(
+                    FoodLogModel.user_id == user_id,
+                    FoodLogModel.client_id.in_(client_ids)
+                )
+            )
+
+        stmt = insert(FoodLogModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[FoodLogModel.user_id, FoodLogModel.client_id],
+            set_={column: stmt.excluded[column] for column in BULK_UPSERT_COLUMNS},
+        ).returning(FoodLogModel)
+        food_logs = db.session.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).all()
+
+        nutrition_summary_service.refresh_days(user_id, affected_days)
+        # The commit would expire the returned rows and serializing them
+        # would reload each one: detach them, loaded as they are
+        for food_log in food_logs:
+            db.session.expunge(food_log)
+        db.session.commit()
+
+        logger.info("Bulk upserted %s food logs for user: %s", len(food_logs), user_id)
+        return food_logs
+
+    except Exception as ex:
+        db.session.rollback()
+        logger.error(f"Failed to bulk create food logs: {ex}")
+        abort(400, message=f"Failed to bulk create food logs: {ex}")
+
+
 def update_food_log(food_log_id, food_log_data):
     """
     Update food log
@@ -95,13 +203,17 @@ def update_food_log(food_log_id, food_log_data):
         abort(404, message="Food log not found")
 
     try:
+        # Move the old values out of the daily summary before changing the log
+        nutrition_summary_service.remove_food_log(food_log)
+
         for key, value in food_log_data.items():
             if value is not None:
                 setattr(food_log, key, value)
 
+        nutrition_summary_service.add_food_log(food_log)
         db.session.commit()
 
-        logger.info(f"Food log updated successfully with id: {food_log_id}")
+        logger.info("Food log updated successfully with id: %s", food_log_id)
         return food_log
 
     except Exception as ex:
@@ -121,10 +233,11 @@ def delete_food_log(food_log_id):
         abort(404, message="Food log not found")
 
     try:
+        nutrition_summary_service.remove_food_log(food_log)
         db.session.delete(food_log)
         db.session.commit()
 
-        logger.info(f"Food log deleted successfully with id: {food_log_id}")
+        logger.info("Food log deleted successfully with id: %s", food_log_id)
         return {"message": "Food log deleted successfully"}
 
     except Exception as ex:
@@ -47,7 +47,7 @@ def create_food(food_data):
         db.session.add(food)
         db.session.commit()
 
-        logger.info(f"Food created successfully with id: {food.id}")
+        logger.info("Food created successfully with id: %s", food.id)
         return food
 
     except Exception as ex:
@@ -82,7 +82,7 @@ def update_food(food_id, food_data):
 
         db.session.commit()
 
-        logger.info(f"Food updated successfully with id: {food_id}")
+        logger.info("Food updated successfully with id: %s", food_id)
         return food
 
     except Exception as ex:
@@ -105,7 +105,7 @@ def delete_food(food_id):
         db.session.delete(food)
         db.session.commit()
 
-        logger.info(f"Food deleted successfully with id: {food_id}")
+        logger.info("Food deleted successfully with id: %s", food_id)
         return {"message": "Food deleted successfully"}
 
     except Exception as ex:
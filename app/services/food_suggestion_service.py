@@ -1,33 +1,35 @@
 import json
 import logging
-import os
 from datetime import date, datetime, timedelta
+from uuid import uuid4
 
 from flask_smorest import abort
-from openai import OpenAI
+from sqlalchemy.dialects.postgresql import insert
 
 from app.db import db
 from app.models.food_log_model import FoodLogModel
 from app.models.enums import MealTypeEnum
-from app.services import user_profile_service
+from app.services import nutrition_summary_service, llm_client, suggestion_cache, user_profile_service
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = None
 
-
-def get_openai_client():
-    """Initialize and return OpenAI client"""
-    global openai_client
-    if openai_client is None:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            logger.error("OPENAI_API_KEY not found in environment variables")
-            abort(500, message="OpenAI API key not configured")
-        openai_client = OpenAI(api_key=api_key)
-    return openai_client
+def _exclude_recent_foods(food_plan, recent_food_names, is_full_day):
+    """
+    Drop the foods the user ate recently from a cached plan. Returns None when
+    what is left cannot serve the request (nothing left, or a meal lost all its
+    foods in a full-day plan), so a fresh plan is generated instead.
+    """
+    recent = {name.casefold() for name in recent_food_names}
+    foods = [food for food in food_plan.get("foods", []) if str(food.get("name", "")).casefold() not in recent]
+    if not foods:
+        return None
+    if is_full_day and {food.get("meal_type") for food in foods} != {
+        food.get("meal_type") for food in food_plan["foods"]
+    }:
+        return None
+    return {**food_plan, "foods": foods}
 
 
 def suggest_food_plan(user_id, day_plan=None, meal_type=None):
@@ -64,15 +66,15 @@ def suggest_food_plan(user_id, day_plan=None, meal_type=None):
         "target": user_profile.target
     }
 
-    # Get recent food logs to avoid duplication (last 7 days + today)
+    # Get names of recent foods to avoid duplication (last 7 days + today)
     start_date = target_date - timedelta(days=7)
-    recent_logs = FoodLogModel.query.filter(
-        FoodLogModel.user_id == user_id,
-        FoodLogModel.log_date >= start_date,
-        FoodLogModel.log_date <= target_date
-    ).all()
-    
-    recent_food_names = list(set([log.name for log in recent_logs]))
+    recent_food_names = [
+        name for (name,) in db.session.query(FoodLogModel.name).filter(
+            FoodLogModel.user_id == user_id,
+            FoodLogModel.log_date >= start_date,
+            FoodLogModel.log_date <= target_date
+        ).distinct()
+    ]
     recent_foods_str = ", ".join(recent_food_names) if recent_food_names else "Chưa có món ăn nào"
 
     # Specific meal type prompt addition
@@ -132,40 +134,73 @@ Lưu ý:
 - Đảm bảo dinh dưỡng phù hợp với mục tiêu thể hình của người dùng.
 - Trả về chỉ JSON, không có text thêm."""
 
+    # Users of the same profile cohort asking for the same meal share plans.
+    # The date is not part of the key: the prompt does not depend on it.
+    cache_key = suggestion_cache.fingerprint(
+        "food", user_info, meal_type=meal_type.value if hasattr(meal_type, 'value') else meal_type
+    )
+
     try:
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Bạn là một chuyên gia dinh dưỡng. Trả về chỉ JSON, không có text thêm."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-
-        # Parse response
-        response_content = response.choices[0].message.content
-        food_plan = json.loads(response_content)
-
-        # Validate response structure
-        if "foods" not in food_plan:
-            logger.error("Invalid food plan structure from OpenAI")
-            abort(500, message="Invalid food plan structure received from AI")
+        cached_plan = suggestion_cache.get_plan(cache_key)
+        food_plan = _exclude_recent_foods(cached_plan, recent_food_names, is_full_day) if cached_plan else None
+
+        if food_plan is None:
+            response = llm_client.chat_completion(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Bạn là một chuyên gia dinh dưỡng. Trả về chỉ JSON, không có text thêm."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+
+            # Parse response
+            response_content = response.choices[0].message.content
+            food_plan = json.loads(response_content)
+
+            # Validate response structure
+            if "foods" not in food_plan:
+                logger.error("Invalid food plan structure from OpenAI")
+                abort(500, message="Invalid food plan structure received from AI")
+
+            suggestion_cache.store_plan(cache_key, food_plan)
 
         # Process foods and create food logs
         created_food_items = []
-        created_logs = []
-        
+
         # If full day (all), process all items. Else limit to 1.
         items_to_process = food_plan["foods"] if is_full_day else food_plan["foods"][:1]
 
+        # Prefetch the logs of the target date that the suggestions may replace,
+        # keyed by (meal_type, name), instead of one lookup per suggested food
+        existing_logs = {}
+        suggested_names = [food_data.get("name") for food_data in items_to_process if food_data.get("name")]
+        if suggested_names:
+            for log in db.session.query(
+                FoodLogModel.id, FoodLogModel.meal_type, FoodLogModel.name,
+                FoodLogModel.calories, FoodLogModel.protein, FoodLogModel.carbs, FoodLogModel.fat
+            ).filter(
+                FoodLogModel.user_id == user_id,
+                FoodLogModel.log_date == target_date,
+                FoodLogModel.name.in_(suggested_names)
+            ):
+                existing_logs.setdefault((log.meal_type, log.name), log)
+
+        # Rows to write keyed by id: existing logs keep theirs, so one upsert
+        # on the primary key both updates them and inserts the new ones
+        rows = {}
+        row_ids = []
+        new_log_ids = {}
+        replaced_logs = {}
+        now = datetime.utcnow()
+
         for food_data in items_to_process:
             # Validate required fields
             required_fields = ["name", "meal_type", "calories"]
@@ -197,53 +232,86 @@ Lưu ý:
                     continue
 
             # check exist
-            existing_log = FoodLogModel.query.filter_by(
-                user_id=user_id,
-                log_date=target_date,
-                meal_type=meal_type_enum,
-                name=food_data["name"]
-            ).first()
-
-            if not existing_log:
-                food_log = FoodLogModel(
-                    user_id=user_id,
-                    log_date=target_date,
-                    meal_type=meal_type_enum,
-                    name=food_data["name"],
-                    calories=food_data["calories"],
-                    protein=food_data.get("protein"),
-                    carbs=food_data.get("carbs"),
-                    fat=food_data.get("fat"),
-                    quantity=1.0  # Default quantity
-                )
-                db.session.add(food_log)
-                created_logs.append(food_log)
+            key = (meal_type_enum, food_data["name"])
+            existing_log = existing_logs.get(key)
+
+            if existing_log:
+                log_id = existing_log.id
+                replaced_logs[log_id] = existing_log
             else:
-                existing_log.calories = food_data["calories"]
-                existing_log.protein = food_data.get("protein")
-                existing_log.carbs = food_data.get("carbs")
-                existing_log.fat = food_data.get("fat")
-                existing_log.quantity = 1.0
-                created_logs.append(existing_log)
+                # A repeated suggestion updates the row created for the first one
+                log_id = new_log_ids.setdefault(key, str(uuid4()))
+
+            rows[log_id] = {
+                "id": log_id,
+                "user_id": user_id,
+                "log_date": target_date,
+                "meal_type": meal_type_enum,
+                "name": food_data["name"],
+                "calories": food_data["calories"],
+                "protein": food_data.get("protein"),
+                "carbs": food_data.get("carbs"),
+                "fat": food_data.get("fat"),
+                "quantity": 1.0,  # Default quantity
+                "status": 1,
+                "created_at": now,
+            }
+            row_ids.append(log_id)
 
             created_food_items.append({
-                "log": created_logs[-1],
                 "name": food_data["name"],
                 "meal_type": meal_type_str,
                 "calories": food_data["calories"],
                 "description": food_data.get("description", "")
             })
 
+        if rows:
+            stmt = insert(FoodLogModel).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FoodLogModel.id],
+                set_={
+                    column: stmt.excluded[column]
+                    for column in ("calories", "protein", "carbs", "fat", "quantity")
+                },
+            ).returning(FoodLogModel)
+            logs_by_id = {
+                log.id: log
+                for log in db.session.scalars(stmt, execution_options={"populate_existing": True})
+            }
+            for item, log_id in zip(created_food_items, row_ids):
+                item["log"] = logs_by_id[log_id]
+
+            # Everything lands on the same day: apply the net change once
+            new_logs = logs_by_id.values()
+            old_logs = replaced_logs.values()
+            nutrition_summary_service.apply_delta(
+                user_id,
+                target_date,
+                calories=sum(log.calories or 0 for log in new_logs) - sum(log.calories or 0 for log in old_logs),
+                protein=sum(log.protein or 0.0 for log in new_logs) - sum(log.protein or 0.0 for log in old_logs),
+                carbs=sum(log.carbs or 0.0 for log in new_logs) - sum(log.carbs or 0.0 for log in old_logs),
+                fat=sum(log.fat or 0.0 for log in new_logs) - sum(log.fat or 0.0 for log in old_logs),
+            )
+
+            # The commit would expire the returned rows and serializing them
+            # would reload each one: detach them, loaded as they are
+            for log in new_logs:
+                db.session.expunge(log)
+
         # Commit all changes
         db.session.commit()
 
-        logger.info(f"Food plan created successfully for user_id: {user_id} on {target_date}")
+        logger.info("Food plan created successfully for user_id: %s on %s", user_id, target_date)
         
         return {
             "date": target_date.isoformat(),
             "foods": created_food_items
         }
 
+    except llm_client.LLMUnavailableError as e:
+        logger.error(f"OpenAI unavailable while generating food plan: {e}")
+        db.session.rollback()
+        abort(503, message="AI service is temporarily unavailable, please try again later")
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse OpenAI response: {e}")
         db.session.rollback()
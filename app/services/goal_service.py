@@ -34,6 +34,15 @@ def get_goal(goal_id):
     return goal
 
 
+def get_latest_goal(user_id):
+    """
+    Get the most recently created goal of a user, or None
+    """
+    return GoalModel.query.filter_by(user_id=user_id).order_by(
+        GoalModel.created_at.desc()
+    ).first()
+
+
 def create_goal(user_id, goal_data):
     """
     Create a new goal
@@ -49,7 +58,7 @@ def create_goal(user_id, goal_data):
         db.session.add(goal)
         db.session.commit()
 
-        logger.info(f"Goal created successfully with id: {goal.id}")
+        logger.info("Goal created successfully with id: %s", goal.id)
         return goal
 
     except Exception as ex:
@@ -78,7 +87,7 @@ def update_goal(goal_id, goal_data):
 
         db.session.commit()
 
-        logger.info(f"Goal updated successfully with id: {goal_id}")
+        logger.info("Goal updated successfully with id: %s", goal_id)
         return goal
 
     except Exception as ex:
@@ -101,7 +110,7 @@ def delete_goal(goal_id):
         db.session.delete(goal)
         db.session.commit()
 
-        logger.info(f"Goal deleted successfully with id: {goal_id}")
+        logger.info("Goal deleted successfully with id: %s", goal_id)
         return {"message": "Goal deleted successfully"}
 
     except Exception as ex:
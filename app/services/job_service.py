@@ -0,0 +1,523 @@
+import ipaddress
+import logging
+import socket
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import httpx
+from flask import current_app
+from flask_smorest import abort
+from sqlalchemy import func, select, update
+from werkzeug.exceptions import HTTPException
+
+from app.db import db
+from app.models.enums import JobStatusEnum, JobTypeEnum
+from app.models.job_model import JobModel
+from app.schemas.food_suggestion_schema import FoodSuggestionResponseSchema
+from app.schemas.job_schema import JobResponseSchema
+from app.schemas.workout_suggestion_schema import WorkoutSuggestionResponseSchema
+from app.services import cron_service, food_suggestion_service, workout_suggestion_service
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Jobs a user may have waiting or running at the same time
+MAX_PENDING_JOBS_PER_USER = 5
+
+# Seconds allowed to deliver a webhook
+WEBHOOK_TIMEOUT = 5.0
+
+# Key of the advisory lock serializing job claims across worker processes
+CLAIM_LOCK_KEY = 720301
+
+
+def _run_food_plan(user_id, payload):
+    result = food_suggestion_service.suggest_food_plan(user_id, payload.get("day_plan"), payload.get("meal_type"))
+    return FoodSuggestionResponseSchema().dump(result)
+
+
+def _run_workout_plan(user_id, payload):
+    result = workout_suggestion_service.suggest_workout_plan(user_id, payload.get("start_day"), payload.get("end_day"))
+    return WorkoutSuggestionResponseSchema().dump(result)
+
+
+def _run_daily_report(user_id, payload):
+    day = date.fromisoformat(payload["day"]) if payload.get("day") else None
+    result = cron_service.send_daily_report(current_app._get_current_object(), day)
+    if result is None:
+        abort(409, message="Daily reports are already being sent")
+    return result
+
+
+# Function running each job type, returning its JSON result
+JOB_HANDLERS = {
+    JobTypeEnum.food_plan: _run_food_plan,
+    JobTypeEnum.workout_plan: _run_workout_plan,
+    JobTypeEnum.daily_report: _run_daily_report,
+}
+
+
+def _mark_running(jobs):
+    now = datetime.utcnow()
+    for job in jobs:
+        job.status = JobStatusEnum.running
+        job.started_at = now
+        job.attempts += 1
+
+
+class DatabaseJobQueue:
+    """
+    The queued rows of the jobs table are the queue. Claims lock rows with
+    FOR UPDATE SKIP LOCKED, so concurrent workers never take the same job, and
+    never let more than JOB_MAX_RUNNING jobs run at once across all workers.
+    """
+
+    def __init__(self, max_running):
+        self.max_running = max_running
+
+    def push(self, job_id):
+        """Nothing to do: the committed row is the queue entry"""
+
+    def claim(self, limit):
+        """Mark up to 'limit' of the oldest queued jobs as running and return their ids"""
+        try:
+            # Serialize claims so the running count below stays exact
+            db.session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+            running = JobModel.query.filter_by(status=JobStatusEnum.running).count()
+            limit = min(limit, self.max_running - running)
+            if limit <= 0:
+                db.session.rollback()
+                return []
+
+            jobs = JobModel.query.filter_by(
+                status=JobStatusEnum.queued
+            ).order_by(
+                JobModel.created_at
+            ).with_for_update(skip_locked=True).limit(limit).all()
+
+            _mark_running(jobs)
+            db.session.commit()
+            return [job.id for job in jobs]
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def start(self, job):
+        """
+        Add 'job' as already running, unless JOB_MAX_RUNNING jobs run already.
+        Returns whether it was added.
+        """
+        try:
+            db.session.execute(select(func.pg_advisory_xact_lock(CLAIM_LOCK_KEY)))
+            running = JobModel.query.filter_by(status=JobStatusEnum.running).count()
+            if running >= self.max_running:
+                db.session.rollback()
+                return False
+
+            db.session.add(job)
+            db.session.commit()
+            return True
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def wait(self, timeout, stop_event):
+        stop_event.wait(timeout)
+
+
+class InMemoryJobQueue:
+    """
+    Stand-in for a Redis list (LPUSH/BRPOP) of job ids, local to the process.
+    Job state still lives in the jobs table. Needs an in-process worker.
+    """
+
+    def __init__(self, max_running=None):
+        self.max_running = max_running
+        self.job_ids = deque()
+        self.condition = threading.Condition()
+
+    def push(self, job_id):
+        with self.condition:
+            self.job_ids.append(job_id)
+            self.condition.notify()
+
+    def claim(self, limit):
+        """Pop up to 'limit' job ids and mark the matching queued jobs as running"""
+        with self.condition:
+            job_ids = [self.job_ids.popleft() for _ in range(min(limit, len(self.job_ids)))]
+        if not job_ids:
+            return []
+
+        try:
+            jobs = JobModel.query.filter(
+                JobModel.id.in_(job_ids),
+                JobModel.status == JobStatusEnum.queued
+            ).all()
+            _mark_running(jobs)
+            db.session.commit()
+            return [job.id for job in jobs]
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def start(self, job):
+        """
+        Add 'job' as already running, unless 'max_running' jobs run already.
+        Returns whether it was added.
+        """
+        try:
+            running = JobModel.query.filter_by(status=JobStatusEnum.running).count()
+            if self.max_running is not None and running >= self.max_running:
+                db.session.rollback()
+                return False
+
+            db.session.add(job)
+            db.session.commit()
+            return True
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def wait(self, timeout, stop_event):
+        with self.condition:
+            if not self.job_ids and not stop_event.is_set():
+                self.condition.wait(timeout)
+
+
+QUEUE_BACKENDS = {
+    "database": DatabaseJobQueue,
+    "memory": InMemoryJobQueue,
+}
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """
+    Return the queue backend selected by JOB_QUEUE_BACKEND (one per process)
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                backend = current_app.config.get("JOB_QUEUE_BACKEND", "database")
+                if backend not in QUEUE_BACKENDS:
+                    raise ValueError(f"Unknown job queue backend: {backend}")
+                _queue = QUEUE_BACKENDS[backend](current_app.config.get("JOB_MAX_RUNNING", 8))
+    return _queue
+
+
+def check_callback_url(url):
+    """
+    Raise ValueError unless 'url' may receive webhooks: its host is in
+    JOB_CALLBACK_ALLOWED_HOSTS (when set) and resolves to public addresses
+    only, so callbacks cannot reach localhost, the internal network or the
+    cloud metadata service
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise ValueError("Callback URL must be an http(s) URL")
+
+    allowed_hosts = current_app.config.get("JOB_CALLBACK_ALLOWED_HOSTS")
+    if allowed_hosts and host not in allowed_hosts:
+        raise ValueError(f"Callback host {host} is not allowed")
+
+    try:
+        addresses = socket.getaddrinfo(host, parts.port or 80, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        raise ValueError(f"Callback host {host} does not resolve")
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise ValueError(f"Callback host {host} resolves to a non-public address")
+
+
+def enqueue_job(user_id, job_type, payload, callback_url=None):
+    """
+    Create a queued job and hand it to the queue. Returns at once; the result
+    is available from get_job (and posted to callback_url) once a worker ran it.
+    """
+    pending = JobModel.query.filter(
+        JobModel.user_id == user_id,
+        JobModel.status.in_([JobStatusEnum.queued, JobStatusEnum.running])
+    ).count()
+    if pending >= MAX_PENDING_JOBS_PER_USER:
+        logger.error(f"Too many pending jobs for user_id: {user_id}")
+        abort(429, message="Too many pending jobs, please wait for the previous ones to finish")
+
+    if callback_url:
+        try:
+            check_callback_url(callback_url)
+        except ValueError as ex:
+            logger.error(f"Rejected callback_url of user_id {user_id}: {ex}")
+            abort(400, message=str(ex))
+
+    try:
+        job = JobModel(
+            user_id=user_id,
+            type=job_type,
+            payload=payload,
+            callback_url=callback_url,
+        )
+        db.session.add(job)
+        db.session.commit()
+    except Exception as ex:
+        db.session.rollback()
+        logger.error(f"Failed to enqueue job: {ex}")
+        abort(400, message=f"Failed to enqueue job: {ex}")
+
+    get_job_queue().push(job.id)
+    logger.info("Job %s (%s) queued for user_id: %s", job.id, job_type.value, user_id)
+    return job
+
+
+def enqueue_daily_report(user_id, day=None):
+    """
+    Queue a run of the daily reports, sent by a job worker. Aborts with 409
+    when a run is already queued or in progress.
+    """
+    pending = JobModel.query.filter(
+        JobModel.type == JobTypeEnum.daily_report,
+        JobModel.status.in_([JobStatusEnum.queued, JobStatusEnum.running])
+    ).first()
+    if pending or cron_service.daily_report_running():
+        logger.error(f"Daily reports already being sent, rejected trigger of user_id: {user_id}")
+        abort(409, message="Daily reports are already being sent")
+
+    return enqueue_job(user_id, JobTypeEnum.daily_report, {"day": day.isoformat() if day else None})
+
+
+@contextmanager
+def running_in_request(user_id, job_type, payload):
+    """
+    Count the block, a request generating a plan itself, as a running job:
+    it takes one of the JOB_MAX_RUNNING slots shared with the queued jobs,
+    so the synchronous endpoints cannot run more LLM calls at once than the
+    workers do. Aborts with 503 when every slot is taken.
+    """
+    job_id = str(uuid4())
+    job = JobModel(
+        id=job_id,
+        user_id=user_id,
+        type=job_type,
+        payload=payload,
+        status=JobStatusEnum.running,
+        started_at=datetime.utcnow(),
+        # The request is gone if its process dies: never requeue the job
+        attempts=current_app.config.get("JOB_MAX_ATTEMPTS", 3),
+    )
+    if not get_job_queue().start(job):
+        logger.error(f"No job slot free for {job_type.value} of user_id: {user_id}")
+        abort(503, message="Too many plans are being generated, please try again shortly")
+
+    values = {"status": JobStatusEnum.failed}
+    try:
+        yield
+        values["status"] = JobStatusEnum.succeeded
+    except HTTPException as ex:
+        values["error"] = (getattr(ex, "data", None) or {}).get("message") or ex.description
+        raise
+    except Exception as ex:
+        values["error"] = str(ex)
+        raise
+    finally:
+        values["finished_at"] = datetime.utcnow()
+        try:
+            # In a transaction of its own: committing the session would expire
+            # the objects the response is serialized from
+            with db.engine.begin() as connection:
+                connection.execute(update(JobModel).where(JobModel.id == job_id).values(values))
+        except Exception as ex:
+            logger.error(f"Failed to finish job {job_id}: {ex}")
+
+
+def get_job(job_id):
+    """
+    Get job by id
+    """
+    job = JobModel.query.filter_by(id=job_id).first()
+
+    if not job:
+        logger.error(f"Job not found with id: {job_id}")
+        abort(404, message="Job not found")
+
+    return job
+
+
+def _notify(job):
+    """POST the final state of a job to its callback_url, if any. Failures are only logged."""
+    if not job.callback_url:
+        return
+    try:
+        # Checked again: the host may resolve elsewhere than when the job was queued
+        check_callback_url(job.callback_url)
+        response = httpx.post(
+            job.callback_url, json=JobResponseSchema().dump(job), timeout=WEBHOOK_TIMEOUT, follow_redirects=False
+        )
+        response.raise_for_status()
+    except Exception as ex:
+        logger.error(f"Failed to deliver webhook of job {job.id}: {ex}")
+
+
+def run_job(job_id):
+    """
+    Run a claimed job and store its result or error. Needs an app context.
+    """
+    job = db.session.get(JobModel, job_id)
+    if not job:
+        logger.error(f"Job not found with id: {job_id}")
+        return
+
+    try:
+        result = JOB_HANDLERS[job.type](job.user_id, job.payload or {})
+    except HTTPException as ex:
+        # abort() raised by the service: keep its message
+        db.session.rollback()
+        job.status = JobStatusEnum.failed
+        job.error = (getattr(ex, "data", None) or {}).get("message") or ex.description
+    except Exception as ex:
+        db.session.rollback()
+        logger.error(f"Job {job_id} crashed: {ex}")
+        job.status = JobStatusEnum.failed
+        job.error = str(ex)
+    else:
+        job.status = JobStatusEnum.succeeded
+        job.result = result
+
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+    logger.info("Job %s finished with status: %s", job_id, job.status.value)
+
+    _notify(job)
+
+
+def requeue_stale_jobs(queue, stale_after, max_attempts):
+    """
+    Queue again the jobs left running by a worker that died, or fail them
+    once they used all their attempts
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale_jobs = JobModel.query.filter(
+        JobModel.status == JobStatusEnum.running,
+        JobModel.started_at < cutoff
+    ).with_for_update(skip_locked=True).all()
+
+    requeued = []
+    for job in stale_jobs:
+        if job.attempts >= max_attempts:
+            job.status = JobStatusEnum.failed
+            job.error = "Job timed out"
+            job.finished_at = datetime.utcnow()
+        else:
+            job.status = JobStatusEnum.queued
+            requeued.append(job.id)
+    db.session.commit()
+
+    for job_id in requeued:
+        queue.push(job_id)
+    if stale_jobs:
+        logger.warning(f"Recovered {len(stale_jobs)} stale jobs ({len(requeued)} requeued)")
+
+
+class JobWorker:
+    """
+    Claims queued jobs and runs them on a thread pool. 'concurrency' caps the
+    jobs (and so the LLM calls) this worker runs at once.
+    """
+
+    # Seconds between two checks for stale jobs
+    STALE_CHECK_INTERVAL = 60
+
+    def __init__(self, app, concurrency=None, poll_interval=None):
+        self.app = app
+        self.concurrency = concurrency or app.config.get("JOB_CONCURRENCY", 4)
+        self.poll_interval = poll_interval or app.config.get("JOB_POLL_INTERVAL", 1.0)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job-worker")
+        self.in_flight = 0
+        self.slots = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _run_one(self, job_id):
+        try:
+            with self.app.app_context():
+                run_job(job_id)
+        except Exception as ex:
+            logger.error(f"Job {job_id} could not be completed: {ex}")
+        finally:
+            with self.slots:
+                self.in_flight -= 1
+                self.slots.notify()
+
+    def run(self):
+        """Claim and dispatch jobs until stop() is called"""
+        logger.info("Job worker started (concurrency %s)", self.concurrency)
+        last_stale_check = 0.0
+
+        while not self.stop_event.is_set():
+            # Wait for a free slot
+            with self.slots:
+                while self.in_flight >= self.concurrency and not self.stop_event.is_set():
+                    self.slots.wait(self.poll_interval)
+                free = self.concurrency - self.in_flight
+
+            try:
+                with self.app.app_context():
+                    queue = get_job_queue()
+                    now = datetime.utcnow().timestamp()
+                    if now - last_stale_check >= self.STALE_CHECK_INTERVAL:
+                        last_stale_check = now
+                        requeue_stale_jobs(
+                            queue,
+                            self.app.config.get("JOB_STALE_AFTER", 600),
+                            self.app.config.get("JOB_MAX_ATTEMPTS", 3),
+                        )
+                    job_ids = queue.claim(free)
+            except Exception as ex:
+                logger.error(f"Failed to claim jobs: {ex}")
+                self.stop_event.wait(self.poll_interval)
+                continue
+
+            for job_id in job_ids:
+                with self.slots:
+                    self.in_flight += 1
+                self.executor.submit(self._run_one, job_id)
+
+            if not job_ids:
+                queue.wait(self.poll_interval, self.stop_event)
+
+        self.executor.shutdown(wait=True)
+        logger.info("Job worker stopped")
+
+    def start(self):
+        """Run the worker loop in a daemon thread"""
+        self.thread = threading.Thread(target=self.run, name="job-worker-loop", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+_worker = None
+
+
+def start_worker(app):
+    """
+    Start the in-process worker once per process (JOB_WORKER_IN_PROCESS)
+    """
+    global _worker
+    if _worker is None:
+        _worker = JobWorker(app).start()
+    return _worker
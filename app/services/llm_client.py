@@ -0,0 +1,358 @@
+import asyncio
+import concurrent.futures
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+import httpx
+import openai
+from flask_smorest import abort
+from openai import AsyncOpenAI
+
+from app.utils.metrics import observe_openai_call
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Default model used by the AI features
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Connection pool shared by every OpenAI call of the process
+MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+KEEPALIVE_EXPIRY = 30.0
+
+# Timeouts of a single attempt, in seconds
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = float(os.environ.get("OPENAI_READ_TIMEOUT", "30"))
+POOL_TIMEOUT = 5.0
+
+# Deadline of a whole call, retries included, in seconds
+DEFAULT_DEADLINE = float(os.environ.get("OPENAI_DEADLINE", "45"))
+
+# Retries after the first attempt, spaced by jittered exponential backoff
+MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "2"))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Retry budget: every call earns RETRY_BUDGET_RATIO tokens and every retry
+# spends one, so retries stay a fraction of the traffic during an outage
+RETRY_BUDGET_RATIO = 0.2
+RETRY_BUDGET_MAX_TOKENS = 10.0
+
+# Circuit breaker: open after this many failed calls in a row, then let a
+# single trial call through once the reset timeout has passed
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("OPENAI_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("OPENAI_BREAKER_RESET_TIMEOUT", "30"))
+
+
+class LLMUnavailableError(Exception):
+    """The LLM provider failed, timed out or is cut off by the circuit breaker"""
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a ratio of the calls made
+    """
+
+    def __init__(self, ratio, max_tokens):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def try_withdraw(self):
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the provider is degraded instead of queueing more calls on it
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                # Let one trial call through, the others keep failing fast
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("OpenAI circuit breaker closed")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.error(f"OpenAI circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+# Event loop thread and client of the current process. They are created lazily
+# and re-created after a fork, since neither survives one.
+_lock = threading.Lock()
+_pid = None
+_loop = None
+_client = None
+
+_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+_retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MAX_TOKENS)
+
+# Marks the end of a streamed completion on its queue
+_STREAM_END = object()
+
+
+def _start_loop():
+    """Start an event loop running forever in a daemon thread"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, name="openai-event-loop", daemon=True)
+    thread.start()
+    return loop
+
+
+def get_async_client():
+    """
+    Initialize and return the AsyncOpenAI client of this process, with the
+    event loop it runs on. All OpenAI traffic of the process is multiplexed
+    over that loop and its connection pool.
+    """
+    global _pid, _loop, _client
+    if _client is None or _pid != os.getpid():
+        with _lock:
+            if _client is None or _pid != os.getpid():
+                api_key = os.environ.get("OPENAI_API_KEY")
+                if not api_key:
+                    logger.error("OPENAI_API_KEY not found in environment variables")
+                    abort(500, message="OpenAI API key not configured")
+
+                timeout = httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT, pool=POOL_TIMEOUT)
+                _loop = _start_loop()
+                _client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=os.environ.get("OPENAI_BASE_URL") or None,
+                    timeout=timeout,
+                    # Retries are handled here, within the deadline and the retry budget
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(
+                        timeout=timeout,
+                        limits=httpx.Limits(
+                            max_connections=MAX_CONNECTIONS,
+                            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=KEEPALIVE_EXPIRY,
+                        ),
+                    ),
+                )
+                _pid = os.getpid()
+    return _client, _loop
+
+
+def reset_client():
+    """
+    Drop the client, its loop, the breaker and the retry budget, so the next
+    call starts from the current settings
+    """
+    global _pid, _loop, _client, _breaker, _retry_budget
+    with _lock:
+        if _client is not None and _pid == os.getpid():
+            asyncio.run_coroutine_threadsafe(_client.close(), _loop).result(timeout=5)
+            _loop.call_soon_threadsafe(_loop.stop)
+        _pid = _loop = _client = None
+        _breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+        _retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MAX_TOKENS)
+
+
+def _is_retryable(ex):
+    """Transport errors, timeouts and overload/server statuses are worth retrying"""
+    if isinstance(ex, (openai.APIConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(ex, openai.APIStatusError):
+        return ex.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def _backoff(attempt, ex):
+    """Full-jitter exponential backoff, stretched to the server's Retry-After if any"""
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+    if isinstance(ex, openai.APIStatusError):
+        try:
+            delay = max(delay, float(ex.response.headers.get("retry-after", 0)))
+        except ValueError:
+            pass
+    return delay
+
+
+async def _call_with_retries(make_call, deadline):
+    """
+    Await make_call() under the circuit breaker, retrying transient failures
+    with jittered backoff while the retry budget and the deadline allow.
+    Raises LLMUnavailableError when the provider cannot answer in time.
+    """
+    loop = asyncio.get_running_loop()
+    breaker, retry_budget = _breaker, _retry_budget
+
+    if not breaker.allow_request():
+        raise LLMUnavailableError("OpenAI is unavailable (circuit open)")
+
+    retry_budget.deposit()
+    expires_at = loop.time() + deadline
+    attempt = 0
+
+    while True:
+        try:
+            result = await asyncio.wait_for(make_call(), expires_at - loop.time())
+        except Exception as ex:
+            if not _is_retryable(ex):
+                # The provider answered, the request itself is wrong
+                breaker.record_success()
+                raise
+
+            delay = _backoff(attempt, ex)
+            if attempt >= MAX_RETRIES or loop.time() + delay >= expires_at or not retry_budget.try_withdraw():
+                breaker.record_failure()
+                raise LLMUnavailableError(f"OpenAI request failed after {attempt + 1} attempt(s): {ex!r}") from ex
+
+            attempt += 1
+            logger.warning(f"OpenAI request failed ({ex!r}), retry {attempt} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+
+async def create_chat_completion(deadline=None, **kwargs):
+    """
+    Await a chat completion, retrying transient failures until the deadline.
+    Must run on the loop returned by get_async_client().
+    """
+    client, _ = get_async_client()
+    kwargs.setdefault("model", DEFAULT_MODEL)
+    started_at = time.perf_counter()
+    try:
+        response = await _call_with_retries(
+            lambda: client.chat.completions.create(**kwargs), deadline or DEFAULT_DEADLINE
+        )
+    except Exception:
+        observe_openai_call(kwargs["model"], "completion", "error", time.perf_counter() - started_at)
+        raise
+    observe_openai_call(kwargs["model"], "completion", "success", time.perf_counter() - started_at, response.usage)
+    return response
+
+
+async def _stream_into(chunks, deadline, kwargs):
+    """
+    Stream a chat completion and put its text deltas on a thread-safe queue,
+    followed by _STREAM_END or by the exception that ended the stream.
+    Only opening the stream is retried: once text was relayed it cannot be replayed.
+    """
+    client, loop = get_async_client()
+    kwargs.setdefault("model", DEFAULT_MODEL)
+    # The last chunk then carries the token usage of the completion
+    kwargs.setdefault("stream_options", {"include_usage": True})
+    expires_at = loop.time() + deadline
+    started_at = time.perf_counter()
+    usage = None
+
+    async def relay(stream):
+        nonlocal usage
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                chunks.put(delta)
+            if chunk.usage is not None:
+                usage = chunk.usage
+
+    try:
+        stream = await _call_with_retries(
+            lambda: client.chat.completions.create(stream=True, **kwargs), deadline
+        )
+        try:
+            await asyncio.wait_for(relay(stream), expires_at - loop.time())
+        except Exception as ex:
+            _breaker.record_failure()
+            raise LLMUnavailableError(f"OpenAI stream interrupted: {ex!r}") from ex
+        finally:
+            await stream.close()
+    except Exception as ex:
+        observe_openai_call(kwargs["model"], "stream", "error", time.perf_counter() - started_at)
+        chunks.put(ex)
+    else:
+        observe_openai_call(kwargs["model"], "stream", "success", time.perf_counter() - started_at, usage)
+        chunks.put(_STREAM_END)
+
+
+def chat_completion(deadline=None, **kwargs):
+    """
+    Create a chat completion from synchronous code (Flask views and services).
+    The request runs on the shared event loop: the calling thread only waits
+    on its result, so with threaded workers a slow LLM call costs one idle
+    thread instead of a whole worker process.
+    """
+    deadline = deadline or DEFAULT_DEADLINE
+    _, loop = get_async_client()
+    future = asyncio.run_coroutine_threadsafe(create_chat_completion(deadline=deadline, **kwargs), loop)
+    try:
+        # The coroutine enforces the deadline, this is only a safety net
+        return future.result(timeout=deadline + 1)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise LLMUnavailableError(f"OpenAI did not answer within {deadline}s")
+
+
+def stream_chat_completion(deadline=None, **kwargs):
+    """
+    Stream a chat completion from synchronous code, yielding text deltas as
+    they arrive. Closing the generator early (client went away) cancels the
+    upstream request.
+    """
+    deadline = deadline or DEFAULT_DEADLINE
+    _, loop = get_async_client()
+    chunks = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(_stream_into(chunks, deadline, kwargs), loop)
+    expires_at = time.monotonic() + deadline + 1
+
+    try:
+        while True:
+            try:
+                item = chunks.get(timeout=max(expires_at - time.monotonic(), 0))
+            except queue.Empty:
+                raise LLMUnavailableError(f"OpenAI did not finish streaming within {deadline}s")
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        future.cancel()
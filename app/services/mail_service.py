@@ -1,23 +1,259 @@
+import logging
+import os
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+
 import mailtrap as mt
+from flask import current_app
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+SENDER_EMAIL = "hello@demomailtrap.co"
+SENDER_NAME = "Mailtrap Test"
+
+# Seconds allowed to an SMTP server to answer
+SMTP_TIMEOUT = 10
+
+
+# Messages per call of the Mailtrap batch endpoint (its maximum)
+MAILTRAP_BATCH_SIZE = 500
+
+# Mailtrap client of the current process, created lazily: its HTTP session
+# (and so its connections) is reused by every send
+_lock = threading.Lock()
+_pid = None
+_sending_api = None
+
+
+def get_sending_api():
+    """
+    Return the Mailtrap sending API of this process, authenticated with MAILTRAP_API_TOKEN
+    """
+    global _pid, _sending_api
+    if _sending_api is None or _pid != os.getpid():
+        with _lock:
+            if _sending_api is None or _pid != os.getpid():
+                token = current_app.config.get("MAILTRAP_API_TOKEN")
+                if not token:
+                    raise RuntimeError("MAILTRAP_API_TOKEN is not configured")
+                _sending_api = mt.MailtrapClient(token=token).sending_api
+                _pid = os.getpid()
+    return _sending_api
+
 
 def send_email(to_email: str, subject: str, html_content: str):
     message = mt.Mail(
-        sender=mt.Address(email="hello@demomailtrap.co", name="Mailtrap Test"),
+        sender=mt.Address(email=SENDER_EMAIL, name=SENDER_NAME),
         to=[mt.Address(email=to_email)],
         subject=subject,
         html=html_content,
         category="Integration Test",
     )
-    
+
     try:
-        client = mt.MailtrapClient(token="956ec04e6965703cc22781fab783a17e")
-        response = client.send(message)
+        response = get_sending_api().send(message)
         return {
             "status": "success",
-            "message": response
+            "message": {"success": response.success, "message_ids": response.message_ids}
         }
     except Exception as e:
         return {
             "status": "error",
             "message": str(e)
         }
+
+
+class MailtrapBatchTransport:
+    """
+    Send a list of messages with one call of the Mailtrap batch endpoint.
+    Returns the number of messages that failed.
+    """
+
+    def __init__(self, sending_api):
+        self.sending_api = sending_api
+
+    def __call__(self, messages):
+        response = self.sending_api.batch_send(mt.BatchSendEmailParams(
+            base=mt.BatchMail(
+                sender=mt.Address(email=SENDER_EMAIL, name=SENDER_NAME),
+                subject=messages[0]["subject"],
+                category="Daily Report",
+            ),
+            requests=[
+                mt.BatchEmailRequest(
+                    to=[mt.Address(email=message["to"])],
+                    subject=message["subject"],
+                    html=message["html"],
+                )
+                for message in messages
+            ],
+        ))
+        failed = [
+            (message["to"], item.errors)
+            for message, item in zip(messages, response.responses)
+            if not item.success
+        ]
+        for to_email, errors in failed:
+            logger.error(f"Failed to send email to {to_email}: {errors}")
+        return len(failed)
+
+
+class SmtpTransport:
+    """
+    Send messages through an SMTP server, keeping one open connection per
+    sending thread instead of connecting for every message.
+    Returns the number of messages that failed.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+            self._local.connection = connection
+        return connection
+
+    def _send(self, message):
+        email = EmailMessage()
+        email["From"] = f"{SENDER_NAME} <{SENDER_EMAIL}>"
+        email["To"] = message["to"]
+        email["Subject"] = message["subject"]
+        email.set_content(message["html"], subtype="html")
+
+        try:
+            self._connection().send_message(email)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # The server closed an idle connection: reconnect once
+            self._local.connection = None
+            self._connection().send_message(email)
+
+    def __call__(self, messages):
+        failed = 0
+        for message in messages:
+            try:
+                self._send(message)
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to send email to {message['to']}: {e}")
+        return failed
+
+
+def get_transport():
+    """
+    Return the transport of the MAIL_BACKEND of the config ("mailtrap" or
+    "smtp") with the number of messages it takes per call
+    """
+    backend = current_app.config.get("MAIL_BACKEND", "mailtrap")
+    if backend == "smtp":
+        return SmtpTransport(current_app.config["MAIL_SMTP_HOST"], current_app.config["MAIL_SMTP_PORT"]), 1
+    if backend == "mailtrap":
+        return MailtrapBatchTransport(get_sending_api()), MAILTRAP_BATCH_SIZE
+    raise ValueError(f"Unknown mail backend: {backend}")
+
+
+class RateLimiter:
+    """
+    Token bucket allowing 'rate' acquisitions per second, in bursts of up to 'rate'
+    """
+
+    def __init__(self, rate, clock=time.monotonic):
+        self.rate = rate
+        self.clock = clock
+        self.tokens = rate
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.tokens + (now - self.updated_at) * self.rate, self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class MailSender:
+    """
+    Deliver many messages through a pool of 'max_workers' threads, grouped
+    in batches of 'batch_size' per transport call, with at most 'rate' calls
+    per second. submit() blocks once 'max_pending' batches wait, so a
+    producer streaming messages never holds more than that in memory.
+    Use as a context manager: leaving it waits for every delivery.
+    """
+
+    def __init__(self, transport, max_workers=8, rate=50, batch_size=1, max_pending=None):
+        self.transport = transport
+        self.batch_size = batch_size
+        self.rate_limiter = RateLimiter(rate)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mail-sender")
+        self.pending = threading.BoundedSemaphore(max_pending or max_workers * 4)
+        self.batch = []
+        self.sent = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def _deliver(self, messages):
+        try:
+            self.rate_limiter.acquire()
+            failed = self.transport(messages)
+        except Exception as e:
+            failed = len(messages)
+            logger.error(f"Failed to send {len(messages)} email(s): {e}")
+        finally:
+            self.pending.release()
+        with self._lock:
+            self.sent += len(messages) - failed
+            self.failed += failed
+
+    def _flush(self):
+        if self.batch:
+            self.pending.acquire()
+            self.executor.submit(self._deliver, self.batch)
+            self.batch = []
+
+    def submit(self, message):
+        self.batch.append(message)
+        if len(self.batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self.executor.shutdown(wait=True)
+        return {"sent": self.sent, "failed": self.failed}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def send_bulk(messages, max_workers=None, rate=None):
+    """
+    Send many messages ({"to", "subject", "html"}, any iterable, consumed as
+    it goes). Uses the provider's batch endpoint when there is one, otherwise
+    a bounded pool of senders. Returns the counts of sent and failed messages.
+    """
+    transport, batch_size = get_transport()
+    sender = MailSender(
+        transport,
+        max_workers=max_workers or current_app.config.get("MAIL_MAX_CONCURRENCY", 8),
+        rate=rate or current_app.config.get("MAIL_RATE_LIMIT", 50),
+        batch_size=batch_size,
+    )
+    with sender:
+        for message in messages:
+            sender.submit(message)
+    return {"sent": sender.sent, "failed": sender.failed}
@@ -0,0 +1,136 @@
+import logging
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import db
+from app.models.daily_nutrition_summary_model import DailyNutritionSummaryModel
+from app.models.food_log_model import FoodLogModel
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+
+def apply_delta(user_id, log_date, calories=0, protein=0.0, carbs=0.0, fat=0.0):
+    """
+    Add (or subtract, with negative values) nutrients to the daily summary row
+    of a user. The row is created on first use. Runs inside the caller's
+    transaction, so it is committed or rolled back together with the food log.
+    """
+    stmt = insert(DailyNutritionSummaryModel).values(
+        user_id=user_id,
+        log_date=log_date,
+        total_calories=calories,
+        total_protein=protein,
+        total_carbs=carbs,
+        total_fat=fat,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyNutritionSummaryModel.user_id, DailyNutritionSummaryModel.log_date],
+        set_={
+            "total_calories": DailyNutritionSummaryModel.total_calories + stmt.excluded.total_calories,
+            "total_protein": DailyNutritionSummaryModel.total_protein + stmt.excluded.total_protein,
+            "total_carbs": DailyNutritionSummaryModel.total_carbs + stmt.excluded.total_carbs,
+            "total_fat": DailyNutritionSummaryModel.total_fat + stmt.excluded.total_fat,
+            "updated_at": func.now(),
+        },
+    )
+    db.session.execute(stmt)
+
+
+def add_food_log(food_log):
+    """
+    Add a food log's nutrients to its day
+    """
+    apply_delta(
+        food_log.user_id,
+        food_log.log_date,
+        calories=food_log.calories or 0,
+        protein=food_log.protein or 0.0,
+        carbs=food_log.carbs or 0.0,
+        fat=food_log.fat or 0.0,
+    )
+
+
+def remove_food_log(food_log):
+    """
+    Remove a food log's nutrients from its day
+    """
+    apply_delta(
+        food_log.user_id,
+        food_log.log_date,
+        calories=-(food_log.calories or 0),
+        protein=-(food_log.protein or 0.0),
+        carbs=-(food_log.carbs or 0.0),
+        fat=-(food_log.fat or 0.0),
+    )
+
+
+# Columns filled from the food log aggregate, in select order
+SUMMARY_COLUMNS = ["user_id", "log_date", "total_calories", "total_protein", "total_carbs", "total_fat", "updated_at"]
+
+
+def _aggregate_food_logs():
+    """
+    SELECT of the summary rows computed from the raw food logs, one per user and day
+    """
+    return select(
+        FoodLogModel.user_id,
+        FoodLogModel.log_date,
+        func.coalesce(func.sum(FoodLogModel.calories), 0),
+        func.coalesce(func.sum(FoodLogModel.protein), 0.0),
+        func.coalesce(func.sum(FoodLogModel.carbs), 0.0),
+        func.coalesce(func.sum(FoodLogModel.fat), 0.0),
+        func.now(),
+    ).group_by(FoodLogModel.user_id, FoodLogModel.log_date)
+
+
+def refresh_days(user_id, log_dates):
+    """
+    Recompute the summary rows of some days of a user from the raw food logs.
+    Used after bulk writes, where per-row deltas are not known. Runs inside
+    the caller's transaction.
+    """
+    log_dates = list(set(log_dates))
+    if not log_dates:
+        return
+
+    DailyNutritionSummaryModel.query.filter(
+        DailyNutritionSummaryModel.user_id == user_id,
+        DailyNutritionSummaryModel.log_date.in_(log_dates)
+    ).delete(synchronize_session=False)
+
+    aggregate = _aggregate_food_logs().where(
+        FoodLogModel.user_id == user_id,
+        FoodLogModel.log_date.in_(log_dates)
+    )
+    db.session.execute(
+        insert(DailyNutritionSummaryModel).from_select(SUMMARY_COLUMNS, aggregate)
+    )
+
+
+def rebuild_daily_nutrition_summary(user_id=None):
+    """
+    Recompute daily summaries from the raw food logs, for one user or for everyone.
+    Used to backfill the table and to repair drift.
+    """
+    delete_query = DailyNutritionSummaryModel.query
+    aggregate = _aggregate_food_logs()
+
+    if user_id:
+        delete_query = delete_query.filter_by(user_id=user_id)
+        aggregate = aggregate.where(FoodLogModel.user_id == user_id)
+
+    try:
+        delete_query.delete(synchronize_session=False)
+        result = db.session.execute(
+            insert(DailyNutritionSummaryModel).from_select(SUMMARY_COLUMNS, aggregate)
+        )
+        db.session.commit()
+    except Exception as ex:
+        db.session.rollback()
+        logger.error(f"Failed to rebuild daily nutrition summary: {ex}")
+        raise
+
+    logger.info("Rebuilt %s daily nutrition summary rows", result.rowcount)
+    return result.rowcount
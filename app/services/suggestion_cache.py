@@ -0,0 +1,77 @@
+import copy
+import hashlib
+import json
+import logging
+import threading
+
+from flask import current_app
+
+from app.utils.cache import TTLCache
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Width of the age and BMI bands profiles are grouped by: users of the same
+# band, gender, activity level and target share their suggestions
+AGE_BAND = 5
+BMI_BAND = 1.0
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Return the suggestion cache of this process, sized from the config
+    (SUGGESTION_CACHE_SIZE entries kept SUGGESTION_CACHE_TTL seconds)
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTLCache(
+                    maxsize=current_app.config.get("SUGGESTION_CACHE_SIZE", 1024),
+                    ttl=current_app.config.get("SUGGESTION_CACHE_TTL", 3600),
+                )
+    return _cache
+
+
+def _band(value, width):
+    """Lower bound of the band of 'value', or None when unknown"""
+    if value is None:
+        return None
+    return float(value // width * width)
+
+
+def fingerprint(kind, user_info, **params):
+    """
+    Key of a suggestion: the kind of plan, the profile normalized to its
+    bands and the request parameters. Exact height and weight are left out,
+    the BMI band stands for them.
+    """
+    normalized = {
+        "kind": kind,
+        "age": _band(user_info.get("age"), AGE_BAND),
+        "gender": user_info.get("gender"),
+        "bmi": _band(user_info.get("bmi"), BMI_BAND),
+        "activity_level": user_info.get("activity_level"),
+        "target": user_info.get("target") or None,
+        "params": {key: str(value) if value is not None else None for key, value in params.items()},
+    }
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_plan(key):
+    """
+    Return a copy of the cached plan of 'key', or None. Callers may modify it.
+    """
+    plan = get_cache().get(key)
+    if plan is None:
+        return None
+    logger.info("Suggestion cache hit: %s", key[:12])
+    return copy.deepcopy(plan)
+
+
+def store_plan(key, plan):
+    get_cache().set(key, copy.deepcopy(plan))
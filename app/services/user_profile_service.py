@@ -47,7 +47,7 @@ def create_user_profile(user_id, profile_data):
         db.session.add(profile)
         db.session.commit()
 
-        logger.info(f"User profile created successfully for user_id: {user_id}")
+        logger.info("User profile created successfully for user_id: %s", user_id)
         return profile
 
     except Exception as ex:
@@ -84,7 +84,7 @@ def update_user_profile(user_id, profile_data):
 
         db.session.commit()
 
-        logger.info(f"User profile updated successfully for user_id: {user_id}")
+        logger.info("User profile updated successfully for user_id: %s", user_id)
         return profile
 
     except Exception as ex:
@@ -107,7 +107,7 @@ def delete_user_profile(user_id):
         db.session.delete(profile)
         db.session.commit()
 
-        logger.info(f"User profile deleted successfully for user_id: {user_id}")
+        logger.info("User profile deleted successfully for user_id: %s", user_id)
         return {"message": "User profile deleted successfully"}
 
     except Exception as ex:
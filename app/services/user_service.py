@@ -1,5 +1,7 @@
 import logging
+from datetime import datetime
 
+from flask import current_app
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -15,6 +17,7 @@ from app.models.blocklist_model import BlocklistModel
 from app.models.user_model import UserModel
 from app.models.user_profile_model import UserProfileModel
 from app.services import user_profile_service
+from app.utils.auth import invalidate_user_state, mark_jti_revoked
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
@@ -105,6 +108,7 @@ def update_block_user(user_data, user_id):
 
         db.session.add(user)
         db.session.commit()
+        invalidate_user_state(user_id)
     except Exception as ex:
         db.session.rollback()
         logger.error(f"Can not update status block User! Error: {ex}")
@@ -126,6 +130,7 @@ def delete_user(id):
         abort(400, message="User doesn't exist, cannot delete!")
 
     db.session.commit()
+    invalidate_user_state(id)
     return {"message": "Delete successfully!"}
 
 
@@ -141,7 +146,7 @@ def login_user(user_data):
         # Create refresh_token
         refresh_token = create_refresh_token(identity=user.id)
 
-        logger.info(f"User login successfully! email: {user_data['email']}")
+        logger.info("User login successfully! email: %s", user_data['email'])
 
         # Get user profile information
         profile = user.user_profile
@@ -221,10 +226,10 @@ def refresh_token():
     refresh_token = create_refresh_token(identity=current_user_id)
 
     # Block previous access_token
-    jti = get_jwt()["jti"]
+    jwt = get_jwt()
 
-    # Block access token
-    add_jti_blocklist(jti)
+    # Block access token until it expires
+    add_jti_blocklist(jwt["jti"], datetime.utcfromtimestamp(jwt["exp"]) if jwt.get("exp") else None)
 
     return {"access_token": access_token, "refresh_token": refresh_token}
 
@@ -279,13 +284,17 @@ def get_current_user():
 
 
 
-def add_jti_blocklist(jti):
-    # Add to blockist when remove jti
-    new_row = BlocklistModel(jti_blocklist=str(jti))
+def add_jti_blocklist(jti, expires_at=None):
+    # Add to blockist when remove jti, until the token expires (by default
+    # the longest an access token can live)
+    if expires_at is None:
+        expires_at = datetime.utcnow() + current_app.config["JWT_ACCESS_TOKEN_EXPIRES"]
+    new_row = BlocklistModel(jti_blocklist=str(jti), expires_at=expires_at)
 
     try:
         db.session.add(new_row)
         db.session.commit()
+        mark_jti_revoked(str(jti))
     except Exception as ex:
         db.session.rollback()
         logger.error(f"Can not add jti! Error: {ex}")
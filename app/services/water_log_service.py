@@ -5,14 +5,15 @@ from flask_smorest import abort
 
 from app.db import db
 from app.models.water_log_model import WaterLogModel
+from app.utils.pagination import STREAM_BATCH_SIZE, keyset_page, order_by_keyset
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 
-def get_all_water_logs(user_id=None, log_date=None):
+def _water_logs_query(user_id=None, log_date=None):
     """
-    Get all water logs, optionally filtered by user_id and/or log_date
+    Build the water logs query, optionally filtered by user_id and/or log_date
     """
     query = WaterLogModel.query
 
@@ -21,10 +22,34 @@ def get_all_water_logs(user_id=None, log_date=None):
     if log_date:
         query = query.filter_by(log_date=log_date)
 
-    water_logs = query.all()
+    return query
+
+
+def get_all_water_logs(user_id=None, log_date=None):
+    """
+    Get all water logs, optionally filtered by user_id and/or log_date
+    """
+    query = _water_logs_query(user_id, log_date)
+    water_logs = order_by_keyset(query, WaterLogModel).all()
     return water_logs
 
 
+def get_water_logs_page(user_id=None, log_date=None, cursor=None, limit=None):
+    """
+    Get one page of water logs ordered by (log_date, id) and the cursor of the next page
+    """
+    query = _water_logs_query(user_id, log_date)
+    return keyset_page(query, WaterLogModel, cursor, limit)
+
+
+def stream_water_logs(user_id=None, log_date=None):
+    """
+    Iterate water logs ordered by (log_date, id), fetching them in batches
+    """
+    query = _water_logs_query(user_id, log_date)
+    return order_by_keyset(query, WaterLogModel).yield_per(STREAM_BATCH_SIZE)
+
+
 def get_water_log(water_log_id):
     """
     Get water log by id
@@ -52,7 +77,7 @@ def create_water_log(user_id, water_log_data):
         db.session.add(water_log)
         db.session.commit()
 
-        logger.info(f"Water log created successfully with id: {water_log.id}")
+        logger.info("Water log created successfully with id: %s", water_log.id)
         return water_log
 
     except Exception as ex:
@@ -79,7 +104,7 @@ def update_water_log(water_log_id, water_log_data):
 
         db.session.commit()
 
-        logger.info(f"Water log updated successfully with id: {water_log_id}")
+        logger.info("Water log updated successfully with id: %s", water_log_id)
         return water_log
 
     except Exception as ex:
@@ -102,7 +127,7 @@ def delete_water_log(water_log_id):
         db.session.delete(water_log)
         db.session.commit()
 
-        logger.info(f"Water log deleted successfully with id: {water_log_id}")
+        logger.info("Water log deleted successfully with id: %s", water_log_id)
         return {"message": "Water log deleted successfully"}
 
     except Exception as ex:
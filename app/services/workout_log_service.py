@@ -5,14 +5,15 @@ from flask_smorest import abort
 
 from app.db import db
 from app.models.workout_log_model import WorkoutLogModel
+from app.utils.pagination import STREAM_BATCH_SIZE, keyset_page, order_by_keyset
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
 
-def get_all_workout_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+def _workout_logs_query(user_id=None, log_date=None, start_day=None, end_day=None):
     """
-    Get all workout logs, optionally filtered by user_id, log_date, or date range (start_day, end_day)
+    Build the workout logs query, optionally filtered by user_id, log_date, or date range (start_day, end_day)
     """
     query = WorkoutLogModel.query
 
@@ -36,10 +37,34 @@ def get_all_workout_logs(user_id=None, log_date=None, start_day=None, end_day=No
                 end_day = datetime.strptime(end_day, '%Y-%m-%d').date()
             query = query.filter(WorkoutLogModel.log_date <= end_day)
 
-    workout_logs = query.all()
+    return query
+
+
+def get_all_workout_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+    """
+    Get all workout logs, optionally filtered by user_id, log_date, or date range (start_day, end_day)
+    """
+    query = _workout_logs_query(user_id, log_date, start_day, end_day)
+    workout_logs = order_by_keyset(query, WorkoutLogModel).all()
     return workout_logs
 
 
+def get_workout_logs_page(user_id=None, log_date=None, start_day=None, end_day=None, cursor=None, limit=None):
+    """
+    Get one page of workout logs ordered by (log_date, id) and the cursor of the next page
+    """
+    query = _workout_logs_query(user_id, log_date, start_day, end_day)
+    return keyset_page(query, WorkoutLogModel, cursor, limit)
+
+
+def stream_workout_logs(user_id=None, log_date=None, start_day=None, end_day=None):
+    """
+    Iterate workout logs ordered by (log_date, id), fetching them in batches
+    """
+    query = _workout_logs_query(user_id, log_date, start_day, end_day)
+    return order_by_keyset(query, WorkoutLogModel).yield_per(STREAM_BATCH_SIZE)
+
+
 def get_workout_log(workout_log_id):
     """
     Get workout log by id
@@ -74,7 +99,7 @@ def create_workout_log(user_id, workout_log_data):
         db.session.add(workout_log)
         db.session.commit()
 
-        logger.info(f"Workout log created successfully with id: {workout_log.id}")
+        logger.info("Workout log created successfully with id: %s", workout_log.id)
         return workout_log
 
     except Exception as ex:
@@ -115,7 +140,7 @@ def update_workout_log(workout_log_id, workout_log_data):
 
         db.session.commit()
 
-        logger.info(f"Workout log updated successfully with id: {workout_log_id}")
+        logger.info("Workout log updated successfully with id: %s", workout_log_id)
         return workout_log
 
     except Exception as ex:
@@ -138,7 +163,7 @@ def delete_workout_log(workout_log_id):
         db.session.delete(workout_log)
         db.session.commit()
 
-        logger.info(f"Workout log deleted successfully with id: {workout_log_id}")
+        logger.info("Workout log deleted successfully with id: %s", workout_log_id)
         return {"message": "Workout log deleted successfully"}
 
     except Exception as ex:
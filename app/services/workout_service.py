@@ -50,7 +50,7 @@ def create_workout(workout_data):
         db.session.add(workout)
         db.session.commit()
 
-        logger.info(f"Workout created successfully with id: {workout.id}")
+        logger.info("Workout created successfully with id: %s", workout.id)
         return workout
 
     except Exception as ex:
@@ -79,7 +79,7 @@ def update_workout(workout_id, workout_data):
 
         db.session.commit()
 
-        logger.info(f"Workout updated successfully with id: {workout_id}")
+        logger.info("Workout updated successfully with id: %s", workout_id)
         return workout
 
     except Exception as ex:
@@ -102,7 +102,7 @@ def delete_workout(workout_id):
         db.session.delete(workout)
         db.session.commit()
 
-        logger.info(f"Workout deleted successfully with id: {workout_id}")
+        logger.info("Workout deleted successfully with id: %s", workout_id)
         return {"message": "Workout deleted successfully"}
 
     except Exception as ex:
@@ -1,33 +1,23 @@
 import json
 import logging
-import os
 from datetime import date, datetime, timedelta
 
 from flask_smorest import abort
-from openai import OpenAI
 
 from app.db import db
 from app.models.workout_log_model import WorkoutLogModel
 from app.models.enums import WorkoutTypeEnum
-from app.services import user_profile_service, workout_service, workout_log_service
+from app.services import llm_client, suggestion_cache, user_profile_service, workout_service, workout_log_service
 
 # Create logger for this module
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = None
-
-
-def get_openai_client():
-    """Initialize and return OpenAI client"""
-    global openai_client
-    if openai_client is None:
-        api_key = os.environ.get("OPENAI_API_KEY")
-        if not api_key:
-            logger.error("OPENAI_API_KEY not found in environment variables")
-            abort(500, message="OpenAI API key not configured")
-        openai_client = OpenAI(api_key=api_key)
-    return openai_client
+# Map enum to integer: 0: cardio, 1: strength, 2: flexibility
+WORKOUT_TYPE_MAP = {
+    WorkoutTypeEnum.cardio: 0,
+    WorkoutTypeEnum.strength: 1,
+    WorkoutTypeEnum.flexibility: 2
+}
 
 
 def suggest_workout_plan(user_id, start_date=None, end_date=None):
@@ -109,37 +99,43 @@ Lưu ý:
 - Đảm bảo phù hợp với mục tiêu và tình trạng sức khỏe của người dùng
 - Trả về chỉ JSON, không có text thêm"""
 
+    # Users of the same profile cohort planning the same dates share plans
+    cache_key = suggestion_cache.fingerprint("workout", user_info, start_date=start_date, end_date=end_date)
+
     try:
-        client = get_openai_client()
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "Bạn là một chuyên gia thể dục. Trả về chỉ JSON, không có text thêm."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
-        )
-
-        # Parse response
-        response_content = response.choices[0].message.content
-        workout_plan = json.loads(response_content)
-
-        # Validate response structure
-        if "sessions_per_week" not in workout_plan or "workouts" not in workout_plan:
-            logger.error("Invalid workout plan structure from OpenAI")
-            abort(500, message="Invalid workout plan structure received from AI")
+        workout_plan = suggestion_cache.get_plan(cache_key)
+
+        if workout_plan is None:
+            response = llm_client.chat_completion(
+                model="gpt-4o-mini",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Bạn là một chuyên gia thể dục. Trả về chỉ JSON, không có text thêm."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ],
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+
+            # Parse response
+            response_content = response.choices[0].message.content
+            workout_plan = json.loads(response_content)
+
+            # Validate response structure
+            if "sessions_per_week" not in workout_plan or "workouts" not in workout_plan:
+                logger.error("Invalid workout plan structure from OpenAI")
+                abort(500, message="Invalid workout plan structure received from AI")
+
+            suggestion_cache.store_plan(cache_key, workout_plan)
+
+        # Validate and parse every workout before touching the database
+        parsed_workouts = []
 
-        # Process workouts and create workout logs
-        created_workouts = []
-        created_logs = []
-        
         for workout_data in workout_plan["workouts"]:
             # Validate required fields
             required_fields = ["name", "type", "duration_min", "log_date"]
@@ -151,13 +147,7 @@ Lưu ý:
             try:
                 workout_type_str = workout_data["type"].lower()
                 workout_type_enum = WorkoutTypeEnum(workout_type_str)
-                # Map enum to integer: 0: cardio, 1: strength, 2: flexibility
-                workout_type_map = {
-                    WorkoutTypeEnum.cardio: 0,
-                    WorkoutTypeEnum.strength: 1,
-                    WorkoutTypeEnum.flexibility: 2
-                }
-                workout_type_int = workout_type_map.get(workout_type_enum, 0)
+                workout_type_int = WORKOUT_TYPE_MAP.get(workout_type_enum, 0)
             except (ValueError, AttributeError) as e:
                 logger.error(f"Invalid workout type: {workout_data.get('type')}, error: {e}")
                 continue  # Skip this workout if type is invalid
@@ -169,6 +159,24 @@ Lưu ý:
                 logger.error(f"Invalid log date format from AI: {workout_data['log_date']}")
                 continue
 
+            parsed_workouts.append((workout_data, workout_type_int, workout_log_date))
+
+        # Load every existing log of the plan's date range in one query,
+        # indexed by (log_date, workout_type)
+        existing_logs = {}
+        if parsed_workouts:
+            plan_dates = [workout_log_date for _, _, workout_log_date in parsed_workouts]
+            for log in WorkoutLogModel.query.filter(
+                WorkoutLogModel.user_id == user_id,
+                WorkoutLogModel.log_date >= min(plan_dates),
+                WorkoutLogModel.log_date <= max(plan_dates)
+            ).order_by(WorkoutLogModel.created_at):
+                existing_logs.setdefault((log.log_date, log.workout_type), log)
+
+        # Process workouts and create workout logs
+        created_workouts = []
+
+        for workout_data, workout_type_int, workout_log_date in parsed_workouts:
             link_reference = workout_data.get("link_reference")
             if link_reference and not isinstance(link_reference, str):
                 link_reference = None                                           
@@ -181,11 +189,7 @@ Lưu ý:
             }
 
             # Check if workout log already exists for this date and workout type
-            existing_log = WorkoutLogModel.query.filter_by(
-                user_id=user_id,
-                log_date=workout_log_date,
-                workout_type=workout_type_int
-            ).first()
+            existing_log = existing_logs.get((workout_log_date, workout_type_int))
 
             if not existing_log:
                 # Create workout log
@@ -200,18 +204,19 @@ Lưu ý:
                     description=workout_data.get("description", "")
                 )
                 db.session.add(workout_log)
-                created_logs.append(workout_log)
+                # A later workout of the same day and type updates this one
+                existing_logs[(workout_log_date, workout_type_int)] = workout_log
             else:
                 # Update existing log
-                existing_log.duration_min = workout_data["duration_min"]
-                existing_log.calories_burned = workout_data.get("calories_burned")
-                existing_log.workout_type = workout_type_int
-                existing_log.workout_metadata = workout_metadata
-                existing_log.description = workout_data.get("description", "")
-                created_logs.append(existing_log)
+                workout_log = existing_log
+                workout_log.duration_min = workout_data["duration_min"]
+                workout_log.calories_burned = workout_data.get("calories_burned")
+                workout_log.workout_type = workout_type_int
+                workout_log.workout_metadata = workout_metadata
+                workout_log.description = workout_data.get("description", "")
 
             created_workouts.append({
-                "log": created_logs[-1] if created_logs else None,
+                "log": workout_log,
                 "name": workout_data["name"],
                 "type": workout_data["type"],
                 "description": workout_data.get("description", ""),
@@ -219,10 +224,20 @@ Lưu ý:
                 "link_reference": workout_data.get("link_reference")
             })
 
-        # Commit all changes
+        # Commit all changes (inserts and updates go out in a single flush)
+        db.session.flush()
+        log_ids = {item["log"].id for item in created_workouts}
         db.session.commit()
 
-        logger.info(f"Workout plan created successfully for user_id: {user_id}")
+        # The commit expired the logs: reload them in one query rather than
+        # one refresh per log when the response is serialized
+        if log_ids:
+            db.session.scalars(
+                db.select(WorkoutLogModel).where(WorkoutLogModel.id.in_(log_ids)),
+                execution_options={"populate_existing": True}
+            ).all()
+
+        logger.info("Workout plan created successfully for user_id: %s", user_id)
         
         return {
             "sessions_per_week": workout_plan["sessions_per_week"],
@@ -230,6 +245,10 @@ Lưu ý:
             "workouts": created_workouts
         }
 
+    except llm_client.LLMUnavailableError as e:
+        logger.error(f"OpenAI unavailable while generating workout plan: {e}")
+        db.session.rollback()
+        abort(503, message="AI service is temporarily unavailable, please try again later")
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse OpenAI response: {e}")
         db.session.rollback()
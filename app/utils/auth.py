@@ -1,16 +1,132 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
 from flask import jsonify
 
+from app.db import db
 from app.extention import jwt
 from app.models import UserModel, BlocklistModel
+from app.utils.bloom import BloomFilter
+from app.utils.cache import TTLCache
+
+# Block flag and role of recently seen users, so authenticating a request
+# does not query the users table. Changes made in this process invalidate
+# the entry at once; other processes see them after USER_STATE_TTL seconds.
+USER_STATE_TTL = 60
+USER_STATE_CACHE_SIZE = 10000
+
+# Blocklist answers of the tokens the Bloom filter below could not rule out
+REVOKED_JTI_TTL = 60
+REVOKED_JTI_CACHE_SIZE = 10000
+
+# Bloom filter of the revoked jtis: a token it does not contain was never
+# revoked, without asking the database. It picks up the rows added by other
+# processes every BLOOM_SYNC_INTERVAL seconds, and is rebuilt from scratch
+# every BLOOM_REBUILD_INTERVAL seconds to drop the pruned ones.
+BLOOM_ERROR_RATE = 0.01
+BLOOM_MIN_CAPACITY = 10000
+BLOOM_SYNC_INTERVAL = 30
+BLOOM_REBUILD_INTERVAL = 3600
+# Rows are read again this far back at each sync, in case their transaction
+# committed after the previous sync
+BLOOM_SYNC_OVERLAP = timedelta(seconds=60)
+
+user_state_cache = TTLCache(maxsize=USER_STATE_CACHE_SIZE, ttl=USER_STATE_TTL)
+revoked_jti_cache = TTLCache(maxsize=REVOKED_JTI_CACHE_SIZE, ttl=REVOKED_JTI_TTL)
+
+_revoked_jti_filter = None
+_filter_built_at = 0.0
+_filter_synced_at = 0.0
+_filter_synced_until = None
+_filter_lock = threading.Lock()
+
+
+def get_user_state(user_id):
+    """
+    Return (block, role) of a user, or None if the user does not exist
+    """
+    state = user_state_cache.get(user_id)
+    if state is None:
+        row = db.session.query(UserModel.block, UserModel.role).filter(UserModel.id == user_id).first()
+        state = (row.block, row.role) if row else ()
+        user_state_cache.set(user_id, state)
+    return state or None
+
+
+def invalidate_user_state(user_id):
+    """
+    Forget the cached state of a user, after it was blocked, unblocked or deleted
+    """
+    user_state_cache.delete(user_id)
+
+
+def _build_revoked_jti_filter(now):
+    global _revoked_jti_filter, _filter_built_at, _filter_synced_at, _filter_synced_until
+    synced_until = datetime.utcnow() - BLOOM_SYNC_OVERLAP
+    jtis = db.session.scalars(
+        db.select(BlocklistModel.jti_blocklist).where(BlocklistModel.expires_at > datetime.utcnow())
+    ).all()
+
+    revoked_jti_filter = BloomFilter(max(len(jtis) * 2, BLOOM_MIN_CAPACITY), BLOOM_ERROR_RATE)
+    for jti in jtis:
+        revoked_jti_filter.add(jti)
+
+    _revoked_jti_filter = revoked_jti_filter
+    _filter_built_at = _filter_synced_at = now
+    _filter_synced_until = synced_until
+
+
+def _sync_revoked_jti_filter(now):
+    global _filter_synced_at, _filter_synced_until
+    synced_until = datetime.utcnow() - BLOOM_SYNC_OVERLAP
+    jtis = db.session.scalars(
+        db.select(BlocklistModel.jti_blocklist).where(BlocklistModel.created_at >= _filter_synced_until)
+    )
+    for jti in jtis:
+        _revoked_jti_filter.add(jti)
+
+    _filter_synced_at = now
+    _filter_synced_until = synced_until
+
+
+def get_revoked_jti_filter():
+    """
+    Return the Bloom filter of revoked jtis of this process, built or brought
+    up to date first when due. A single thread refreshes it, the others keep
+    using the current one meanwhile.
+    """
+    now = time.monotonic()
+    due = (
+        _revoked_jti_filter is None
+        or now - _filter_synced_at >= BLOOM_SYNC_INTERVAL
+    )
+    if due and _filter_lock.acquire(blocking=_revoked_jti_filter is None):
+        try:
+            if _revoked_jti_filter is None or now - _filter_built_at >= BLOOM_REBUILD_INTERVAL:
+                _build_revoked_jti_filter(now)
+            elif now - _filter_synced_at >= BLOOM_SYNC_INTERVAL:
+                _sync_revoked_jti_filter(now)
+        finally:
+            _filter_lock.release()
+    return _revoked_jti_filter
+
+
+def mark_jti_revoked(jti):
+    """
+    Record in this process that a token was added to the blocklist
+    """
+    revoked_jti_cache.set(jti, True)
+    if _revoked_jti_filter is not None:
+        _revoked_jti_filter.add(jti)
 
 
 @jwt.token_verification_loader
 def custom_token_verification_callback(jwt_header, jwt_data):
-    # Query in database
-    user = UserModel.query.filter_by(id=jwt_data["sub"]).first()
+    state = get_user_state(jwt_data["sub"])
 
-    # If user was blocked, user will not access.
-    if user.block is True:
+    # Deleted users, and blocked ones, will not access.
+    if state is None or state[0] is True:
         return False
 
     return True
@@ -18,7 +134,21 @@ def custom_token_verification_callback(jwt_header, jwt_data):
 
 @jwt.token_in_blocklist_loader
 def check_if_token_in_blocklist(jwt_header, jwt_payload):
-    return BlocklistModel.query.filter_by(jti_blocklist=jwt_payload["jti"]).first()
+    jti = jwt_payload["jti"]
+    if jti not in get_revoked_jti_filter():
+        return False
+
+    # Revoked, or a false positive of the filter
+    revoked = revoked_jti_cache.get(jti)
+    if revoked is None:
+        revoked = db.session.query(
+            BlocklistModel.query.filter_by(jti_blocklist=jti).exists()
+        ).scalar()
+        if revoked:
+            mark_jti_revoked(jti)
+        else:
+            revoked_jti_cache.set(jti, False)
+    return revoked
 
 
 @jwt.revoked_token_loader
@@ -43,9 +173,9 @@ def token_not_fresh_callback(jwt_header, jwt_payload):
 
 @jwt.additional_claims_loader
 def add_claims_to_jwt(identity):
-    # identity is user ID, check role from database
-    user = UserModel.query.filter_by(id=identity).first()
-    if user and user.role == 1:  # 1: admin, 2: user
+    # identity is user ID, check role from database (or the cache)
+    state = get_user_state(identity)
+    if state and state[1] == 1:  # 1: admin, 2: user
         return {"is_admin": True}
     return {"is_admin": False}
 
@@ -14,6 +14,7 @@ logger = logging.getLogger(__name__)
 def permission_required(permission_name):
     """Simplified permission check - only checks if user is admin (role == 1)"""
     def decorator(func):
+        @wraps(func)
         def wrapper(*arg, **kwargs):
             jwt_data = get_jwt()
             is_admin = jwt_data.get("is_admin", False)
@@ -32,7 +33,7 @@ def time_profiling(func):
         start_time = time.time()
         result = func(*args, **kwargs)
         end_time = time.time()
-        logger.info(f"Function {func.__name__} took {end_time-start_time:.4f}s.")
+        logger.info("Function %s took %.4fs.", func.__name__, end_time-start_time)
         return result
 
     return wrapper
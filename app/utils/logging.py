@@ -1,26 +1,63 @@
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
 
 import pytz
 from flask import Flask
 
+# Background writer of the current logging pipeline, see configure_logging
+_listener = None
+
+
+class TimezoneFormatter(logging.Formatter):
+    """
+    Formatter writing record times in 'timezone'. The formatted time only
+    changes once a second, so it is computed once per second, not per record.
+    """
+
+    def __init__(self, fmt, datefmt, timezone):
+        super().__init__(fmt, datefmt=datefmt)
+        self.timezone = timezone
+        self._cached_time = (None, None)
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, formatted = self._cached_time
+        if cached_second != second:
+            local_time = datetime.fromtimestamp(second, self.timezone)
+            formatted = local_time.strftime(datefmt or self.default_time_format)
+            self._cached_time = (second, formatted)
+        return formatted
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
 
 def configure_logging(app: Flask):
+    global _listener
+
     # Create a logger instance
     logger = logging.getLogger(app.name)
 
-    # Set the logging level
-    logger.setLevel(logging.DEBUG)
+    # Set the logging level: records below it are dropped before being formatted
+    logger.setLevel(app.config.get("LOG_LEVEL", "INFO"))
 
-    # Set the timezone to Vietnam
-    vietnam_timezone = pytz.timezone("Asia/Ho_Chi_Minh")
+    # create_app may run several times in a process (tests): replace the
+    # pipeline instead of stacking handlers that would write every line twice
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+    _stop_listener()
 
-    # Configure logging with the Vietnam timezone
-    logging.Formatter.converter = (
-        lambda *args: pytz.utc.localize(datetime.utcnow())
-        .astimezone(vietnam_timezone)
-        .timetuple()
-    )
+    # Set the timezone to Vietnam
+    vietnam_timezone = pytz.timezone(app.config.get("LOG_TIMEZONE", "Asia/Ho_Chi_Minh"))
 
     # Define the log format
     console_log_format = "%(asctime)s - %(levelname)s - %(message)s"
@@ -30,18 +67,35 @@ def configure_logging(app: Flask):
 
     # Create a console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.DEBUG)
     console_handler.setFormatter(
-        logging.Formatter(console_log_format, datefmt=app.config["DATE_FMT"])
+        TimezoneFormatter(console_log_format, app.config["DATE_FMT"], vietnam_timezone)
     )
-    logger.addHandler(console_handler)
 
-    # Create a file handler
-    file_handler = logging.FileHandler(
-        filename=app.config["LOG_FILE_API"], encoding="utf-8"
-    )
-    file_handler.setLevel(logging.DEBUG)
+    # Create a file handler. Rotating renames the file, which is only safe
+    # when a single process writes it: several processes (gunicorn workers)
+    # would rename it under each other. Those let logrotate move the file
+    # and reopen it when it changed.
+    max_bytes = app.config.get("LOG_FILE_MAX_BYTES", 0)
+    if max_bytes:
+        file_handler = RotatingFileHandler(
+            filename=app.config["LOG_FILE_API"],
+            maxBytes=max_bytes,
+            backupCount=app.config.get("LOG_FILE_BACKUP_COUNT", 5),
+            encoding="utf-8",
+        )
+    else:
+        file_handler = WatchedFileHandler(filename=app.config["LOG_FILE_API"], encoding="utf-8")
     file_handler.setFormatter(
-        logging.Formatter(file_log_format, datefmt=app.config["DATE_FMT"])
+        TimezoneFormatter(file_log_format, app.config["DATE_FMT"], vietnam_timezone)
     )
-    logger.addHandler(file_handler)
+
+    # Request threads only put records on a queue; a background thread
+    # formats them and does the console and disk writes
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+
+# Flush the records still queued when the process exits
+atexit.register(_stop_listener)
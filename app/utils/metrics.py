@@ -0,0 +1,133 @@
+import os
+import time
+
+from flask import Flask, Response, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from app.utils.query_counter import QueryCounter, report_repeated
+
+# With PROMETHEUS_MULTIPROC_DIR set (gunicorn), every worker writes its
+# samples to that directory and /metrics aggregates all the workers
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+# Label of requests matching no route
+UNMATCHED = "none"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests",
+    ["method", "blueprint", "endpoint"],
+)
+HTTP_REQUESTS = Counter(
+    "http_requests",
+    "HTTP requests answered, by status code",
+    ["method", "blueprint", "endpoint", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    ["blueprint", "endpoint"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "http_request_db_queries",
+    "SQL queries run by an HTTP request",
+    ["blueprint", "endpoint"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+DB_DURATION_PER_REQUEST = Histogram(
+    "http_request_db_duration_seconds",
+    "Time an HTTP request spent in SQL queries",
+    ["blueprint", "endpoint"],
+)
+OPENAI_REQUEST_DURATION = Histogram(
+    "openai_request_duration_seconds",
+    "Latency of OpenAI chat completions, retries included",
+    ["model", "kind", "outcome"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 45, 60),
+)
+OPENAI_TOKENS = Counter(
+    "openai_tokens",
+    "Tokens used by OpenAI chat completions",
+    ["model", "type"],
+)
+
+
+def observe_openai_call(model, kind, outcome, duration, usage=None):
+    """
+    Record an OpenAI call: 'kind' is "completion" or "stream", 'outcome'
+    "success" or "error", 'usage' the usage block of the answer if any
+    """
+    OPENAI_REQUEST_DURATION.labels(model, kind, outcome).observe(duration)
+    if usage is not None:
+        OPENAI_TOKENS.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+        OPENAI_TOKENS.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+
+def _labels():
+    return request.blueprint or UNMATCHED, request.endpoint or UNMATCHED
+
+
+def _before_request():
+    if request.endpoint == "metrics":
+        return
+    g.metrics_started_at = time.perf_counter()
+    g.query_counter = QueryCounter().start()
+    g.metrics_status = 500
+    HTTP_REQUESTS_IN_FLIGHT.labels(*_labels()).inc()
+
+
+def _after_request(response):
+    if "metrics_started_at" in g:
+        g.metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    # Runs even when the view raised, so the in-flight gauge always goes back down
+    started_at = g.pop("metrics_started_at", None)
+    if started_at is None:
+        return
+    query_counter = g.pop("query_counter").stop()
+    blueprint, endpoint = _labels()
+    HTTP_REQUESTS_IN_FLIGHT.labels(blueprint, endpoint).dec()
+    HTTP_REQUEST_DURATION.labels(request.method, blueprint, endpoint).observe(time.perf_counter() - started_at)
+    HTTP_REQUESTS.labels(request.method, blueprint, endpoint, str(g.metrics_status)).inc()
+    DB_QUERIES_PER_REQUEST.labels(blueprint, endpoint).observe(query_counter.count)
+    DB_DURATION_PER_REQUEST.labels(blueprint, endpoint).observe(query_counter.duration)
+    if current_app.config.get("QUERY_DETECTOR_ENABLED"):
+        report_repeated(query_counter, f"{request.method} {endpoint}")
+
+
+def metrics():
+    """Every metric in the Prometheus text format, summed over the gunicorn workers"""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app: Flask):
+    """
+    Record the latency, status code and SQL usage of every request (warning
+    about repeated statements with QUERY_DETECTOR_ENABLED), and serve the
+    metrics on /metrics
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
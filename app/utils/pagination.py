@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from flask import Response, request, stream_with_context
+from flask_smorest import abort
+from sqlalchemy import and_, or_, tuple_
+
+# Header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Rows fetched per round trip when streaming
+STREAM_BATCH_SIZE = 500
+
+
+def encode_cursor(log_date, item_id):
+    """
+    Encode the (log_date, id) keyset of the last item of a page as an opaque
+    token. A NULL log_date is encoded as an empty date.
+    """
+    raw = f"{log_date.isoformat() if log_date else ''}|{item_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor token back to its (log_date, id) keyset (log_date None for NULL)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        log_date, item_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return (date.fromisoformat(log_date) if log_date else None), item_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        abort(400, message="Invalid cursor")
+
+
+def order_by_keyset(query, model):
+    """
+    Order a log query by its (log_date, id) keyset. Rows without a log_date
+    come last (PostgreSQL's default for ascending order, so the
+    (user_id, log_date, id) indexes still serve it).
+    """
+    return query.order_by(model.log_date.asc().nulls_last(), model.id)
+
+
+def after_keyset(model, log_date, item_id):
+    """
+    Filter keeping the rows after (log_date, id) in the order of order_by_keyset
+    """
+    if log_date is None:
+        return and_(model.log_date.is_(None), model.id > item_id)
+    # A row comparison never matches a NULL log_date: those rows come after every dated one
+    return or_(tuple_(model.log_date, model.id) > tuple_(log_date, item_id), model.log_date.is_(None))
+
+
+def keyset_page(query, model, cursor=None, limit=None):
+    """
+    Return one page of a log query ordered by (log_date, id) and the cursor
+    of the next page (None on the last page). Each page is a single indexed
+    range scan, however deep the client has paged.
+    'limit' defaults to DEFAULT_PAGE_SIZE and is capped at MAX_PAGE_SIZE.
+    """
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    if limit < 1:
+        abort(400, message="limit must be at least 1")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    if cursor:
+        log_date, item_id = decode_cursor(cursor)
+        query = query.filter(after_keyset(model, log_date, item_id))
+
+    # Fetch one extra row to know whether there is a next page
+    items = order_by_keyset(query, model).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].log_date, items[-1].id)
+
+    return items, next_cursor
+
+
+def is_stream_requested():
+    """
+    True when the client asked for an NDJSON stream (?stream=true)
+    """
+    return request.args.get("stream", "").lower() in ("1", "true", "yes")
+
+
+def ndjson_response(rows, schema):
+    """
+    Stream rows as newline-delimited JSON, one serialized row per line.
+    Rows are consumed lazily, so memory stays flat however many there are.
+    """
+    def generate():
+        for row in rows:
+            yield json.dumps(schema.dump(row), ensure_ascii=False) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -0,0 +1,136 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# A statement shape run this many times by one request is reported as a
+# likely N+1 (a query inside a loop)
+N_PLUS_ONE_THRESHOLD = 3
+
+# Counters of the current thread, innermost last
+_local = threading.local()
+
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|\?|:\w+)(?:\s*,\s*(?:%\(\w+\)s|\?|:\w+))*\s*\)")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|(?<!:):\w+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """
+    Normalize a SQL statement so that runs differing only by their parameters,
+    literals or IN-list lengths have the same shape
+    """
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryCounter:
+    """
+    Counts the SQL statements run by the current thread while active, with
+    their total duration and how many times each statement shape ran.
+    Use as a context manager, or start() / stop().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Statement shapes run at least 'threshold' times, most repeated first"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def start(self):
+        install()
+        counters = getattr(_local, "counters", None)
+        if counters is None:
+            counters = _local.counters = []
+        counters.append(self)
+        return self
+
+    def stop(self):
+        counters = getattr(_local, "counters", [])
+        if self in counters:
+            counters.remove(self)
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block of code ran more SQL statements than its budget allows"""
+
+
+@contextmanager
+def assert_query_budget(max_queries, max_repeats=N_PLUS_ONE_THRESHOLD - 1):
+    """
+    Fail (QueryBudgetExceeded) when the block runs more than 'max_queries'
+    statements, or one statement shape more than 'max_repeats' times.
+    Meant for tests:
+
+        with assert_query_budget(4):
+            self.client.get("/ai-messages", headers=headers)
+    """
+    with QueryCounter() as counter:
+        yield counter
+
+    problems = []
+    if counter.count > max_queries:
+        problems.append(f"{counter.count} queries ran, the budget is {max_queries}")
+    for shape, count in counter.repeated(max_repeats + 1):
+        problems.append(f"ran {count} times (N+1?): {shape}")
+    if problems:
+        raise QueryBudgetExceeded("\n".join(problems))
+
+
+def report_repeated(counter, label, threshold=N_PLUS_ONE_THRESHOLD):
+    """Log a warning for each statement shape 'counter' saw repeated"""
+    for shape, count in counter.repeated(threshold):
+        logger.warning("Possible N+1 in %s: statement ran %s times: %s", label, count, shape)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, not the pooled connection: a statement
+    # that raises never reaches after_cursor_execute, and its start time
+    # goes away with its context
+    if context is not None and getattr(_local, "counters", None):
+        context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    counters = getattr(_local, "counters", None)
+    started_at = getattr(context, "_query_started_at", None)
+    if not counters or started_at is None:
+        return
+    duration = time.perf_counter() - started_at
+    for counter in counters:
+        counter.record(statement, duration)
+
+
+def install():
+    """Listen to the statements of every engine, once per process"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,155 @@
+import logging
+import threading
+
+from sqlalchemy import text
+
+from app.db import db
+from app.extention import scheduler
+
+# Create logger for this module
+logger = logging.getLogger(__name__)
+
+# Key of the session advisory lock held by the process running the scheduler
+SCHEDULER_LOCK_KEY = 720302
+
+# Seconds between two attempts to take the lead, and between two checks that
+# the leader still holds its lock
+LEADER_CHECK_INTERVAL = 30
+
+
+def register_jobs():
+    """
+    Add the cron jobs, once per process (create_app may run again in tests)
+    """
+    from app.services.cron_service import prune_blocklist, send_daily_report
+
+    if not scheduler.get_job("daily_email_job"):
+        scheduler.add_job(
+            id="daily_email_job",
+            func=send_daily_report,
+            trigger="cron",
+            hour=13,
+            minute=0
+        )
+    if not scheduler.get_job("prune_blocklist_job"):
+        scheduler.add_job(
+            id="prune_blocklist_job",
+            func=prune_blocklist,
+            trigger="interval",
+            hours=1
+        )
+
+
+class SchedulerLeader:
+    """
+    Runs the scheduler in at most one process of the cluster: the one holding
+    a Postgres session advisory lock. The lock lives as long as the connection
+    holding it, so when the leader dies another process takes over at its
+    next attempt.
+    """
+
+    def __init__(self, app, check_interval=LEADER_CHECK_INTERVAL):
+        self.app = app
+        self.check_interval = check_interval
+        self.connection = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def _try_lock(self):
+        if db.engine.dialect.name != "postgresql":
+            return True
+        connection = db.engine.connect()
+        try:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": SCHEDULER_LOCK_KEY}
+            ).scalar()
+            # End the implicit transaction, the session lock outlives it
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            return False
+        self.connection = connection
+        return True
+
+    def _still_leader(self):
+        if self.connection is None:
+            return True
+        try:
+            self.connection.execute(text("SELECT 1"))
+            self.connection.commit()
+            return True
+        except Exception as ex:
+            logger.error(f"Lost the scheduler lock connection: {ex}")
+            self.connection.invalidate()
+            self.connection = None
+            return False
+
+    def _start_scheduler(self):
+        if not scheduler.running:
+            scheduler.start()
+        else:
+            scheduler.resume()
+        logger.info("This process is the scheduler leader, cron jobs run here")
+
+    def run(self):
+        """Try to take the lead until stopped, then run the scheduler while leading"""
+        leading = False
+        while not self.stop_event.is_set():
+            try:
+                with self.app.app_context():
+                    if not leading and self._try_lock():
+                        leading = True
+                        self._start_scheduler()
+                    elif leading and not self._still_leader():
+                        leading = False
+                        scheduler.pause()
+            except Exception as ex:
+                logger.error(f"Scheduler leader election failed: {ex}")
+            self.stop_event.wait(self.check_interval)
+
+        if leading:
+            scheduler.shutdown(wait=False)
+            if self.connection is not None:
+                self.connection.close()
+
+    def start(self):
+        """Run the election in a daemon thread"""
+        self.thread = threading.Thread(target=self.run, name="scheduler-leader", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+
+_leader = None
+_leader_lock = threading.Lock()
+
+
+def init_scheduler(app):
+    """
+    Register the cron jobs and, with SCHEDULER_IN_PROCESS, join the leader
+    election from this process. Otherwise they run in `flask run-scheduler`.
+    """
+    if scheduler.app is None:
+        scheduler.init_app(app)
+    register_jobs()
+
+    if app.config.get("SCHEDULER_IN_PROCESS"):
+        start_leader_election(app)
+
+
+def start_leader_election(app):
+    """
+    Start the leader election of this process once
+    """
+    global _leader
+    with _leader_lock:
+        if _leader is None:
+            _leader = SchedulerLeader(app).start()
+    return _leader
@@ -0,0 +1,26 @@
+import json
+
+from flask import Response, stream_with_context
+
+
+def format_event(event, data):
+    """
+    Serialize one Server-Sent Event with a JSON payload
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def sse_response(events):
+    """
+    Stream (event, data) pairs as Server-Sent Events, flushing each one as it
+    is produced. Proxy buffering is disabled so events reach the client at once.
+    """
+    def generate():
+        for event, data in events:
+            yield format_event(event, data)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,25 @@
+import math
+import re
+
+# Words (letters with their diacritics, digits) and single punctuation marks
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Average characters per token of a word, and fixed tokens added per chat message
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """
+    Estimate the tokens of a text without a model tokenizer. Every word costs
+    at least one token and long words one per CHARS_PER_TOKEN characters,
+    which errs on the high side for Vietnamese text.
+    """
+    if not text:
+        return 0
+    return sum(math.ceil(len(piece) / CHARS_PER_TOKEN) for piece in _PIECE_RE.findall(text))
+
+
+def estimate_message_tokens(message):
+    """Estimate the tokens of a chat message ({"role", "content"})"""
+    return MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content"))
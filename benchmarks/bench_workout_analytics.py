@@ -0,0 +1,141 @@
+"""
+Benchmark workout analytics for users with dense histories.
+
+Compares the previous implementation (hydrate every WorkoutLogModel in the
+window and aggregate in Python) with the grouped SQL query now used by
+analytics_service.get_workout_analytics.
+
+Usage:
+    APP_SETTINGS_MODULE=config.DevelopConfig \
+        python -m benchmarks.bench_workout_analytics --per-day 50 --mode 30
+"""
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app import app
+from app.db import db
+from app.models import UserModel, WorkoutLogModel
+from app.services import analytics_service
+
+
+def legacy_workout_analytics(user_id, mode=7):
+    """Previous implementation, kept here as the baseline."""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=mode - 1)
+
+    logs = db.session.query(WorkoutLogModel).filter(
+        WorkoutLogModel.user_id == user_id,
+        WorkoutLogModel.log_date >= start_date,
+        WorkoutLogModel.log_date <= end_date
+    ).all()
+
+    daily_data = {}
+    for log in logs:
+        if log.log_date not in daily_data:
+            daily_data[log.log_date] = {"duration_min": 0, "calo": 0, "statuses": set()}
+        daily_data[log.log_date]["duration_min"] += log.duration_min
+        if log.calories_burned:
+            daily_data[log.log_date]["calo"] += log.calories_burned
+        if log.status is not None:
+            daily_data[log.log_date]["statuses"].add(log.status)
+
+    result = []
+    current_date = start_date
+    while current_date <= end_date:
+        stats = daily_data.get(current_date)
+        if stats:
+            status_set = stats["statuses"]
+            final_status = 1 if 1 in status_set else 2 if 2 in status_set else 0
+            result.append({
+                "day": current_date,
+                "duration_min": stats["duration_min"],
+                "calo": stats["calo"],
+                "status": final_status
+            })
+        else:
+            result.append({"day": current_date, "duration_min": 0, "calo": 0, "status": 0})
+        current_date += timedelta(days=1)
+
+    return result
+
+
+def seed_user(days, per_day):
+    """Create a throwaway user with a dense workout history."""
+    user = UserModel(email=f"bench-{uuid4()}@example.com", name="Benchmark")
+    db.session.add(user)
+    db.session.flush()
+
+    description = "Bench press, squat, deadlift. " * 40
+    today = date.today()
+    rows = [
+        {
+            "id": str(uuid4()),
+            "user_id": user.id,
+            "duration_min": 30 + i % 30,
+            "calories_burned": 150 + i % 200,
+            "log_date": today - timedelta(days=day),
+            "status": i % 3,
+            "workout_type": i % 3,
+            "workout_metadata": {"name": f"Workout {i}", "description": description, "link_reference": None},
+            "description": description,
+        }
+        for day in range(days)
+        for i in range(per_day)
+    ]
+    db.session.execute(WorkoutLogModel.__table__.insert(), rows)
+    db.session.commit()
+    return user.id
+
+
+def cleanup_user(user_id):
+    WorkoutLogModel.query.filter_by(user_id=user_id).delete()
+    UserModel.query.filter_by(id=user_id).delete()
+    db.session.commit()
+
+
+def time_call(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30, help="Days of history to seed")
+    parser.add_argument("--per-day", type=int, default=50, help="Workout logs per day")
+    parser.add_argument("--mode", type=int, default=30, help="Analytics window (days)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per implementation")
+    args = parser.parse_args()
+
+    with app.app_context():
+        user_id = seed_user(args.days, args.per_day)
+        try:
+            legacy = legacy_workout_analytics(user_id, args.mode)
+            current = analytics_service.get_workout_analytics(user_id, args.mode)
+            assert legacy == current, "Implementations disagree"
+
+            legacy_median, legacy_min = time_call(
+                lambda: legacy_workout_analytics(user_id, args.mode), args.repeat
+            )
+            sql_median, sql_min = time_call(
+                lambda: analytics_service.get_workout_analytics(user_id, args.mode), args.repeat
+            )
+        finally:
+            cleanup_user(user_id)
+
+    print(f"Rows in window: {min(args.days, args.mode) * args.per_day} ({args.per_day}/day)")
+    print(f"{'implementation':<18}{'median ms':>12}{'min ms':>12}")
+    print(f"{'python loop':<18}{legacy_median:>12.2f}{legacy_min:>12.2f}")
+    print(f"{'grouped sql':<18}{sql_median:>12.2f}{sql_min:>12.2f}")
+    print(f"Speedup (median): {legacy_median / sql_median:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare two result files of benchmarks.run and flag the regressions: a case
+whose median and fastest run both got slower than the threshold (one noisy
+run is not enough), that runs more SQL queries, or that fails more often (a
+broken endpoint usually gets faster).
+Exits with status 1 when there is a regression, so it can gate CI.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _change(old, new):
+    """Change from old to new, in %"""
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(base, head, threshold):
+    """
+    Return the rows of the comparison (name, base ms, head ms, change %,
+    base queries, head queries, base errors, head errors, regressed) of the
+    cases both runs timed
+    """
+    rows = []
+    for name, new in head["results"].items():
+        old = base["results"].get(name)
+        if old is None:
+            continue
+        change = _change(old["median_ms"], new["median_ms"])
+        slower = change > threshold and _change(old["min_ms"], new["min_ms"]) > threshold
+        old_errors, new_errors = old.get("errors", 0), new.get("errors", 0)
+        regressed = slower or new["queries"] > old["queries"] or new_errors > old_errors
+        rows.append((
+            name, old["median_ms"], new["median_ms"], change,
+            old["queries"], new["queries"], old_errors, new_errors, regressed,
+        ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", help="Result file of the reference run")
+    parser.add_argument("head", help="Result file of the run to check")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown of the median (%%) counted as a regression")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    rows = compare(base, head, args.threshold)
+
+    print(f"base {base['meta'].get('commit')}  ->  head {head['meta'].get('commit')}")
+    print(f"{'case':<24}{'base ms':>10}{'head ms':>10}{'change':>9}{'queries':>10}{'errors':>10}")
+    for name, old_ms, new_ms, change, old_queries, new_queries, old_errors, new_errors, regressed in rows:
+        print(f"{name:<24}{old_ms:>10.2f}{new_ms:>10.2f}{change:>8.1f}%{old_queries:>5}->{new_queries:<4}"
+              f"{old_errors:>5}->{new_errors:<4}" + ("  REGRESSION" if regressed else ""))
+
+    regressions = [row[0] for row in rows if row[-1]]
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regression")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Time the analytics, log listing, auth and suggestion paths against seeded
+data and store the results as JSON, one file per commit, to compare runs
+with benchmarks.compare.
+
+Requests go through the Flask test client, so the timings include routing,
+auth, validation and serialization but no network. OpenAI is replaced by
+the local fake server of loadtest.fake_openai.
+
+Usage:
+    APP_SETTINGS_MODULE=config.DevelopConfig flask seed --users 200 --days 90
+    APP_SETTINGS_MODULE=config.DevelopConfig python -m benchmarks.run --repeat 30
+    python -m benchmarks.compare benchmarks/results/<base>.json benchmarks/results/<head>.json
+
+Only compare runs made on the same machine against the same seed.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from unittest import mock
+
+from loadtest import fake_openai
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def build_cases(client, users):
+    """
+    Return {case name: function making one call}. Each call goes to the next
+    seeded user, so caches warmed by one user do not serve the others.
+    'users' is a list of (user_id, email, auth headers).
+    """
+    from app.db import db
+    from app.services import suggestion_cache
+    from benchmarks.seed import SEED_PASSWORD
+
+    turn = {"index": 0}
+
+    def next_user():
+        user = users[turn["index"] % len(users)]
+        turn["index"] += 1
+        return user
+
+    def get(url):
+        def call():
+            _, _, headers = next_user()
+            return client.get(url, headers=headers)
+        return call
+
+    def login():
+        _, email, _ = next_user()
+        return client.post("/login", json={"email": email, "password": SEED_PASSWORD})
+
+    def suggest(url):
+        def call():
+            _, _, headers = next_user()
+            # Time the generation path, not a cache hit
+            suggestion_cache.get_cache().clear()
+            # The logs a suggestion writes are flushed (their SQL runs) but
+            # rolled back, so every run times the same seeded data
+            with mock.patch.object(db.session, "commit", db.session.flush):
+                response = client.post(url, json={}, headers=headers)
+            db.session.rollback()
+            return response
+        return call
+
+    return {
+        "auth.login": login,
+        "auth.me": get("/me"),
+        "analytics.calo_7d": get("/analytics/calo?mode=7"),
+        "analytics.calo_30d": get("/analytics/calo?mode=30"),
+        "analytics.workout_30d": get("/analytics/workout?mode=30"),
+        "analytics.dashboard": get("/analytics/dashboard"),
+        "logs.food_logs": get("/food-logs"),
+        "logs.workout_logs": get("/workout-logs"),
+        "logs.water_logs": get("/water-logs"),
+        "logs.ai_messages": get("/ai-messages"),
+        "logs.conversation": get("/ai-messages/conversation"),
+        "suggestions.food": suggest("/food-suggestions"),
+        "suggestions.workout": suggest("/workout-suggestions"),
+    }
+
+
+def run_case(call, repeat, warmup):
+    """Time 'repeat' calls after 'warmup' untimed ones"""
+    from app.utils.query_counter import QueryCounter
+
+    for _ in range(warmup):
+        call()
+
+    timings, queries, errors = [], [], 0
+    for _ in range(repeat):
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "min_ms": round(min(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "queries": statistics.median(queries),
+        "errors": errors,
+        "runs": repeat,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per case")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls per case")
+    parser.add_argument("--users", type=int, default=20, help="Seeded users the calls rotate over")
+    parser.add_argument("--cases", default="", help="Comma-separated case name prefixes (default: all)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json)")
+    args = parser.parse_args()
+
+    # The fake OpenAI server must be known before the client is created
+    server = fake_openai.serve(port=0, latency=0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    from flask_jwt_extended import create_access_token
+
+    from app import app
+    from app.db import db
+    from app.models import UserModel
+    from benchmarks.seed import SEED_EMAIL_DOMAIN
+
+    # Request logs would dominate the timings of the fastest cases
+    logging.getLogger(app.name).setLevel(logging.WARNING)
+
+    with app.app_context():
+        seeded = db.session.execute(
+            db.select(UserModel.id, UserModel.email).where(
+                UserModel.email.like(f"%@{SEED_EMAIL_DOMAIN}")
+            ).order_by(UserModel.email).limit(args.users)
+        ).all()
+        if not seeded:
+            sys.exit("No seeded users, run `flask seed` first")
+        users = [
+            (user_id, email, {"Authorization": f"Bearer {create_access_token(identity=user_id)}"})
+            for user_id, email in seeded
+        ]
+        dialect = db.engine.dialect.name
+
+    client = app.test_client()
+    cases = build_cases(client, users)
+    prefixes = [prefix for prefix in args.cases.split(",") if prefix]
+
+    results = {}
+    with app.app_context():
+        for name, call in cases.items():
+            if prefixes and not name.startswith(tuple(prefixes)):
+                continue
+            results[name] = run_case(call, args.repeat, args.warmup)
+            result = results[name]
+            print(f"{name:<24}{result['median_ms']:>10.2f} ms  p95 {result['p95_ms']:>9.2f} ms"
+                  f"  {result['queries']:>4} queries" + (f"  {result['errors']} errors" if result["errors"] else ""))
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "commit": commit,
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "database": dialect,
+                "users": len(users),
+                "repeat": args.repeat,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Synthetic users with realistic histories for the benchmarks: a profile and a
+goal, then every day a few meals, usually a workout, several glasses of water
+and now and then a conversation with the assistant.
+
+Seeded users all have an email at SEED_EMAIL_DOMAIN and the password
+SEED_PASSWORD, so they can log in and be found (and deleted) again.
+
+Usage:
+    flask seed --users 200 --days 90 [--clear]
+"""
+import random
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from passlib.hash import pbkdf2_sha256
+
+from app.db import db
+from app.models import (
+    AIMessageModel,
+    ConversationModel,
+    DailyNutritionSummaryModel,
+    FoodLogModel,
+    GoalModel,
+    JobModel,
+    UserModel,
+    UserProfileModel,
+    WaterLogModel,
+    WorkoutLogModel,
+)
+from app.models.enums import ActivityLevelEnum, AIRoleEnum, GenderEnum, GoalTypeEnum, MealTypeEnum
+from app.services import nutrition_summary_service
+
+SEED_EMAIL_DOMAIN = "bench.example.com"
+SEED_PASSWORD = "bench-password"
+
+# Rows inserted per statement
+INSERT_BATCH_SIZE = 5000
+
+# name, calories, protein, carbs, fat
+MEALS = {
+    MealTypeEnum.breakfast: [
+        ("Phở bò", 450, 25.0, 55.0, 12.0),
+        ("Bánh mì trứng", 380, 15.0, 45.0, 14.0),
+        ("Oatmeal with banana", 320, 10.0, 58.0, 6.0),
+        ("Xôi gà", 500, 20.0, 70.0, 15.0),
+    ],
+    MealTypeEnum.lunch: [
+        ("Cơm tấm sườn", 650, 30.0, 80.0, 22.0),
+        ("Bún chả", 550, 28.0, 60.0, 20.0),
+        ("Chicken salad", 420, 35.0, 20.0, 22.0),
+        ("Cơm gà xối mỡ", 700, 32.0, 85.0, 26.0),
+    ],
+    MealTypeEnum.dinner: [
+        ("Canh chua cá", 350, 28.0, 25.0, 12.0),
+        ("Grilled salmon with rice", 600, 40.0, 55.0, 20.0),
+        ("Bò xào rau", 480, 35.0, 20.0, 26.0),
+        ("Đậu hũ sốt cà", 300, 18.0, 20.0, 15.0),
+    ],
+    MealTypeEnum.snack: [
+        ("Greek yogurt", 150, 12.0, 10.0, 5.0),
+        ("Apple", 95, 0.5, 25.0, 0.3),
+        ("Almonds", 170, 6.0, 6.0, 15.0),
+    ],
+}
+
+# workout_type (0: cardio, 1: strength, 2: flexibility), name, minutes, calories
+WORKOUTS = [
+    (0, "Running", 30, 300),
+    (0, "Cycling", 45, 400),
+    (1, "Upper body strength", 50, 280),
+    (1, "Leg day", 55, 350),
+    (2, "Yoga", 40, 150),
+]
+
+QUESTIONS = [
+    "Hôm nay tôi nên ăn gì để giảm cân?",
+    "How many calories should I eat per day?",
+    "Bài tập nào tốt cho người mới bắt đầu?",
+    "Is it fine to work out every day?",
+]
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + INSERT_BATCH_SIZE])
+
+
+def _user_history(rng, user_id, days, today):
+    """Rows of every table for one user over the last 'days' days"""
+    rows = {FoodLogModel: [], WorkoutLogModel: [], WaterLogModel: [], AIMessageModel: []}
+    conversation_id = str(uuid4())
+
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        created_at = datetime.combine(day, datetime.min.time())
+
+        for meal_type, options in MEALS.items():
+            if meal_type == MealTypeEnum.snack and rng.random() < 0.5:
+                continue
+            name, calories, protein, carbs, fat = rng.choice(options)
+            quantity = rng.choice((0.5, 1.0, 1.0, 1.5))
+            rows[FoodLogModel].append({
+                "id": str(uuid4()), "user_id": user_id, "log_date": day, "meal_type": meal_type.name,
+                "name": name, "quantity": quantity, "calories": int(calories * quantity),
+                "protein": protein * quantity, "carbs": carbs * quantity, "fat": fat * quantity,
+                "status": 2 if offset else 1, "created_at": created_at,
+            })
+
+        if rng.random() < 0.7:
+            workout_type, name, minutes, calories = rng.choice(WORKOUTS)
+            rows[WorkoutLogModel].append({
+                "id": str(uuid4()), "user_id": user_id, "log_date": day, "workout_type": workout_type,
+                "duration_min": minutes, "calories_burned": calories,
+                # Past workouts were mostly done, today's is planned
+                "status": (1 if rng.random() < 0.8 else 2) if offset else 0,
+                "workout_metadata": {"name": name, "description": f"{minutes} minutes of {name.lower()}",
+                                     "link_reference": None},
+                "description": f"{minutes} minutes of {name.lower()}", "created_at": created_at,
+            })
+
+        for _ in range(rng.randint(4, 8)):
+            rows[WaterLogModel].append({
+                "id": str(uuid4()), "user_id": user_id, "log_date": day,
+                "amount_ml": rng.choice((200, 250, 330, 500)), "created_at": created_at,
+            })
+
+        if rng.random() < 0.3:
+            for turn in range(rng.randint(1, 3)):
+                for role, content in ((AIRoleEnum.user, rng.choice(QUESTIONS)),
+                                      (AIRoleEnum.ai, "Bạn nên ăn đủ chất, uống đủ nước và tập luyện đều đặn. " * 4)):
+                    rows[AIMessageModel].append({
+                        "id": str(uuid4()), "user_id": user_id, "conversation_id": conversation_id,
+                        "role": role.name, "content": content,
+                        "created_at": created_at + timedelta(hours=12, minutes=turn * 2 + (role == AIRoleEnum.ai)),
+                    })
+
+    return conversation_id, rows
+
+
+def seed_users(users, days, seed=0):
+    """
+    Create 'users' users with 'days' days of history each. Returns their ids.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    # Hashing is slow on purpose: every seeded user shares one hash
+    password = pbkdf2_sha256.hash(SEED_PASSWORD)
+    user_ids = []
+
+    for _ in range(users):
+        user_id = str(uuid4())
+        user_ids.append(user_id)
+        weight = round(rng.uniform(45, 95), 1)
+        height = round(rng.uniform(150, 185), 1)
+
+        db.session.execute(UserModel.__table__.insert(), [{
+            "id": user_id, "email": f"{user_id}@{SEED_EMAIL_DOMAIN}", "password": password,
+            "name": "Benchmark User", "role": 2, "block": False,
+        }])
+        db.session.execute(UserProfileModel.__table__.insert(), [{
+            "user_id": user_id, "age": rng.randint(18, 65),
+            "gender": rng.choice(list(GenderEnum)).name, "height_cm": height, "weight_kg": weight,
+            "activity_level": rng.choice(list(ActivityLevelEnum)).name,
+            "bmi": round(weight / (height / 100) ** 2, 1),
+        }])
+        db.session.execute(GoalModel.__table__.insert(), [{
+            "id": str(uuid4()), "user_id": user_id, "goal_type": rng.choice(list(GoalTypeEnum)).name,
+            "target_weight": round(weight + rng.uniform(-10, 5), 1),
+            "daily_calorie_target": rng.choice((1600, 1800, 2000, 2200, 2500)),
+        }])
+
+        conversation_id, rows = _user_history(rng, user_id, days, today)
+        db.session.execute(ConversationModel.__table__.insert(), [{"id": conversation_id, "user_id": user_id}])
+        for model, model_rows in rows.items():
+            _insert(model, model_rows)
+        db.session.commit()
+
+    # Food logs were inserted in bulk: derive their daily summaries in one go
+    nutrition_summary_service.rebuild_daily_nutrition_summary()
+    return user_ids
+
+
+def seeded_user_ids():
+    return db.session.scalars(
+        db.select(UserModel.id).where(UserModel.email.like(f"%@{SEED_EMAIL_DOMAIN}")).order_by(UserModel.email)
+    ).all()
+
+
+def clear_seeded_users():
+    """
+    Delete the seeded users and everything they own. Returns how many users were deleted.
+    """
+    user_ids = db.select(UserModel.id).where(UserModel.email.like(f"%@{SEED_EMAIL_DOMAIN}")).scalar_subquery()
+    for model in (AIMessageModel, ConversationModel, FoodLogModel, DailyNutritionSummaryModel,
+                  WorkoutLogModel, WaterLogModel, GoalModel, JobModel, UserProfileModel):
+        db.session.execute(db.delete(model).where(model.user_id.in_(user_ids)))
+    deleted = db.session.execute(db.delete(UserModel).where(UserModel.id.in_(user_ids))).rowcount
+    db.session.commit()
+    return deleted
@@ -55,12 +55,72 @@ class DefaultConfig:
     # Logging
     DATE_FMT = "%Y-%m-%d %H:%M:%S"
     LOG_FILE_API = f"{basedir}/logs/api.log"
+    # Records below this level are dropped before being formatted
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+    LOG_TIMEZONE = "Asia/Ho_Chi_Minh"
+    # With a size, the process rotates the log file itself, keeping
+    # LOG_FILE_BACKUP_COUNT old files: only for a single process (flask run).
+    # 0 leaves rotation to logrotate; the file is reopened once it was moved.
+    # gunicorn always uses 0: its workers share the file.
+    LOG_FILE_MAX_BYTES = int(os.environ.get("LOG_FILE_MAX_BYTES", "0"))
+    LOG_FILE_BACKUP_COUNT = int(os.environ.get("LOG_FILE_BACKUP_COUNT", "5"))
+
+    # Prometheus metrics of the requests, served on /metrics
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    # Warn when a request runs the same statement shape again and again (N+1)
+    QUERY_DETECTOR_ENABLED = os.environ.get("QUERY_DETECTOR_ENABLED", "false").lower() == "true"
 
     # OpenAI Configuration
     OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+    # Point the client at another OpenAI-compatible server (e.g. the load test fake)
+    OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL")
 
     # Scheduler Configuration
     SCHEDULER_API_ENABLED = True
+    # Elect the scheduler leader among the web processes (Postgres advisory
+    # lock) instead of running it with `flask run-scheduler`. Off by default so
+    # CLI commands, benchmarks and tests never run the cron jobs; gunicorn
+    # (gunicorn/gunicorn_config.py) turns it on unless set
+    SCHEDULER_IN_PROCESS = os.environ.get("SCHEDULER_IN_PROCESS", "false").lower() == "true"
+
+    # Mail delivery: "mailtrap", or "smtp" (e.g. a local sink: python -m loadtest.smtp_sink)
+    MAIL_BACKEND = os.environ.get("MAIL_BACKEND", "mailtrap")
+    MAILTRAP_API_TOKEN = os.environ.get("MAILTRAP_API_TOKEN")
+    MAIL_SMTP_HOST = os.environ.get("MAIL_SMTP_HOST", "127.0.0.1")
+    MAIL_SMTP_PORT = int(os.environ.get("MAIL_SMTP_PORT", "1025"))
+    # Sends (an email over SMTP, a batch of up to 500 with Mailtrap) made at
+    # once, and per second, by bulk sends (daily reports). Over SMTP the daily
+    # reports of N users take about N / MAIL_RATE_LIMIT seconds: at 50/s,
+    # 2,500 users took 49s and 100k users take about 33 minutes. Raise both
+    # to what the relay accepts to finish in minutes: with MAIL_RATE_LIMIT=500
+    # and MAIL_MAX_CONCURRENCY=32 one process sent 320 emails/s to the local
+    # sink (5,000 in 16s), about 5 minutes for 100k users
+    MAIL_MAX_CONCURRENCY = int(os.environ.get("MAIL_MAX_CONCURRENCY", "8"))
+    MAIL_RATE_LIMIT = float(os.environ.get("MAIL_RATE_LIMIT", "50"))
+    DAILY_REPORT_CHUNK_SIZE = 1000
+
+    # AI food/workout suggestions shared by users of the same profile cohort
+    # (entries kept this many seconds; 0 disables the cache)
+    SUGGESTION_CACHE_TTL = int(os.environ.get("SUGGESTION_CACHE_TTL", "3600"))
+    SUGGESTION_CACHE_SIZE = int(os.environ.get("SUGGESTION_CACHE_SIZE", "1024"))
+
+    # Background jobs (AI plan generation)
+    # Queue backend: "database" (jobs table) or "memory" (in-process Redis stand-in)
+    JOB_QUEUE_BACKEND = os.environ.get("JOB_QUEUE_BACKEND", "database")
+    # Jobs run at once by one worker, and by all workers together (database backend)
+    JOB_CONCURRENCY = int(os.environ.get("JOB_CONCURRENCY", "4"))
+    JOB_MAX_RUNNING = int(os.environ.get("JOB_MAX_RUNNING", "8"))
+    JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1"))
+    # Run a worker thread in each web process instead of `flask run-jobs` (required by "memory")
+    JOB_WORKER_IN_PROCESS = os.environ.get("JOB_WORKER_IN_PROCESS", "false").lower() == "true"
+    # Running jobs older than this (seconds) are considered lost and retried
+    JOB_STALE_AFTER = 600
+    JOB_MAX_ATTEMPTS = 3
+    # Hosts allowed as callback_url (comma-separated; empty allows any host
+    # resolving to public addresses only)
+    JOB_CALLBACK_ALLOWED_HOSTS = {
+        host.strip().lower() for host in os.environ.get("JOB_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()
+    }
 
 
 class DevelopConfig(DefaultConfig):
@@ -69,6 +129,8 @@ class DevelopConfig(DefaultConfig):
 
     # Activate debug mode
     DEBUG = True
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG").upper()
+    QUERY_DETECTOR_ENABLED = True
 
     # Database configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
@@ -89,6 +151,10 @@ class TestingConfig(DefaultConfig):
 
     # Logging
     LOG_FILE_API = f"{basedir}/logs/api_tests.log"
+    QUERY_DETECTOR_ENABLED = True
+
+    # The tests run the cron jobs themselves
+    SCHEDULER_IN_PROCESS = False
 
     # Database configuration
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_TEST_URL")
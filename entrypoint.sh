@@ -19,6 +19,9 @@ fi
 
 echo "Enviroment:" $APP_ENV
 
+# Gunicorn workers share their Prometheus metrics through this directory
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/prometheus_multiproc}
+
 if [ "$APP_ENV" = "local" ]; then
     echo "Start create database"
     flask create-db
@@ -34,5 +37,5 @@ fi
 
 if [ "$APP_ENV" = "production" ]; then
     echo "Run app with gunicorn server..."
-    gunicorn --bind $API_HOST:$API_PORT $API_ENTRYPOINT --timeout 10 --workers 4;
+    gunicorn -c ./gunicorn/gunicorn_config.py --bind $API_HOST:$API_PORT $API_ENTRYPOINT --timeout 10 --workers 4 --worker-class gthread --threads ${THREADS:-8};
 fi
@@ -24,16 +24,47 @@ else:
         use_max_workers = int(max_workers_str)
         web_concurrency = min(web_concurrency, use_max_workers)
 
+# Threaded workers: a request waiting on a slow upstream (OpenAI) holds a
+# thread, not the whole worker process
+worker_class_str = os.getenv("WORKER_CLASS", "gthread")
+threads_str = os.getenv("THREADS", "8")
+
 graceful_timeout_str = os.getenv("GRACEFUL_TIMEOUT", "120")
 timeout_str = os.getenv("TIMEOUT", "120")
 keepalive_str = os.getenv("KEEP_ALIVE", "5")
 use_loglevel = os.getenv("LOG_LEVEL", "info")
 
+# The web processes elect the scheduler leader among themselves, unless the
+# cron jobs run in `flask run-scheduler` (SCHEDULER_IN_PROCESS=false)
+os.environ.setdefault("SCHEDULER_IN_PROCESS", "true")
+
+# Every worker writes logs/api.log: none of them may rotate it (see
+# LOG_FILE_MAX_BYTES), logrotate does
+os.environ["LOG_FILE_MAX_BYTES"] = "0"
+
 # Gunicorn config variables
 loglevel = use_loglevel
 workers = web_concurrency
+worker_class = worker_class_str
+threads = int(threads_str)
 bind = use_bind
 worker_tmp_dir = "/dev/shm"
 graceful_timeout = int(graceful_timeout_str)
 timeout = int(timeout_str)
 keepalive = int(keepalive_str)
+
+
+def on_starting(server):
+    """Drop the metric files of a previous run of the server"""
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            os.remove(os.path.join(multiproc_dir, name))
+
+
+def child_exit(server, worker):
+    """Stop counting the live gauges (in-flight requests) of a dead worker"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,91 @@
+"""
+Check that slow AI calls do not starve the rest of the API.
+
+Fires --concurrency simultaneous POST /ai-messages/ask requests while probing
+a cheap endpoint (GET /me) in a loop, then reports how long both took. With
+the fake OpenAI server answering after N seconds, the asks should all finish
+in about N seconds and the probe should stay fast. With sync workers the asks
+queue behind each other and the probe stalls.
+
+Usage:
+    python -m loadtest.fake_openai --latency 3 &
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 gunicorn -c gunicorn/gunicorn_config.py app:app &
+    python -m loadtest.ai_concurrency --base-url http://127.0.0.1:5000 --concurrency 32
+"""
+import argparse
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def login(client, email, password):
+    """Register a throwaway user and return its auth headers"""
+    client.post("/register", json={"email": email, "password": password, "name": "Load test"})
+    response = client.post("/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=32, help="Simultaneous AI requests")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="Seconds between /me probes")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+        headers = login(client, f"load-{uuid.uuid4().hex[:8]}@example.com", "loadtest123")
+
+    ask_timings, ask_statuses = [], []
+    probe_timings = []
+    done = threading.Event()
+
+    def ask(_):
+        with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+            start = time.perf_counter()
+            response = client.post("/ai-messages/ask", json={"message": "Tôi nên ăn gì?"}, headers=headers)
+            ask_timings.append(time.perf_counter() - start)
+            ask_statuses.append(response.status_code)
+
+    def probe():
+        with httpx.Client(base_url=args.base_url, timeout=args.timeout) as client:
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get("/me", headers=headers)
+                probe_timings.append(time.perf_counter() - start)
+                time.sleep(args.probe_interval)
+
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    probe_thread.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(ask, range(args.concurrency)))
+    wall = time.perf_counter() - start
+
+    done.set()
+    probe_thread.join()
+
+    errors = sum(1 for status in ask_statuses if status != 200)
+    print(f"AI requests:  {len(ask_timings)} in {wall:.2f}s, errors {errors}")
+    print(f"  latency     p50 {percentile(ask_timings, 50):.2f}s  p99 {percentile(ask_timings, 99):.2f}s")
+    print(f"/me probes:   {len(probe_timings)} during the run")
+    print(f"  latency     p50 {percentile(probe_timings, 50) * 1000:.0f}ms  "
+          f"max {max(probe_timings, default=0) * 1000:.0f}ms  "
+          f"mean {statistics.mean(probe_timings) * 1000 if probe_timings else 0:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests.
+
+Answers POST .../chat/completions after a configurable delay, so the API can
+be exercised under realistic LLM latency without calling (or paying) OpenAI.
+With "stream": true the answer is sent as SSE chunks, the delay standing for
+the first-token latency.
+JSON-mode requests get a canned food or workout plan, the rest a short text.
+Failures can be injected at random (--error-rate) or scripted by tests
+through the handler class (fail_next, fail_status, break_after, request_count).
+
+Usage:
+    python -m loadtest.fake_openai --port 8001 --latency 3
+
+then start the API with OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FOOD_PLAN = {
+    "foods": [
+        {"name": "Phở gà", "meal_type": "breakfast", "calories": 420, "protein": 32, "carbs": 50, "fat": 8,
+         "description": "Phở gà ít mỡ, nhiều rau thơm"},
+        {"name": "Cơm gạo lứt cá hồi", "meal_type": "lunch", "calories": 610, "protein": 40, "carbs": 62, "fat": 18,
+         "description": "Cá hồi áp chảo với gạo lứt"},
+        {"name": "Gỏi cuốn tôm", "meal_type": "dinner", "calories": 350, "protein": 25, "carbs": 40, "fat": 6,
+         "description": "Gỏi cuốn tôm thịt, rau sống"},
+        {"name": "Sữa chua Hy Lạp", "meal_type": "snack", "calories": 150, "protein": 15, "carbs": 10, "fat": 4,
+         "description": "Sữa chua không đường với hạt chia"},
+    ]
+}
+
+
+def workout_plan():
+    monday = date.today() - timedelta(days=date.today().weekday())
+    return {
+        "sessions_per_week": 3,
+        "workouts": [
+            {"name": name, "type": workout_type, "duration_min": 45, "calories_burned": 300,
+             "log_date": (monday + timedelta(days=offset)).isoformat(),
+             "description": f"{name} 45 phút", "link_reference": None}
+            for offset, (name, workout_type) in enumerate(
+                [("Chạy bộ", "cardio"), ("Tập ngực", "strength"), ("Yoga", "flexibility")]
+            )
+        ],
+    }
+
+
+def build_content(body):
+    if (body.get("response_format") or {}).get("type") != "json_object":
+        return "Bạn nên uống đủ nước và ngủ 7-8 tiếng mỗi ngày."
+
+    prompt = " ".join(message.get("content") or "" for message in body.get("messages", []))
+    plan = workout_plan() if "sessions_per_week" in prompt else FOOD_PLAN
+    return json.dumps(plan, ensure_ascii=False)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    jitter = 0.0
+    # Seconds between streamed chunks
+    token_interval = 0.0
+    error_rate = 0.0
+    # Scripted failures: the next 'fail_next' requests get 'fail_status'
+    fail_next = 0
+    fail_status = 500
+    # Scripted stream break: drop the connection after this many chunks
+    break_after = None
+    request_count = 0
+    lock = threading.Lock()
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.endswith("/chat/completions"):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        cls = type(self)
+        with cls.lock:
+            cls.request_count += 1
+            fail = cls.fail_next > 0 or random.random() < cls.error_rate
+            if cls.fail_next > 0:
+                cls.fail_next -= 1
+
+        time.sleep(max(self.latency + random.uniform(-self.jitter, self.jitter), 0))
+
+        if fail:
+            self.send_json(self.fail_status, {"error": {"message": "Injected failure", "type": "server_error"}})
+            return
+
+        content = build_content(body)
+        if body.get("stream"):
+            self.send_stream(body, content)
+            return
+
+        self.send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        })
+
+    def send_stream(self, body, content):
+        """Send the content word by word as chat.completion.chunk SSE events"""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        words = content.split(" ")
+        deltas = [{"role": "assistant", "content": ""}]
+        deltas += [{"content": word if i == 0 else " " + word} for i, word in enumerate(words)]
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        try:
+            self.end_headers()
+            for i, delta in enumerate(deltas + [{}]):
+                if self.break_after is not None and i >= self.break_after:
+                    # No terminating chunk: the client sees a truncated response
+                    self.close_connection = True
+                    return
+                finish_reason = "stop" if i == len(deltas) else None
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "gpt-4o-mini"),
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+                self.write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+                if i and self.token_interval:
+                    time.sleep(self.token_interval)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                self.write_chunk("data: " + json.dumps({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "gpt-4o-mini"),
+                    "choices": [],
+                    "usage": {"prompt_tokens": 100, "completion_tokens": len(words), "total_tokens": 100 + len(words)},
+                }) + "\n\n")
+            self.write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def write_chunk(self, text):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        try:
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (deadline) before the answer was ready
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=8001, latency=3.0, jitter=0.0, error_rate=0.0, token_interval=0.0):
+    """
+    Build the fake server. Call serve_forever() on the result (or run it in a thread).
+    Each server gets its own handler class, reachable as server.RequestHandlerClass.
+    """
+    handler = type("Handler", (FakeOpenAIHandler,), {
+        "latency": latency, "jitter": jitter, "error_rate": error_rate,
+        "token_interval": token_interval, "lock": threading.Lock(),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=3.0, help="Seconds before each completion is returned")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- seconds added to the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with a 500")
+    parser.add_argument("--token-interval", type=float, default=0.05, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.jitter, args.error_rate, args.token_interval)
+    print(f"Fake OpenAI listening on http://{args.host}:{args.port}/v1 (latency {args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
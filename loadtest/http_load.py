@@ -0,0 +1,283 @@
+"""
+Load test of the HTTP API with realistic traffic.
+
+Virtual users sign up, then keep running a mix of scenarios (reads, writes,
+/ai-messages/ask, /food-suggestions, see loadtest/scenarios.py) with think
+time in between. Each stage runs a number of concurrent users for a fixed
+duration; increasing stages show how many users the deployment holds before
+latency or errors climb. The report gives throughput, latency percentiles
+and error rates per request and per stage.
+
+OpenAI must be the fake server (python -m loadtest.fake_openai), either
+started by hand with the API pointed at it, or with --spawn, which starts
+the fake server and gunicorn with gunicorn/gunicorn_config.py.
+
+Usage:
+    python -m loadtest.http_load --spawn --llm-latency 2 --users 10,50,100 --duration 60
+    python -m loadtest.http_load --base-url http://127.0.0.1:5000 --users 50 --mix browse=80,log=20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+from loadtest import fake_openai
+from loadtest.postman import load_collections
+from loadtest.scenarios import DEFAULT_MIX, SCENARIOS, sign_up
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "loadtest123"
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+class Stats:
+    """Latencies and outcomes of the requests of a stage, by label"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = Counter()
+        self.statuses = defaultdict(Counter)
+        self.scenarios = Counter()
+
+    def record(self, label, latency, status):
+        """'status' is the HTTP status code, or the exception name when there was no answer"""
+        self.latencies[label].append(latency)
+        self.statuses[label][status] += 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors[label] += 1
+
+    def summarize(self, latencies, errors, elapsed):
+        return {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round(max(latencies, default=0) * 1000, 1),
+        }
+
+    def report(self, elapsed):
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        return {
+            "total": self.summarize(everything, sum(self.errors.values()), elapsed),
+            "requests": {
+                label: {
+                    **self.summarize(latencies, self.errors[label], elapsed),
+                    "statuses": {str(status): count for status, count in self.statuses[label].items()},
+                }
+                for label, latencies in sorted(self.latencies.items())
+            },
+            "scenarios": dict(self.scenarios),
+        }
+
+
+class VirtualUser:
+    """One simulated user: its account, its token and its HTTP calls"""
+
+    def __init__(self, client, collections, stats):
+        self.client = client
+        self.collections = collections
+        self.stats = stats
+        self.email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        self.password = PASSWORD
+        self.variables = {}
+
+    async def request(self, method, path, json=None, label=None, auth=True):
+        """Send a request, record its latency and outcome. Returns the response, or None on a transport error."""
+        headers = {}
+        if auth and "access_token" in self.variables:
+            headers["Authorization"] = f"Bearer {self.variables['access_token']}"
+        label = label or f"{method} {path.split('?')[0]}"
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, json=json, headers=headers)
+        except httpx.HTTPError as ex:
+            self.stats.record(label, time.perf_counter() - start, type(ex).__name__)
+            return None
+        self.stats.record(label, time.perf_counter() - start, response.status_code)
+        return response
+
+    async def postman(self, collection, name, path=None, fields=None, label=None):
+        """Replay a request of a Postman collection"""
+        postman_request = self.collections[collection][name]
+        method, url, body = postman_request.render(self.variables, path=path, fields=fields)
+        return await self.request(method, url, json=body, label=label, auth=postman_request.bearer)
+
+
+async def run_user(user, mix, deadline, think_time, setup_stats):
+    stats, user.stats = user.stats, setup_stats
+    if not await sign_up(user):
+        return
+    user.stats = stats
+
+    names, weights = zip(*mix.items())
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        await SCENARIOS[name](user)
+        stats.scenarios[name] += 1
+        if think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+
+
+async def run_stage(base_url, users, duration, ramp_up, think_time, mix, collections, timeout):
+    """Run 'users' virtual users for 'duration' seconds, started over 'ramp_up' seconds"""
+    stats, setup_stats = Stats(), Stats()
+    limits = httpx.Limits(max_connections=users * 2, max_keepalive_connections=users * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        start = time.monotonic()
+        deadline = start + duration
+        tasks = []
+        for i in range(users):
+            user = VirtualUser(client, collections, stats)
+            tasks.append(asyncio.create_task(run_user(user, mix, deadline, think_time, setup_stats)))
+            if ramp_up:
+                await asyncio.sleep(ramp_up / users)
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - start
+
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        **stats.report(elapsed),
+        "sign_up": setup_stats.report(elapsed)["total"],
+    }
+
+
+def print_stage(result):
+    total = result["total"]
+    print(f"\n=== {result['users']} users, {result['duration_s']}s: {total['requests']} requests, "
+          f"{total['rps']} req/s, {total['error_rate'] * 100:.2f}% errors, "
+          f"p50 {total['p50_ms']}ms p95 {total['p95_ms']}ms p99 {total['p99_ms']}ms")
+    print(f"{'request':<32}{'count':>7}{'req/s':>8}{'errors':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for label, row in result["requests"].items():
+        print(f"{label:<32}{row['requests']:>7}{row['rps']:>8}{row['error_rate'] * 100:>7.1f}%"
+              f"{row['p50_ms']:>9}{row['p90_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}")
+    print(f"scenarios: {result['scenarios']}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in filter(None, text.split(",")):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_deployment(args):
+    """
+    Start the fake OpenAI server in this process and gunicorn (gunicorn/gunicorn_config.py)
+    pointed at it. Returns (base url, fake server, gunicorn process).
+    """
+    server = fake_openai.serve(port=0, latency=args.llm_latency, jitter=args.llm_jitter,
+                               error_rate=args.llm_error_rate)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_address[1]}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "loadtest",
+        # The cron jobs would compete with the measured traffic
+        "SCHEDULER_IN_PROCESS": "false",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn/gunicorn_config.py",
+         "--bind", f"127.0.0.1:{port}", "app:app"],
+        cwd=ROOT_DIR, env=env,
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    expires_at = time.monotonic() + 60
+    while time.monotonic() < expires_at:
+        if process.poll() is not None:
+            sys.exit(f"gunicorn exited with status {process.returncode}")
+        try:
+            httpx.get(f"{base_url}/openapi.json", timeout=1).raise_for_status()
+            return base_url, server, process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    sys.exit("gunicorn did not start within 60s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--users", default="10", help="Concurrent users, or comma-separated stages (e.g. 10,50,100)")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds per stage")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="Seconds to start all the users of a stage")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between two scenarios of a user")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Scenario weights, default " + ",".join(f"{k}={v}" for k, v in DEFAULT_MIX.items()))
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a request counts as failed")
+    parser.add_argument("--output", help="Write the results of every stage to this JSON file")
+    parser.add_argument("--spawn", action="store_true", help="Start the fake OpenAI server and gunicorn")
+    parser.add_argument("--llm-latency", type=float, default=2.0, help="Fake OpenAI latency (with --spawn)")
+    parser.add_argument("--llm-jitter", type=float, default=0.5, help="Fake OpenAI latency jitter (with --spawn)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fake OpenAI error rate (with --spawn)")
+    args = parser.parse_args()
+
+    stages = [int(users) for users in args.users.split(",")]
+    collections = load_collections()
+    server = process = None
+    base_url = args.base_url
+    if args.spawn:
+        base_url, server, process = spawn_deployment(args)
+        print(f"Started gunicorn on {base_url}, fake OpenAI latency {args.llm_latency}s")
+
+    results = []
+    try:
+        for users in stages:
+            result = asyncio.run(run_stage(
+                base_url, users, args.duration, args.ramp_up, args.think_time, args.mix, collections, args.timeout
+            ))
+            results.append(result)
+            print_stage(result)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+            server.shutdown()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"base_url": base_url, "mix": args.mix, "stages": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print(f"\n{'users':>6}{'req/s':>9}{'errors':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for result in results:
+        total = result["total"]
+        print(f"{result['users']:>6}{total['rps']:>9}{total['error_rate'] * 100:>8.2f}%"
+              f"{total['p50_ms']:>9}{total['p95_ms']:>9}{total['p99_ms']:>9}")
+
+
+if __name__ == "__main__":
+    main()
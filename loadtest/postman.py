@@ -0,0 +1,73 @@
+"""
+Read the Postman collections of postman/ so the load test replays the same
+requests (method, path, body, auth) as the manual flows, with the
+{{variables}} filled in per virtual user.
+"""
+import json
+import os
+import re
+
+COLLECTIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "postman")
+
+_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class PostmanRequest:
+    def __init__(self, name, method, url, body=None, bearer=False):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.body = body
+        self.bearer = bearer
+
+    def render(self, variables, path=None, fields=None):
+        """
+        Return (method, path, json body) with {{variables}} substituted.
+        'path' replaces the collection's path (e.g. ids hard-coded in it) and
+        'fields' override fields of its body (e.g. the example email).
+        """
+        url = path or _VARIABLE.sub(lambda m: "" if m.group(1) == "BASE_URL" else str(variables[m.group(1)]), self.url)
+        body = None
+        if self.body:
+            body = json.loads(_VARIABLE.sub(lambda m: str(variables[m.group(1)]), self.body))
+        if fields:
+            body = {**(body or {}), **fields}
+        return self.method, url, body
+
+
+def _walk(items, bearer):
+    for item in items:
+        if "item" in item:
+            yield from _walk(item["item"], bearer)
+            continue
+        request = item["request"]
+        url = request["url"] if isinstance(request["url"], str) else request["url"]["raw"]
+        auth = request.get("auth")
+        yield PostmanRequest(
+            name=item["name"],
+            method=request["method"],
+            url=url,
+            body=(request.get("body") or {}).get("raw") if request["method"] != "GET" else None,
+            # Requests inherit the collection's auth unless they set their own
+            bearer=(auth or {}).get("type") == "bearer" if auth else bearer,
+        )
+
+
+def load_collection(name, directory=COLLECTIONS_DIR):
+    """
+    Load postman/<name>.postman_collection.json as {request name: PostmanRequest}
+    """
+    with open(os.path.join(directory, f"{name}.postman_collection.json"), encoding="utf-8") as f:
+        collection = json.load(f)
+    bearer = (collection.get("auth") or {}).get("type") == "bearer"
+    return {request.name: request for request in _walk(collection["item"], bearer)}
+
+
+def load_collections(directory=COLLECTIONS_DIR):
+    """Load every collection of 'directory' as {collection name: {request name: PostmanRequest}}"""
+    suffix = ".postman_collection.json"
+    return {
+        filename[:-len(suffix)]: load_collection(filename[:-len(suffix)], directory)
+        for filename in sorted(os.listdir(directory))
+        if filename.endswith(suffix)
+    }
@@ -0,0 +1,86 @@
+"""
+What a virtual user of the load test does. sign_up runs once per user, then
+the user keeps picking one of SCENARIOS according to the mix. Requests that
+exist in the Postman collections (postman/) are replayed from there.
+"""
+import random
+from datetime import date, timedelta
+
+# Default share of each scenario, in %
+DEFAULT_MIX = {"browse": 60, "log": 25, "ask": 10, "suggest": 5}
+
+FOODS = [
+    ("Phở bò", "breakfast", 450),
+    ("Cơm tấm sườn", "lunch", 650),
+    ("Canh chua cá", "dinner", 350),
+    ("Sữa chua", "snack", 150),
+]
+
+QUESTIONS = [
+    "Hôm nay tôi nên ăn gì để giảm cân?",
+    "Bài tập nào tốt cho người mới bắt đầu?",
+    "How much water should I drink per day?",
+]
+
+
+def _profile(weight_kg):
+    """Body of "Update profile": the collection's example plus the fields the schema requires"""
+    return {"weight_kg": weight_kg, "bmi": round(weight_kg / 1.755 ** 2, 1), "target": None}
+
+
+async def sign_up(user):
+    """Auth collection: Register then Login, then fill in the profile Register created (User profile collection)"""
+    await user.postman("Auth", "Register", fields={"email": user.email, "password": user.password})
+    response = await user.postman("Auth", "Login", fields={"email": user.email, "password": user.password})
+    if response is None or response.status_code != 200:
+        return False
+    # Same as the collection's test script: keep the token for the next requests
+    user.variables["access_token"] = response.json()["access_token"]
+    await user.postman("User profile", "Update profile", fields={
+        "age": random.randint(18, 60), **_profile(round(random.uniform(50, 90), 1)),
+    })
+    return True
+
+
+async def browse(user):
+    """Read-only session: the home screen, then a few lists and charts"""
+    await user.postman("Auth", "Me")
+    await user.request("GET", "/analytics/dashboard")
+    await user.postman("Goal", "Get All Goal")
+    await user.request("GET", "/food-logs")
+    await user.request("GET", "/water-logs")
+    await user.request("GET", random.choice(["/analytics/calo?mode=7", "/analytics/workout?mode=30"]))
+
+
+async def log(user):
+    """Logging session: a meal, a glass of water, and now and then the goal or the profile"""
+    today = date.today() - timedelta(days=random.randint(0, 6))
+    name, meal_type, calories = random.choice(FOODS)
+    await user.request("POST", "/food-logs", json={
+        "name": name, "meal_type": meal_type, "calories": calories,
+        "quantity": 1.0, "log_date": today.isoformat(),
+    })
+    await user.request("POST", "/water-logs", json={"amount_ml": random.choice([200, 250, 500]), "log_date": today.isoformat()})
+
+    if "goal_id" not in user.variables:
+        response = await user.postman("Goal", "Create new goal")
+        if response is not None and response.status_code < 400:
+            user.variables["goal_id"] = response.json()["id"]
+    elif random.random() < 0.3:
+        await user.postman("Goal", "Update goal", path=f"/goals/{user.variables['goal_id']}",
+                           label="PUT /goals/<id>")
+    if random.random() < 0.1:
+        await user.postman("User profile", "Update profile", fields=_profile(round(random.uniform(50, 90), 1)))
+
+
+async def ask(user):
+    """A question to the assistant (one OpenAI call, more when the history gets summarized)"""
+    await user.request("POST", "/ai-messages/ask", json={"message": random.choice(QUESTIONS)})
+
+
+async def suggest(user):
+    """A food plan suggestion (one OpenAI call unless the cohort's plan is cached)"""
+    await user.request("POST", "/food-suggestions", json={"meal_type": random.choice(["all", "lunch", "dinner"])})
+
+
+SCENARIOS = {"browse": browse, "log": log, "ask": ask, "suggest": suggest}
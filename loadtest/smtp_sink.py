@@ -0,0 +1,100 @@
+"""
+Local SMTP server that accepts and counts every message without delivering it,
+to exercise the bulk email paths (daily reports) without sending real emails.
+
+Usage:
+    python -m loadtest.smtp_sink --port 1025
+
+then start the API (or the scheduler) with MAIL_BACKEND=smtp MAIL_SMTP_PORT=1025
+"""
+import argparse
+import socketserver
+import threading
+import time
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    # Seconds spent "delivering" each message
+    latency = 0.0
+    message_count = 0
+    recipients = []
+    # Raw messages received, only kept with keep_messages (tests)
+    keep_messages = False
+    messages = []
+    lock = threading.Lock()
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.reply("220 smtp-sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 smtp-sink")
+            elif verb == "RCPT":
+                self.rcpt = command.split(":", 1)[1].strip(" <>")
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b".\n", b""):
+                        break
+                    if self.keep_messages:
+                        # Undo the dot-stuffing of lines starting with "."
+                        lines.append(data[1:] if data.startswith(b"..") else data)
+                time.sleep(self.latency)
+                cls = type(self)
+                with cls.lock:
+                    cls.message_count += 1
+                    cls.recipients.append(getattr(self, "rcpt", None))
+                    if self.keep_messages:
+                        cls.messages.append(b"".join(lines))
+                self.reply("250 OK: queued")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL, RSET, NOOP...
+                self.reply("250 OK")
+
+
+def serve(host="127.0.0.1", port=1025, latency=0.0, keep_messages=False):
+    """
+    Build the sink. Call serve_forever() on the result (or run it in a thread).
+    Each server gets its own handler class, reachable as server.RequestHandlerClass.
+    """
+    handler = type("Handler", (SMTPSinkHandler,), {
+        "latency": latency, "message_count": 0, "recipients": [], "lock": threading.Lock(),
+        "keep_messages": keep_messages, "messages": [],
+    })
+    server = socketserver.ThreadingTCPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds spent on each message")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency)
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"{server.RequestHandlerClass.message_count} messages received")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -169,9 +169,81 @@ def run_migration(filename):
         return 1
 
 
+@click.option("--user-id", default=None, help="Only rebuild this user", required=False)
+def rebuild_nutrition_summary(user_id):
+    """
+    Backfill/rebuild the daily nutrition summary table from food logs.
+    Usage: flask rebuild-nutrition-summary [--user-id <id>]
+    """
+    from app.services import nutrition_summary_service
+
+    try:
+        count = nutrition_summary_service.rebuild_daily_nutrition_summary(user_id)
+        click.echo(f"✓ Rebuilt {count} daily nutrition summary rows")
+        return 0
+    except Exception as e:
+        click.echo(f"✗ Error rebuilding daily nutrition summary: {str(e)}", err=True)
+        return 1
+
+
+@click.option("--concurrency", default=None, type=int, help="Jobs run at once (default JOB_CONCURRENCY)", required=False)
+def run_jobs(concurrency):
+    """
+    Run the background job worker (AI plan generation) until interrupted.
+    Usage: flask run-jobs [--concurrency <n>]
+    """
+    from flask import current_app
+    from app.services.job_service import JobWorker
+
+    worker = JobWorker(current_app._get_current_object(), concurrency=concurrency)
+    click.echo(f"✓ Job worker running with concurrency {worker.concurrency}, press CTRL+C to quit")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        worker.stop_event.set()
+        worker.executor.shutdown(wait=True)
+    return 0
+
+
+def run_scheduler():
+    """
+    Run the cron jobs in this process until interrupted. Set
+    SCHEDULER_IN_PROCESS=false on the web processes when using it.
+    Usage: flask run-scheduler
+    """
+    from flask import current_app
+    from app.utils.scheduler import start_leader_election
+
+    leader = start_leader_election(current_app._get_current_object())
+    click.echo("✓ Scheduler started, cron jobs run here once this process holds the lock, press CTRL+C to quit")
+    try:
+        while leader.thread.is_alive():
+            leader.thread.join(1)
+    except KeyboardInterrupt:
+        leader.stop()
+    return 0
+
+
+@click.option("--users", default=100, type=int, help="Users to create", required=False)
+@click.option("--days", default=30, type=int, help="Days of history per user", required=False)
+@click.option("--clear", is_flag=True, help="Delete the previously seeded users first")
+def seed(users, days, clear):
+    """
+    Create users with synthetic food, workout, water and AI message histories for the benchmarks.
+    Usage: flask seed --users 100 --days 30 [--clear]
+    """
+    from benchmarks.seed import clear_seeded_users, seed_users
+
+    if clear:
+        click.echo(f"✓ Deleted {clear_seeded_users()} seeded users")
+    seed_users(users, days)
+    click.echo(f"✓ Seeded {users} users with {days} days of history")
+    return 0
+
+
 def init_app(app):
     if app.config["APP_ENV"] == "production":
-        commands = [create_db, reset_db, drop_db, run_migration]
+        commands = [create_db, reset_db, drop_db, run_migration, rebuild_nutrition_summary, run_jobs, run_scheduler]
     else:
         commands = [
             create_db,
@@ -180,6 +252,10 @@ def init_app(app):
             cov_html,
             cov,
             run_migration,
+            rebuild_nutrition_summary,
+            run_jobs,
+            run_scheduler,
+            seed,
         ]
 
     for command in commands:
@@ -0,0 +1,38 @@
+"""add_user_time_series_indexes
+
+Revision ID: 9d3a61c5e2b4
+Revises: 4f8e2b7c1d90
+Create Date: 2026-10-17 10:03:27.118440
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d3a61c5e2b4'
+down_revision = '4f8e2b7c1d90'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_food_logs_user_id_log_date', 'food_logs', ['user_id', 'log_date']),
+    ('ix_workout_logs_user_id_log_date', 'workout_logs', ['user_id', 'log_date']),
+    ('ix_water_logs_user_id_log_date', 'water_logs', ['user_id', 'log_date']),
+    ('ix_ai_messages_conversation_id_created_at', 'ai_messages', ['conversation_id', 'created_at']),
+    ('ix_ai_messages_user_id_created_at', 'ai_messages', ['user_id', 'created_at']),
+    ('ix_conversations_user_id_created_at', 'conversations', ['user_id', 'created_at']),
+]
+
+
+def upgrade():
+    # Build concurrently so existing tables stay writable during the migration
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,33 @@
+"""add_food_log_client_id
+
+Revision ID: b71e0c4d9a23
+Revises: 9d3a61c5e2b4
+Create Date: 2026-10-17 11:42:09.531207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b71e0c4d9a23'
+down_revision = '9d3a61c5e2b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('food_logs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('client_id', sa.String(length=64), nullable=True))
+
+    # Existing rows have no client_id, and NULLs never conflict with each other
+    with op.get_context().autocommit_block():
+        op.create_index('uq_food_logs_user_id_client_id', 'food_logs', ['user_id', 'client_id'], unique=True, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('uq_food_logs_user_id_client_id', table_name='food_logs', postgresql_concurrently=True)
+
+    with op.batch_alter_table('food_logs', schema=None) as batch_op:
+        batch_op.drop_column('client_id')
@@ -0,0 +1,28 @@
+"""add_conversation_summary
+
+Revision ID: d5e1f7a9b364
+Revises: c3f9a2d81e57
+Create Date: 2026-10-17 16:08:41.207315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e1f7a9b364'
+down_revision = 'c3f9a2d81e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('summarized_until', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_column('summarized_until')
+        batch_op.drop_column('summary')
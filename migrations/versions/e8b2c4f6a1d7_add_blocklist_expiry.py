@@ -0,0 +1,47 @@
+"""add_blocklist_expiry
+
+Revision ID: e8b2c4f6a1d7
+Revises: d5e1f7a9b364
+Create Date: 2026-10-17 17:26:13.482907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b2c4f6a1d7'
+down_revision = 'd5e1f7a9b364'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blocklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+    # The expiry of the tokens already revoked is unknown: keep them for the
+    # longest access token lifetime (365 days)
+    op.execute(
+        "UPDATE blocklist SET created_at = now() AT TIME ZONE 'utc', "
+        "expires_at = (now() AT TIME ZONE 'utc') + interval '365 days'"
+    )
+
+    with op.batch_alter_table('blocklist', schema=None) as batch_op:
+        batch_op.alter_column('expires_at', nullable=False)
+        batch_op.alter_column('created_at', nullable=False)
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_blocklist_expires_at', 'blocklist', ['expires_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_blocklist_created_at', 'blocklist', ['created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_blocklist_created_at', table_name='blocklist', postgresql_concurrently=True)
+        op.drop_index('ix_blocklist_expires_at', table_name='blocklist', postgresql_concurrently=True)
+
+    with op.batch_alter_table('blocklist', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('expires_at')
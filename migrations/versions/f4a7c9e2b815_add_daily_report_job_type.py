@@ -0,0 +1,28 @@
+"""add_daily_report_job_type
+
+Revision ID: f4a7c9e2b815
+Revises: e8b2c4f6a1d7
+Create Date: 2026-10-17 21:04:37.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a7c9e2b815'
+down_revision = 'e8b2c4f6a1d7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # ADD VALUE cannot run inside the migration transaction on PostgreSQL < 12
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobtypeenum ADD VALUE IF NOT EXISTS 'daily_report'")
+
+
+def downgrade():
+    # PostgreSQL cannot drop a value of an enum type: the jobs of this type go,
+    # the value stays unused
+    op.execute("DELETE FROM jobs WHERE type = 'daily_report'")
@@ -0,0 +1,130 @@
+import json
+import os
+import threading
+import unittest
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import AIMessageModel, UserModel, UserProfileModel
+from app.services import llm_client
+from loadtest.fake_openai import serve
+
+
+def parse_events(text):
+    """(event, data) pairs of a Server-Sent Events body"""
+    events = []
+    for block in filter(None, text.split("\n\n")):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class AIStreamIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables, a user with a profile and a fake OpenAI server.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+            user = UserModel(email="stream@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(UserProfileModel(user_id=user.id, age=30, height_cm=170, weight_kg=70))
+            db.session.commit()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+        self.server = serve(port=0, latency=0.0)
+        self.fake = self.server.RequestHandlerClass
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.env = mock.patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        })
+        self.env.start()
+        llm_client.reset_client()
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It stops the fake server and drops the database tables.
+        """
+        llm_client.reset_client()
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def ask(self):
+        return self.client.post(
+            "/ai-messages/ask/stream", headers=self.headers, json={"message": "Tôi nên làm gì?"}, buffered=False
+        )
+
+    def saved_messages(self):
+        with self.app.app_context():
+            return [
+                (message.role.value, message.content)
+                for message in AIMessageModel.query.order_by(AIMessageModel.created_at)
+            ]
+
+    def test_deltas_then_done_and_saved_once_complete(self):
+        response = self.ask()
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("text/event-stream", response.mimetype)
+
+        chunks = response.iter_encoded()
+        first = parse_events(next(chunks).decode())
+        self.assertEqual([("delta", {"content": "Bạn"})], first)
+        # Nothing is saved while the answer is being streamed
+        self.assertEqual([], self.saved_messages())
+
+        events = first + parse_events(b"".join(chunks).decode())
+        response.close()
+
+        names = [event for event, _ in events]
+        self.assertEqual(["delta"] * (len(events) - 1) + ["done"], names)
+        answer = "".join(data["content"] for event, data in events if event == "delta")
+        self.assertEqual("Bạn nên uống đủ nước và ngủ 7-8 tiếng mỗi ngày.", answer)
+
+        done = events[-1][1]
+        self.assertTrue(done["id"])
+        self.assertEqual(answer, done["content"])
+        self.assertEqual([("user", "Tôi nên làm gì?"), ("ai", answer)], self.saved_messages())
+
+    def test_failure_before_the_first_token_is_a_503(self):
+        self.fake.fail_next = 1
+        with mock.patch.object(llm_client, "MAX_RETRIES", 0):
+            response = self.ask()
+
+        self.assertEqual(503, response.status_code)
+        self.assertEqual([], self.saved_messages())
+
+    def test_failure_mid_stream_sends_an_error_event_and_saves_nothing(self):
+        # The role chunk and two words, then the connection drops
+        self.fake.break_after = 3
+        response = self.ask()
+        self.assertEqual(200, response.status_code)
+
+        events = parse_events(response.get_data(as_text=True))
+        response.close()
+
+        self.assertEqual(
+            [("delta", {"content": "Bạn"}), ("delta", {"content": " nên"})],
+            events[:-1],
+        )
+        self.assertEqual("error", events[-1][0])
+        self.assertIn("message", events[-1][1])
+        self.assertEqual([], self.saved_messages())
+
+
+if __name__ == "__main__":
+    unittest.main()
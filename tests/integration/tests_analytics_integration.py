@@ -0,0 +1,108 @@
+import os
+import unittest
+from datetime import date, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import FoodLogModel, UserModel, WorkoutLogModel
+from app.services.analytics_service import MAX_RANGE_DAYS
+from app.services.nutrition_summary_service import rebuild_daily_nutrition_summary
+
+
+class AnalyticsIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables and a user with food and workout logs on a few
+        days of January and March 2024, none in February.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("The analytics buckets require PostgreSQL")
+            db.create_all()
+
+            user = UserModel(email="analytics@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+            # Tuesday 2, Wednesday 3, Thursday 4 and Wednesday 10 of January, Tuesday 5 of March
+            food = {"2024-01-02": 100, "2024-01-03": 200, "2024-01-04": 300, "2024-01-10": 400, "2024-03-05": 500}
+            workouts = {"2024-01-02": 10, "2024-01-03": 20, "2024-01-10": 40}
+            db.session.add_all([
+                FoodLogModel(user_id=user.id, name="Phở bò", log_date=date.fromisoformat(day),
+                             calories=calories, protein=calories / 10, status=1)
+                for day, calories in food.items()
+            ] + [
+                WorkoutLogModel(user_id=user.id, log_date=date.fromisoformat(day),
+                                duration_min=duration, calories_burned=duration * 10, status=1)
+                for day, duration in workouts.items()
+            ])
+            db.session.commit()
+            rebuild_daily_nutrition_summary(user.id)
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It removes the database session and drops the database tables.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, start, end, bucket):
+        response = self.client.get(f"{url}?start={start}&end={end}&bucket={bucket}", headers=self.headers)
+        self.assertEqual(200, response.status_code)
+        return response.get_json()
+
+    def calories(self, start, end, bucket):
+        return [(row["day"], row["calories"]) for row in self.get("/analytics/calo", start, end, bucket)]
+
+    def test_day_buckets_fill_the_gaps(self):
+        self.assertEqual(
+            [("2024-01-03", 200), ("2024-01-04", 300), ("2024-01-05", 0), ("2024-01-06", 0)],
+            self.calories("2024-01-03", "2024-01-06", "day"),
+        )
+
+    def test_week_buckets_start_on_monday(self):
+        # The first week starts before 'start' and only holds the 3rd and 4th
+        self.assertEqual(
+            [("2024-01-01", 500), ("2024-01-08", 400), ("2024-01-15", 0)],
+            self.calories("2024-01-03", "2024-01-20", "week"),
+        )
+
+        workout = self.get("/analytics/workout", "2024-01-03", "2024-01-20", "week")
+        self.assertEqual(
+            [("2024-01-01", 20, 200, 1), ("2024-01-08", 40, 400, 1), ("2024-01-15", 0, 0, 0)],
+            [(row["day"], row["duration_min"], row["calo"], row["status"]) for row in workout],
+        )
+
+    def test_month_buckets_keep_empty_months(self):
+        self.assertEqual(
+            [("2024-01-01", 700), ("2024-02-01", 0), ("2024-03-01", 500)],
+            self.calories("2024-01-04", "2024-03-31", "month"),
+        )
+
+    def test_invalid_ranges_are_rejected(self):
+        for query in [
+            "start=2024-01-10&end=2024-01-01",
+            f"start=2020-01-01&end={date(2020, 1, 1) + timedelta(days=MAX_RANGE_DAYS)}",
+            "start=2024-01-01",
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f"/analytics/calo?{query}", headers=self.headers)
+                self.assertEqual(400, response.status_code)
+
+        # The longest range accepted
+        end = date(2020, 1, 1) + timedelta(days=MAX_RANGE_DAYS - 1)
+        response = self.client.get(f"/analytics/calo?start=2020-01-01&end={end}&bucket=month", headers=self.headers)
+        self.assertEqual(200, response.status_code)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import unittest
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import DailyNutritionSummaryModel, FoodLogModel, UserModel
+from app.services.food_log_service import MAX_BULK_FOOD_LOGS
+from app.utils.query_counter import assert_query_budget
+
+
+class BulkFoodLogsIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables and a user.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("Bulk upserts require PostgreSQL")
+            db.create_all()
+
+            user = UserModel(email="bulk@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It removes the database session and drops the database tables.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def bulk(self, items):
+        return self.client.post("/food-logs/bulk", headers=self.headers, json=items)
+
+    def day_calories(self, log_date):
+        with self.app.app_context():
+            row = db.session.get(DailyNutritionSummaryModel, (self.user_id, log_date))
+            return row.total_calories if row else None
+
+    def test_insert_replay_and_update(self):
+        items = [
+            {"name": f"food {i}", "log_date": "2024-05-01", "calories": 100, "client_id": f"sync-{i}"}
+            for i in range(3)
+        ]
+
+        # One upsert and one summary refresh, whatever the number of items
+        with assert_query_budget(6, max_repeats=1):
+            response = self.bulk(items)
+        self.assertEqual(201, response.status_code)
+        ids = {log["client_id"]: log["id"] for log in response.get_json()}
+        self.assertEqual(300, self.day_calories("2024-05-01"))
+
+        # A retried sync returns the same rows instead of duplicating them
+        response = self.bulk(items)
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(ids, {log["client_id"]: log["id"] for log in response.get_json()})
+        self.assertEqual(300, self.day_calories("2024-05-01"))
+
+        # A later sync changing an item updates its row and both days
+        items[0].update(calories=250, log_date="2024-05-02")
+        response = self.bulk(items[:1])
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(ids["sync-0"], response.get_json()[0]["id"])
+        self.assertEqual(200, self.day_calories("2024-05-01"))
+        self.assertEqual(250, self.day_calories("2024-05-02"))
+
+        with self.app.app_context():
+            self.assertEqual(3, FoodLogModel.query.filter_by(user_id=self.user_id).count())
+
+    def test_items_without_client_id_are_always_inserted(self):
+        items = [{"name": "Chuối", "log_date": "2024-05-01", "calories": 90}]
+
+        self.bulk(items)
+        self.bulk(items)
+
+        with self.app.app_context():
+            self.assertEqual(2, FoodLogModel.query.filter_by(user_id=self.user_id).count())
+        self.assertEqual(180, self.day_calories("2024-05-01"))
+
+    def test_repeated_client_id_keeps_the_last_item(self):
+        response = self.bulk([
+            {"name": "first", "log_date": "2024-05-01", "calories": 100, "client_id": "same"},
+            {"name": "last", "log_date": "2024-05-01", "calories": 300, "client_id": "same"},
+        ])
+
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(["last"], [log["name"] for log in response.get_json()])
+        self.assertEqual(300, self.day_calories("2024-05-01"))
+
+    def test_too_many_items_are_rejected(self):
+        items = [
+            {"name": "food", "log_date": "2024-05-01", "calories": 1}
+            for _ in range(MAX_BULK_FOOD_LOGS + 1)
+        ]
+
+        response = self.bulk(items)
+
+        self.assertEqual(400, response.status_code)
+        with self.app.app_context():
+            self.assertEqual(0, FoodLogModel.query.count())
+        self.assertIsNone(self.day_calories("2024-05-01"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import email
+import os
+import threading
+import unittest
+from datetime import date
+from email import policy
+
+from app import create_app, db
+from app.models import FoodLogModel, UserModel, WaterLogModel, WorkoutLogModel
+from app.services import cron_service
+from app.services.nutrition_summary_service import rebuild_daily_nutrition_summary
+from loadtest import smtp_sink
+
+DAY = date(2024, 3, 1)
+
+
+class DailyReportIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables, a few users with logs on DAY and an SMTP sink.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("The daily summary upserts require PostgreSQL")
+            db.create_all()
+
+            active = UserModel(email="active@example.com", password="x", name="An")
+            idle = UserModel(email="idle@example.com", password="x", name="Bình")
+            blocked = UserModel(email="blocked@example.com", password="x", name="Chi", block=True)
+            db.session.add_all([active, idle, blocked])
+            db.session.commit()
+
+            db.session.add_all([
+                FoodLogModel(user_id=active.id, name="Phở bò", log_date=DAY, calories=450,
+                             protein=25, carbs=60, fat=12, status=1),
+                FoodLogModel(user_id=active.id, name="Cơm tấm", log_date=DAY, calories=650,
+                             protein=30, carbs=80, fat=20, status=1),
+                # Another day: not in the report
+                FoodLogModel(user_id=active.id, name="Bánh mì", log_date=date(2024, 2, 29), calories=350, status=1),
+                WorkoutLogModel(user_id=active.id, duration_min=30, calories_burned=250, log_date=DAY, status=1),
+                WorkoutLogModel(user_id=active.id, duration_min=45, calories_burned=300, log_date=DAY, status=0),
+                WaterLogModel(user_id=active.id, amount_ml=500, log_date=DAY),
+                WaterLogModel(user_id=active.id, amount_ml=750, log_date=DAY),
+                FoodLogModel(user_id=blocked.id, name="Chè", log_date=DAY, calories=300, status=1),
+            ])
+            db.session.commit()
+            rebuild_daily_nutrition_summary()
+
+        self.server = smtp_sink.serve(port=0, keep_messages=True)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.app.config.update(
+            MAIL_BACKEND="smtp",
+            MAIL_SMTP_HOST="127.0.0.1",
+            MAIL_SMTP_PORT=self.server.server_address[1],
+            # One user per chunk: the recipients span several keyset pages
+            DAILY_REPORT_CHUNK_SIZE=1,
+        )
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It stops the SMTP sink and drops the database tables.
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def received(self):
+        """Reports received by the sink as {recipient: html}"""
+        reports = {}
+        for raw in self.server.RequestHandlerClass.messages:
+            message = email.message_from_bytes(raw, policy=policy.default)
+            reports[message["To"]] = message.get_content()
+        return reports
+
+    def test_every_user_but_the_blocked_ones_gets_a_report(self):
+        result = cron_service.send_daily_report(self.app, DAY)
+
+        self.assertEqual({"day": "2024-03-01", "sent": 2, "failed": 0}, result)
+        self.assertEqual(
+            ["active@example.com", "idle@example.com"],
+            sorted(self.server.RequestHandlerClass.recipients),
+        )
+
+        reports = self.received()
+        self.assertEqual({"active@example.com", "idle@example.com"}, set(reports))
+
+        active = reports["active@example.com"]
+        self.assertIn("Báo cáo ngày 01/03/2024", active)
+        self.assertIn("Xin chào An", active)
+        self.assertIn("<strong>1100 kcal</strong>", active)
+        self.assertIn("Protein: 55 g, Carbs: 140 g, Fat: 32 g", active)
+        self.assertIn("Đã hoàn thành 1/2 bài tập", active)
+        self.assertIn("Thời gian tập: 75 phút, calo đốt cháy: 550 kcal", active)
+        self.assertIn("<strong>1250 ml</strong>", active)
+
+        idle = reports["idle@example.com"]
+        self.assertIn("Xin chào Bình", idle)
+        self.assertIn("<strong>0 kcal</strong>", idle)
+        self.assertIn("Bạn chưa có bài tập nào", idle)
+        self.assertIn("<strong>0 ml</strong>", idle)
+
+
+if __name__ == "__main__":
+    unittest.main()
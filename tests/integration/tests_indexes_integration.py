@@ -0,0 +1,139 @@
+import os
+import unittest
+from datetime import date, timedelta
+
+from sqlalchemy import event, text
+
+from app import create_app, db
+from app.models import ConversationModel, UserModel
+from app.services import (
+    ai_message_service,
+    analytics_service,
+    food_log_service,
+    water_log_service,
+    workout_log_service,
+)
+
+
+class IndexesIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs once before any test in this class.
+        It sets up the application context and creates the necessary database tables.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("EXPLAIN checks require PostgreSQL")
+            db.create_all()
+
+            user = UserModel(email="index@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+    def tearDown(self):
+        """
+        This method runs once after all tests in this class have been executed.
+        It removes the database session and drops the database tables.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def explain_queries(self, func):
+        """
+        Run func, capture the SELECT statements it sends and return their plans.
+        Sequential scans are disabled so the planner picks an index whenever
+        one can serve the query, independently of the (tiny) table sizes.
+        """
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        db.session.execute(text("SET enable_seqscan = off"))
+        event.listen(db.engine, "before_cursor_execute", capture)
+        try:
+            func()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", capture)
+
+        connection = db.session.connection()
+        plans = []
+        for statement, parameters in captured:
+            rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+            plans.append("\n".join(row[0] for row in rows))
+        return plans
+
+    def assert_uses_index(self, index_name, func):
+        plans = self.explain_queries(func)
+
+        self.assertTrue(plans, "No SELECT statement was captured")
+        self.assertTrue(
+            any(index_name in plan for plan in plans),
+            f"{index_name} not used by:\n" + "\n\n".join(plans),
+        )
+
+    def test_food_logs_use_user_date_index(self):
+        with self.app.app_context():
+            self.assert_uses_index(
+                "ix_food_logs_user_id_log_date",
+                lambda: food_log_service.get_all_food_logs(
+                    user_id=self.user_id,
+                    start_day=date.today() - timedelta(days=30),
+                    end_day=date.today(),
+                ),
+            )
+
+    def test_workout_logs_use_user_date_index(self):
+        with self.app.app_context():
+            self.assert_uses_index(
+                "ix_workout_logs_user_id_log_date",
+                lambda: workout_log_service.get_all_workout_logs(
+                    user_id=self.user_id, log_date=date.today()
+                ),
+            )
+            self.assert_uses_index(
+                "ix_workout_logs_user_id_log_date",
+                lambda: analytics_service.get_workout_analytics(self.user_id, 30),
+            )
+
+    def test_water_logs_use_user_date_index(self):
+        with self.app.app_context():
+            self.assert_uses_index(
+                "ix_water_logs_user_id_log_date",
+                lambda: water_log_service.get_total_water_for_date(
+                    self.user_id, date.today()
+                ),
+            )
+
+    def test_ai_messages_use_created_at_indexes(self):
+        with self.app.app_context():
+            self.assert_uses_index(
+                "ix_ai_messages_user_id_created_at",
+                lambda: ai_message_service.get_conversation_history(self.user_id),
+            )
+            self.assert_uses_index(
+                "ix_conversations_user_id_created_at",
+                lambda: ai_message_service.get_or_create_conversation(self.user_id),
+            )
+
+    def test_conversation_history_uses_conversation_index(self):
+        with self.app.app_context():
+            conversation = ConversationModel(user_id=self.user_id)
+            db.session.add(conversation)
+            db.session.commit()
+
+            # WHERE conversation_id = ? ORDER BY created_at DESC LIMIT n
+            self.assert_uses_index(
+                "ix_ai_messages_conversation_id_created_at",
+                lambda: ai_message_service.build_history(conversation, token_budget=1000),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from werkzeug.exceptions import HTTPException
+
+from app import create_app, db
+from app.models import JobModel, UserModel, UserProfileModel
+from app.models.enums import JobStatusEnum, JobTypeEnum
+from app.services import cron_service, job_service, llm_client
+from loadtest.fake_openai import serve
+
+
+class JobsIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables, a user with a profile and a fake OpenAI server.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("Job claims require PostgreSQL")
+            db.create_all()
+
+            user = UserModel(email="jobs@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(UserProfileModel(user_id=user.id, age=30, height_cm=170, weight_kg=70))
+            db.session.commit()
+            self.user_id = user.id
+
+        self.server = serve(port=0, latency=0.0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.env = mock.patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        })
+        self.env.start()
+        llm_client.reset_client()
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It stops the fake server and drops the database tables.
+        """
+        llm_client.reset_client()
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def enqueue(self, count):
+        payload = {"start_day": "2024-01-01", "end_day": "2024-01-07"}
+        jobs = [
+            JobModel(user_id=self.user_id, type=JobTypeEnum.workout_plan, payload=payload)
+            for _ in range(count)
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+        return [job.id for job in jobs]
+
+    def test_concurrent_claims_never_share_a_job(self):
+        with self.app.app_context():
+            self.enqueue(10)
+
+        claimed = []
+
+        def claim():
+            with self.app.app_context():
+                claimed.append(job_service.DatabaseJobQueue(max_running=100).claim(3))
+
+        threads = [threading.Thread(target=claim) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        job_ids = [job_id for ids in claimed for job_id in ids]
+        self.assertEqual(10, len(job_ids))
+        self.assertEqual(len(job_ids), len(set(job_ids)))
+
+    def test_claim_respects_max_running(self):
+        with self.app.app_context():
+            self.enqueue(5)
+            queue = job_service.DatabaseJobQueue(max_running=2)
+
+            self.assertEqual(2, len(queue.claim(10)))
+            self.assertEqual([], queue.claim(10))
+
+    def test_run_job_stores_result(self):
+        with self.app.app_context():
+            job_id = self.enqueue(1)[0]
+            job_service.DatabaseJobQueue(max_running=1).claim(1)
+
+            job_service.run_job(job_id)
+
+            job = db.session.get(JobModel, job_id)
+            self.assertEqual(JobStatusEnum.succeeded, job.status)
+            self.assertEqual(1, job.attempts)
+            self.assertTrue(job.result["workouts"])
+
+    def test_callback_url_must_be_public(self):
+        with self.app.app_context():
+            for url in [
+                "http://localhost:8080/hook",
+                "http://127.0.0.1/hook",
+                "http://10.0.0.5/hook",
+                "http://169.254.169.254/latest/meta-data/",
+                "http://[::1]/hook",
+                "http://[::ffff:127.0.0.1]/hook",
+            ]:
+                with self.assertRaises(ValueError, msg=url):
+                    job_service.check_callback_url(url)
+            job_service.check_callback_url("https://93.184.216.34/hook")
+
+            self.app.config["JOB_CALLBACK_ALLOWED_HOSTS"] = {"hooks.example.com"}
+            with self.assertRaises(ValueError):
+                job_service.check_callback_url("https://93.184.216.34/hook")
+
+    def test_private_callback_url_is_not_called(self):
+        with self.app.app_context():
+            job_id = self.enqueue(1)[0]
+            job = db.session.get(JobModel, job_id)
+            job.callback_url = "http://127.0.0.1:9/hook"
+            db.session.commit()
+
+            with mock.patch.object(job_service.httpx, "post") as post:
+                job_service._notify(job)
+            post.assert_not_called()
+
+    def test_daily_report_runs_once_across_processes(self):
+        with self.app.app_context():
+            # Another process sending the reports holds the advisory lock
+            with db.engine.connect() as other:
+                other.execute(text("SELECT pg_advisory_lock(:key)"), {"key": cron_service.DAILY_REPORT_LOCK_KEY})
+                other.commit()
+                with mock.patch.object(cron_service.mail_service, "send_bulk") as send_bulk:
+                    self.assertIsNone(cron_service.send_daily_report(self.app))
+                send_bulk.assert_not_called()
+                with self.assertRaises(HTTPException) as ctx:
+                    job_service.enqueue_daily_report(self.user_id)
+                self.assertEqual(409, ctx.exception.code)
+                other.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": cron_service.DAILY_REPORT_LOCK_KEY})
+                other.commit()
+
+            job_id = job_service.enqueue_daily_report(self.user_id).id
+            # Already queued
+            with self.assertRaises(HTTPException) as ctx:
+                job_service.enqueue_daily_report(self.user_id)
+            self.assertEqual(409, ctx.exception.code)
+
+            job_service.DatabaseJobQueue(max_running=1).claim(1)
+            with mock.patch.object(cron_service.mail_service, "send_bulk", return_value={"sent": 1, "failed": 0}):
+                job_service.run_job(job_id)
+
+            job = db.session.get(JobModel, job_id)
+            self.assertEqual(JobStatusEnum.succeeded, job.status)
+            self.assertEqual(1, job.result["sent"])
+            self.assertFalse(cron_service.daily_report_running())
+
+    def test_synchronous_suggestion_takes_a_job_slot(self):
+        self.app.config["JOB_MAX_RUNNING"] = 2
+        job_service._queue = None
+        self.addCleanup(setattr, job_service, "_queue", None)
+        client = self.app.test_client()
+        with self.app.app_context():
+            headers = {"Authorization": f"Bearer {create_access_token(identity=self.user_id)}"}
+            job_ids = self.enqueue(2)
+            job_service.DatabaseJobQueue(max_running=2).claim(2)
+
+        # Every slot is taken by the queued jobs
+        response = client.post("/workout-suggestions", headers=headers, json={})
+        self.assertEqual(503, response.status_code)
+
+        with self.app.app_context():
+            JobModel.query.filter(JobModel.id.in_(job_ids)).update(
+                {"status": JobStatusEnum.succeeded}, synchronize_session=False
+            )
+            db.session.commit()
+
+        response = client.post("/workout-suggestions", headers=headers, json={})
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.get_json()["workouts"])
+
+        with self.app.app_context():
+            job = JobModel.query.filter(JobModel.id.notin_(job_ids)).one()
+            self.assertEqual(JobStatusEnum.succeeded, job.status)
+            self.assertIsNotNone(job.finished_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
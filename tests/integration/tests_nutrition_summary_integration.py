@@ -0,0 +1,149 @@
+import os
+import threading
+import unittest
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import DailyNutritionSummaryModel, FoodLogModel, UserModel, UserProfileModel
+from app.services import llm_client, suggestion_cache
+from app.services.nutrition_summary_service import rebuild_daily_nutrition_summary
+from loadtest.fake_openai import serve
+
+
+class NutritionSummaryIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables, a user with a profile and a fake OpenAI server.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("The daily summary upserts require PostgreSQL")
+            db.create_all()
+
+            user = UserModel(email="summary@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(UserProfileModel(user_id=user.id, age=30, height_cm=170, weight_kg=70))
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+        self.server = serve(port=0, latency=0.0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.env = mock.patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        })
+        self.env.start()
+        llm_client.reset_client()
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It stops the fake server and drops the database tables.
+        """
+        llm_client.reset_client()
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        with self.app.app_context():
+            suggestion_cache.get_cache().clear()
+            db.session.remove()
+            db.drop_all()
+
+    def summary(self):
+        """Summary rows of the user as {log_date: (calories, protein, carbs, fat)}, empty days left out"""
+        with self.app.app_context():
+            rows = DailyNutritionSummaryModel.query.filter_by(user_id=self.user_id).all()
+            return {
+                row.log_date.isoformat(): (
+                    row.total_calories, round(row.total_protein, 3), round(row.total_carbs, 3), round(row.total_fat, 3)
+                )
+                for row in rows
+                if row.total_calories or row.total_protein or row.total_carbs or row.total_fat
+            }
+
+    def assert_summary_matches_logs(self):
+        """The incrementally maintained rows equal the ones rebuilt from the food logs"""
+        maintained = self.summary()
+        with self.app.app_context():
+            rebuild_daily_nutrition_summary(self.user_id)
+        self.assertEqual(self.summary(), maintained)
+        return maintained
+
+    def create(self, log_date, calories, **fields):
+        response = self.client.post("/food-logs", headers=self.headers, json={
+            "name": "Phở bò", "meal_type": "lunch", "log_date": log_date, "calories": calories, **fields,
+        })
+        self.assertEqual(201, response.status_code)
+        return response.get_json()["id"]
+
+    def test_create_update_and_delete(self):
+        first = self.create("2024-03-01", 400, protein=20, carbs=50, fat=10)
+        self.create("2024-03-01", 250, protein=5)
+        self.assertEqual((650, 25.0, 50.0, 10.0), self.assert_summary_matches_logs()["2024-03-01"])
+
+        response = self.client.put(f"/food-logs/{first}", headers=self.headers, json={"calories": 500, "fat": 12})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual((750, 25.0, 50.0, 12.0), self.assert_summary_matches_logs()["2024-03-01"])
+
+        response = self.client.delete(f"/food-logs/{first}", headers=self.headers)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual((250, 5.0, 0.0, 0.0), self.assert_summary_matches_logs()["2024-03-01"])
+
+    def test_moving_a_log_to_another_day(self):
+        log_id = self.create("2024-03-01", 400, protein=20)
+        self.create("2024-03-01", 100)
+
+        response = self.client.put(f"/food-logs/{log_id}", headers=self.headers, json={"log_date": "2024-03-02"})
+        self.assertEqual(200, response.status_code)
+
+        summary = self.assert_summary_matches_logs()
+        self.assertEqual((100, 0.0, 0.0, 0.0), summary["2024-03-01"])
+        self.assertEqual((400, 20.0, 0.0, 0.0), summary["2024-03-02"])
+
+    def test_bulk_upsert(self):
+        items = [
+            {"name": "Cơm tấm", "log_date": "2024-03-01", "calories": 600, "client_id": "a"},
+            {"name": "Bánh mì", "log_date": "2024-03-02", "calories": 350, "client_id": "b"},
+            {"name": "Chuối", "log_date": "2024-03-02", "calories": 90},
+        ]
+        self.assertEqual(201, self.client.post("/food-logs/bulk", headers=self.headers, json=items).status_code)
+
+        # Replay with one item moved to another day and one changed
+        items[0]["log_date"] = "2024-03-03"
+        items[1]["calories"] = 400
+        self.assertEqual(201, self.client.post("/food-logs/bulk", headers=self.headers, json=items[:2]).status_code)
+
+        summary = self.assert_summary_matches_logs()
+        self.assertNotIn("2024-03-01", summary)
+        self.assertEqual(490, summary["2024-03-02"][0])
+        self.assertEqual(600, summary["2024-03-03"][0])
+
+    def test_food_suggestion_replacing_logs(self):
+        response = self.client.post("/food-suggestions", headers=self.headers, json={"dayPlan": "2024-03-01"})
+        self.assertEqual(200, response.status_code)
+        self.assert_summary_matches_logs()
+
+        # The suggested logs were edited since: a new suggestion must debit the edited values
+        with self.app.app_context():
+            FoodLogModel.query.filter_by(user_id=self.user_id).update({"calories": 1000})
+            db.session.commit()
+            rebuild_daily_nutrition_summary(self.user_id)
+            suggestion_cache.get_cache().clear()
+
+        response = self.client.post("/food-suggestions", headers=self.headers, json={"dayPlan": "2024-03-01"})
+        self.assertEqual(200, response.status_code)
+        calories = sum(food["calories"] for food in response.get_json()["foods"])
+        self.assertEqual(calories, self.assert_summary_matches_logs()["2024-03-01"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
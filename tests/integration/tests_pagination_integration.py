@@ -0,0 +1,88 @@
+import json
+import os
+import unittest
+from datetime import date, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import UserModel, WorkoutLogModel
+
+
+class PaginationIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables and a user with workout logs on a few days,
+        two of them without a log_date.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+            user = UserModel(email="pages@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+            start = date(2024, 1, 1)
+            # Several logs per day, so page boundaries fall inside a day
+            log_dates = [start + timedelta(days=i // 3) for i in range(7)] + [None, None]
+            db.session.add_all([
+                WorkoutLogModel(user_id=user.id, duration_min=30, log_date=log_date)
+                for log_date in log_dates
+            ])
+            db.session.commit()
+            self.expected_ids = [
+                log.id for log in sorted(
+                    WorkoutLogModel.query.all(),
+                    key=lambda log: (log.log_date is None, log.log_date or date.min, log.id),
+                )
+            ]
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It removes the database session and drops the database tables.
+        """
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_pages_cover_every_log_once(self):
+        ids, cursor, pages = [], None, 0
+        while True:
+            url = "/workout-logs?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            response = self.client.get(url, headers=self.headers)
+            self.assertEqual(200, response.status_code)
+            ids += [log["id"] for log in response.get_json()]
+            pages += 1
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        self.assertEqual(self.expected_ids, ids)
+        self.assertEqual(5, pages)
+
+    def test_zero_limit_is_rejected(self):
+        response = self.client.get("/workout-logs?limit=0", headers=self.headers)
+        self.assertEqual(400, response.status_code)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/workout-logs?cursor=not-a-cursor", headers=self.headers)
+        self.assertEqual(400, response.status_code)
+
+    def test_stream_returns_every_log_as_ndjson(self):
+        response = self.client.get("/workout-logs?stream=true", headers=self.headers)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.mimetype)
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(self.expected_ids, [json.loads(line)["id"] for line in lines])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import os
+import threading
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import AIMessageModel, ConversationModel, GoalModel, UserModel, UserProfileModel
+from app.models.enums import AIRoleEnum, GoalTypeEnum
+from app.services import ai_message_service, llm_client
+from app.utils.query_counter import assert_query_budget
+from loadtest.fake_openai import serve
+
+
+class QueryBudgetIntegrationTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates the tables, a user with a few logs and a fake OpenAI server.
+        """
+        self.app = create_app(
+            settings_module=os.environ.get("APP_TEST_SETTINGS_MODULE")
+        )
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+
+            user = UserModel(email="budget@example.com", password="x")
+            db.session.add(user)
+            db.session.commit()
+            db.session.add(UserProfileModel(user_id=user.id, age=30, height_cm=170, weight_kg=70))
+            db.session.commit()
+            self.user_id = user.id
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity=user.id)}"}
+
+        today = date.today().isoformat()
+        for i in range(5):
+            self.client.post("/food-logs", headers=self.headers, json={
+                "name": f"food {i}", "calories": 100, "meal_type": "breakfast", "log_date": today, "quantity": 1,
+            })
+            self.client.post("/ai-messages", headers=self.headers, json={"role": "user", "content": f"message {i}"})
+
+        self.server = serve(port=0, latency=0.0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.env = mock.patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        })
+        self.env.start()
+        llm_client.reset_client()
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It stops the fake server and drops the database tables.
+        """
+        llm_client.reset_client()
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_list_endpoints_stay_within_budget(self):
+        for url, budget in [("/food-logs", 2), ("/ai-messages", 2), ("/goals", 2), ("/me", 3)]:
+            with self.subTest(url=url):
+                with assert_query_budget(budget):
+                    response = self.client.get(url, headers=self.headers)
+                self.assertEqual(response.status_code, 200)
+
+    def test_dashboard_calorie_progress_stays_within_budget(self):
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("The analytics buckets require PostgreSQL")
+
+        # Without a goal there is no target to compare to
+        with assert_query_budget(5):
+            response = self.client.get("/analytics/dashboard", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {"consumed": 500, "burned": 0, "target": None, "remaining": None, "percent": None},
+            response.get_json()["calorie_progress"],
+        )
+
+        with self.app.app_context():
+            db.session.add(GoalModel(user_id=self.user_id, goal_type=GoalTypeEnum.maintain, daily_calorie_target=2000))
+            db.session.commit()
+
+        with assert_query_budget(5):
+            response = self.client.get("/analytics/dashboard", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {"consumed": 500, "burned": 0, "target": 2000, "remaining": 1500, "percent": 25.0},
+            response.get_json()["calorie_progress"],
+        )
+
+    def test_workout_suggestion_loads_logs_in_batches(self):
+        # 4 of them take and release the job slot of the request
+        with assert_query_budget(10):
+            response = self.client.post("/workout-suggestions", headers=self.headers, json={})
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_food_suggestion_serializes_its_logs_without_reloading(self):
+        with self.app.app_context():
+            if db.engine.dialect.name != "postgresql":
+                self.skipTest("The food log upsert requires PostgreSQL")
+
+        # 4 of them take and release the job slot of the request
+        with assert_query_budget(10):
+            response = self.client.post(
+                "/food-suggestions", headers=self.headers, json={"dayPlan": date.today().isoformat(), "meal_type": "all"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        foods = response.get_json()["foods"]
+        self.assertGreater(len(foods), 1)
+        self.assertTrue(all(food["log"]["id"] for food in foods))
+
+    def test_ask_folds_messages_beyond_the_history_into_the_summary(self):
+        older = 20
+        with self.app.app_context():
+            conversation = ConversationModel(user_id=self.user_id)
+            db.session.add(conversation)
+            db.session.flush()
+            start = datetime.utcnow() - timedelta(days=1)
+            messages = [
+                AIMessageModel(
+                    user_id=self.user_id, conversation_id=conversation.id,
+                    role=AIRoleEnum.user if i % 2 == 0 else AIRoleEnum.ai,
+                    content=f"old message {i}", created_at=start + timedelta(seconds=i),
+                )
+                for i in range(ai_message_service.HISTORY_FETCH_LIMIT + older)
+            ]
+            db.session.add_all(messages)
+            db.session.commit()
+            # The history only fetches the most recent messages: everything older must be summarized
+            oldest_kept = messages[older].created_at
+            conversation_id = conversation.id
+
+        with assert_query_budget(8, max_repeats=2):
+            response = self.client.post("/ai-messages/ask", headers=self.headers, json={"message": "Hello"})
+        self.assertEqual(response.status_code, 200)
+
+        # The summary is only made once the response is sent
+        with self.app.app_context():
+            self.assertIsNone(db.session.get(ConversationModel, conversation_id).summary)
+
+        # The folded messages are not reloaded one by one after the exchange is committed
+        with assert_query_budget(4, max_repeats=2):
+            response.close()
+
+        with self.app.app_context():
+            conversation = db.session.get(ConversationModel, conversation_id)
+            self.assertTrue(conversation.summary)
+            self.assertLess(conversation.summarized_until, oldest_kept)
+            self.assertEqual(
+                0,
+                AIMessageModel.query.filter(
+                    AIMessageModel.conversation_id == conversation.id,
+                    AIMessageModel.created_at > conversation.summarized_until,
+                    AIMessageModel.created_at < start + timedelta(seconds=older),
+                ).count(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+from app.utils.bloom import BloomFilter
+
+
+class BloomFilterUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It fills a filter up to its capacity.
+        """
+        self.bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        for i in range(5000):
+            self.bloom.add(f"revoked-{i}")
+
+    def test_added_items_are_always_found(self):
+        self.assertTrue(all(f"revoked-{i}" in self.bloom for i in range(5000)))
+
+    def test_false_positive_rate_stays_near_target(self):
+        false_positives = sum(f"valid-{i}" in self.bloom for i in range(20000))
+
+        self.assertLess(false_positives / 20000, 0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
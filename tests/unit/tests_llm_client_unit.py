@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+import openai
+
+from app.services import llm_client
+from loadtest.fake_openai import serve
+
+
+class LLMClientUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It starts a local fake OpenAI server and points a fresh client at it.
+        """
+        self.server = serve(port=0, latency=0.0)
+        self.handler = self.server.RequestHandlerClass
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.env = mock.patch.dict(os.environ, {
+            "OPENAI_API_KEY": "test-key",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+        })
+        self.env.start()
+        self.settings = [
+            mock.patch.object(llm_client, "BACKOFF_BASE", 0.01),
+            mock.patch.object(llm_client, "MAX_RETRIES", 2),
+            mock.patch.object(llm_client, "BREAKER_FAILURE_THRESHOLD", 2),
+            mock.patch.object(llm_client, "BREAKER_RESET_TIMEOUT", 0.2),
+        ]
+        for setting in self.settings:
+            setting.start()
+        llm_client.reset_client()
+
+    def tearDown(self):
+        """
+        This method runs after each test.
+        It drops the client and stops the fake server.
+        """
+        llm_client.reset_client()
+        for setting in self.settings:
+            setting.stop()
+        self.env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def ask(self, **kwargs):
+        return llm_client.chat_completion(messages=[{"role": "user", "content": "Hi"}], **kwargs)
+
+    def test_chat_completion_success(self):
+        response = self.ask()
+
+        self.assertTrue(response.choices[0].message.content)
+        self.assertEqual(1, self.handler.request_count)
+
+    def test_stream_chat_completion_yields_deltas(self):
+        deltas = list(llm_client.stream_chat_completion(messages=[{"role": "user", "content": "Hi"}]))
+
+        self.assertGreater(len(deltas), 1)
+        self.assertEqual(self.ask().choices[0].message.content, "".join(deltas))
+
+    def test_retries_transient_errors(self):
+        self.handler.fail_next = 2
+
+        response = self.ask()
+
+        self.assertTrue(response.choices[0].message.content)
+        self.assertEqual(3, self.handler.request_count)
+
+    def test_gives_up_after_max_retries(self):
+        self.handler.fail_next = 10
+
+        with self.assertRaises(llm_client.LLMUnavailableError):
+            self.ask()
+        self.assertEqual(1 + llm_client.MAX_RETRIES, self.handler.request_count)
+
+    def test_client_errors_are_not_retried(self):
+        self.handler.fail_next = 1
+        self.handler.fail_status = 400
+
+        with self.assertRaises(openai.BadRequestError):
+            self.ask()
+        self.assertEqual(1, self.handler.request_count)
+
+    def test_deadline_bounds_a_hung_upstream(self):
+        self.handler.latency = 2.0
+
+        start = time.monotonic()
+        with self.assertRaises(llm_client.LLMUnavailableError):
+            self.ask(deadline=0.3)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_retry_budget_limits_retries(self):
+        self.handler.fail_next = 100
+        llm_client._retry_budget.tokens = 0
+
+        with self.assertRaises(llm_client.LLMUnavailableError):
+            self.ask()
+        self.assertEqual(1, self.handler.request_count)
+
+    def test_circuit_breaker_fails_fast_then_recovers(self):
+        self.handler.fail_next = 100
+        for _ in range(llm_client.BREAKER_FAILURE_THRESHOLD):
+            with self.assertRaises(llm_client.LLMUnavailableError):
+                self.ask()
+        sent = self.handler.request_count
+
+        # Open: rejected without reaching the server
+        with self.assertRaises(llm_client.LLMUnavailableError):
+            self.ask()
+        self.assertEqual(sent, self.handler.request_count)
+
+        # After the reset timeout a trial call goes through and closes the breaker
+        self.handler.fail_next = 0
+        time.sleep(llm_client.BREAKER_RESET_TIMEOUT)
+        self.assertTrue(self.ask().choices[0].message.content)
+        self.assertEqual(llm_client.CircuitBreaker.CLOSED, llm_client._breaker.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from sqlalchemy import create_engine, exc, text
+
+from app.utils.query_counter import QueryBudgetExceeded, assert_query_budget, statement_shape
+
+
+class QueryCounterUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It creates an in-memory database with a few rows.
+        """
+        self.engine = create_engine("sqlite://")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE foods (id INTEGER PRIMARY KEY, name TEXT)"))
+            connection.execute(text("INSERT INTO foods (name) VALUES ('rice'), ('egg'), ('milk')"))
+
+    def test_statements_differing_by_parameters_share_a_shape(self):
+        self.assertEqual(
+            statement_shape("SELECT * FROM foods WHERE id IN (%(id_1_1)s, %(id_1_2)s)  AND name = 'egg'"),
+            statement_shape("SELECT * FROM foods WHERE id IN (%(id_1_1)s) AND name = 'rice'"),
+        )
+
+    def test_budget_counts_statements(self):
+        with assert_query_budget(1) as counter:
+            with self.engine.connect() as connection:
+                connection.execute(text("SELECT name FROM foods")).all()
+
+        self.assertEqual(counter.count, 1)
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(1):
+                with self.engine.connect() as connection:
+                    connection.execute(text("SELECT name FROM foods")).all()
+                    connection.execute(text("SELECT count(*) FROM foods")).all()
+
+    def test_repeated_statement_shape_fails_the_budget(self):
+        with self.assertRaisesRegex(QueryBudgetExceeded, "ran 3 times"):
+            with assert_query_budget(10):
+                with self.engine.connect() as connection:
+                    for food_id in (1, 2, 3):
+                        connection.execute(text("SELECT name FROM foods WHERE id = :id"), {"id": food_id}).all()
+
+    def test_failed_statements_leave_no_state_on_the_connection(self):
+        with assert_query_budget(10) as counter:
+            with self.engine.connect() as connection:
+                with self.assertRaises(exc.OperationalError):
+                    connection.execute(text("SELECT name FROM missing_table"))
+                connection.execute(text("SELECT name FROM foods")).all()
+                info = dict(connection.connection.info)
+
+        self.assertEqual(1, counter.count)
+        self.assertEqual({}, info)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from app.services import suggestion_cache
+from app.services.food_suggestion_service import _exclude_recent_foods
+from app.utils.cache import TTLCache
+
+USER_INFO = {
+    "age": 31,
+    "gender": "male",
+    "height_cm": 175,
+    "weight_kg": 72,
+    "bmi": 23.5,
+    "activity_level": "moderate",
+    "target": {"goal": "lose_weight", "weight_kg": 68},
+}
+
+FOOD_PLAN = {
+    "foods": [
+        {"name": "Phở gà", "meal_type": "breakfast", "calories": 420},
+        {"name": "Bún chả", "meal_type": "lunch", "calories": 550},
+        {"name": "Cơm gà", "meal_type": "lunch", "calories": 600},
+    ]
+}
+
+
+class SuggestionCacheUnitTests(unittest.TestCase):
+    def setUp(self):
+        """
+        This method runs before each test.
+        It sets up a cache driven by a fake clock.
+        """
+        self.now = 0.0
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.set("a", 1)
+        self.now = 9.9
+        self.assertEqual(1, self.cache.get("a"))
+
+        self.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(1, self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(3, self.cache.get("c"))
+
+    def test_fingerprint_groups_profiles_of_the_same_cohort(self):
+        close_profile = {**USER_INFO, "age": 33, "weight_kg": 73, "bmi": 23.8,
+                         "target": {"weight_kg": 68, "goal": "lose_weight"}}
+        other_profile = {**USER_INFO, "bmi": 26.1}
+
+        key = suggestion_cache.fingerprint("food", USER_INFO, meal_type="lunch")
+        self.assertEqual(key, suggestion_cache.fingerprint("food", close_profile, meal_type="lunch"))
+        self.assertNotEqual(key, suggestion_cache.fingerprint("food", other_profile, meal_type="lunch"))
+        self.assertNotEqual(key, suggestion_cache.fingerprint("food", USER_INFO, meal_type="dinner"))
+
+    def test_recent_foods_are_excluded_from_cached_plans(self):
+        plan = _exclude_recent_foods(FOOD_PLAN, ["bún chả"], is_full_day=True)
+        self.assertEqual(["Phở gà", "Cơm gà"], [food["name"] for food in plan["foods"]])
+
+        # A full-day plan missing a whole meal cannot be served from the cache
+        self.assertIsNone(_exclude_recent_foods(FOOD_PLAN, ["Phở gà"], is_full_day=True))
+        self.assertIsNone(_exclude_recent_foods(FOOD_PLAN, ["Phở gà", "Bún chả", "Cơm gà"], is_full_day=False))
+
+
+if __name__ == "__main__":
+    unittest.main()